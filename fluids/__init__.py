@@ -21,85 +21,72 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.'''
 
 
-from . import atmosphere
-from . import compressible
-from . import control_valve
-from . import core
-from . import filters
-from . import fittings
-from . import flow_meter
-from . import friction
-from . import geometry
-from . import mixing
-from . import open_flow
-from . import packed_bed
-from . import piping
-from . import pump
-from . import safety_valve
-from . import packed_tower
-from . import two_phase
-from . import two_phase_voidage
-from . import drag
-from . import saltation
-from . import separator
-from . import particle_size_distribution
-from . import jet_pump
-
-
-from .atmosphere import *
-from .compressible import *
-from .control_valve import *
-from .core import *
-from .filters import *
-from .fittings import *
-from .flow_meter import *
-from .friction import *
-from .geometry import *
-from .mixing import *
-from .open_flow import *
-from .particle_size_distribution import *
-from .packed_bed import *
-from .piping import *
-from .pump import *
-from .safety_valve import *
-from .packed_tower import *
-from .two_phase import *
-from .two_phase_voidage import *
-from .drag import *
-from .saltation import *
-from .separator import *
-from .jet_pump import *
+import sys
+import importlib
 
+# Submodules in the order their contents are imported; later submodules take 
+# precedence for any name defined in more than one
+_submodules = ['atmosphere', 'compressible', 'control_valve', 'core', 'filters',
+               'fittings', 'flow_meter', 'friction', 'geometry', 'mixing',
+               'open_flow', 'particle_size_distribution', 'packed_bed', 
+               'piping', 'pump', 'safety_valve', 'packed_tower', 'two_phase',
+               'two_phase_voidage', 'drag', 'saltation', 'separator', 
+               'jet_pump', 'network']
 
 __all__ = ['atmosphere', 'compressible', 'control_valve', 'core', 'filters', 'fittings',
 'friction', 'geometry', 'mixing', 'open_flow', 'packed_bed', 'piping',
 'pump', 'safety_valve', 'packed_tower', 'two_phase', 'two_phase_voidage', 
 'drag', 'saltation', 'separator', 'flow_meter', 'particle_size_distribution',
-'jet_pump']
+'jet_pump', 'network']
+
+# Order the contents of the submodules are listed in `__all__`
+_all_order = ['atmosphere', 'compressible', 'control_valve', 'core', 'filters',
+              'fittings', 'friction', 'geometry', 'mixing', 'open_flow', 
+              'flow_meter', 'packed_bed', 'piping', 'pump', 'safety_valve',
+              'packed_tower', 'two_phase', 'two_phase_voidage', 'drag', 
+              'saltation', 'separator', 'particle_size_distribution', 
+              'jet_pump', 'network']
+
+
+# Python 3.7+ supports `__getattr__` on modules (PEP 562), so submodules are 
+# only imported once something from them is used. Importing all of them 
+# loads most of scipy, and takes about half a second. The names in each 
+# submodule come from a table, `fluids._all`, kept in step with them.
+if sys.version_info < (3, 7): # pragma: no cover
+    for _name in _submodules:
+        _module = importlib.import_module('.' + _name, __name__)
+        globals().update({i: getattr(_module, i) for i in _module.__all__})
+    for _name in _all_order:
+        __all__.extend(globals()[_name].__all__)
+else:
+    from fluids._all import submodule_all as _submodule_all
+    _lazy_names = {}
+    for _name in _submodules:
+        for _i in _submodule_all[_name]:
+            _lazy_names[_i] = _name
+    for _name in _all_order:
+        __all__.extend(_submodule_all[_name])
+
+    def __getattr__(name):
+        if name in _submodule_all:
+            return importlib.import_module('.' + name, __name__)
+        try:
+            module = _lazy_names[name]
+        except KeyError:
+            raise AttributeError("module %r has no attribute %r" %(__name__, name))
+        value = getattr(importlib.import_module('.' + module, __name__), name)
+        globals()[name] = value
+        return value
 
-__all__.extend(atmosphere.__all__)
-__all__.extend(compressible.__all__)
-__all__.extend(control_valve.__all__)
-__all__.extend(core.__all__)
-__all__.extend(filters.__all__)
-__all__.extend(fittings.__all__)
-__all__.extend(friction.__all__)
-__all__.extend(geometry.__all__)
-__all__.extend(mixing.__all__)
-__all__.extend(open_flow.__all__)
-__all__.extend(flow_meter.__all__)
-__all__.extend(packed_bed.__all__)
-__all__.extend(piping.__all__)
-__all__.extend(pump.__all__)
-__all__.extend(safety_valve.__all__)
-__all__.extend(packed_tower.__all__)
-__all__.extend(two_phase.__all__)
-__all__.extend(two_phase_voidage.__all__)
-__all__.extend(drag.__all__)
-__all__.extend(saltation.__all__)
-__all__.extend(separator.__all__)
-__all__.extend(particle_size_distribution.__all__)
-__all__.extend(jet_pump.__all__)
+    def __dir__():
+        # The public contents, as if everything had been imported, and any
+        # other public subpackages which have been imported
+        names = set(__all__)
+        for i, value in globals().items():
+            if ((i[:2] == '__' and i[-2:] == '__' and i not in ('__getattr__', '__dir__'))
+                or (i[0] != '_' and getattr(value, '__name__', '').startswith(__name__ + '.'))):
+                names.add(i)
+        return sorted(names)
 
 
 __version__ = '0.1.72'
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+'''Chemical Engineering Design Library (ChEDL). Utilities for process modeling.
+Copyright (C) 2018 Caleb Bell <Caleb.Andrew.Bell@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.'''
+
+
+# Contents of the `__all__` of each submodule, so `fluids` can list and find
+# the names of the submodules without importing them; tests/test_init.py 
+# checks this matches the submodules. Update it when adding to an `__all__`.
+submodule_all = {
+    'atmosphere': [
+        'ATMOSPHERE_1976', 'ATMOSPHERE_NRLMSISE00', 'hwm93', 'hwm14',
+        'airmass'],
+    'compressible': [
+        'Panhandle_A', 'Panhandle_B', 'Weymouth', 'Spitzglass_high',
+        'Spitzglass_low', 'Oliphant', 'Fritzsche', 'Muller', 'IGT',
+        'gas_pipeline_batch', 'gas_pipeline_profile', 'isothermal_gas',
+        'isothermal_gas_batch', 'isothermal_work_compression',
+        'polytropic_exponent', 'isentropic_work_compression',
+        'isentropic_efficiency', 'isentropic_T_rise_compression',
+        'T_critical_flow', 'P_critical_flow', 'P_isothermal_critical_flow',
+        'is_critical_flow', 'stagnation_energy', 'P_stagnation',
+        'T_stagnation', 'T_stagnation_ideal'],
+    'control_valve': [
+        'size_control_valve_l', 'size_control_valve_g',
+        'size_control_valve_l_batch', 'size_control_valve_g_batch',
+        'cavitation_index', 'FF_critical_pressure_ratio_l',
+        'is_choked_turbulent_l', 'is_choked_turbulent_g', 'Reynolds_valve',
+        'loss_coefficient_piping', 'Reynolds_factor', 'Cv_char_quick_opening',
+        'Cv_char_linear', 'Cv_char_equal_percentage',
+        'convert_flow_coefficient', 'control_valve_choke_P_l',
+        'control_valve_choke_P_g', 'control_valve_noise_l_2015',
+        'control_valve_noise_g_2011', 'ControlValveCatalog'],
+    'core': [
+        'Reynolds', 'Prandtl', 'Grashof', 'Nusselt', 'Sherwood', 'Rayleigh',
+        'Schmidt', 'Peclet_heat', 'Peclet_mass', 'Fourier_heat',
+        'Fourier_mass', 'Graetz_heat', 'Lewis', 'Weber', 'Mach', 'Knudsen',
+        'Bond', 'Dean', 'Morton', 'Froude', 'Froude_densimetric', 'Strouhal',
+        'Biot', 'Stanton', 'Euler', 'Cavitation', 'Eckert', 'Jakob',
+        'Power_number', 'Stokes_number', 'Drag', 'Capillary', 'Bejan_L',
+        'Bejan_p', 'Boiling', 'Confinement', 'Archimedes', 'Ohnesorge',
+        'Suratman', 'Hagen', 'thermal_diffusivity', 'c_ideal_gas',
+        'relative_roughness', 'nu_mu_converter', 'gravity', 'K_from_f',
+        'K_from_L_equiv', 'L_equiv_from_K', 'L_from_K', 'dP_from_K',
+        'head_from_K', 'head_from_P', 'P_from_head', 'Eotvos'],
+    'filters': [
+        'round_edge_screen', 'round_edge_open_mesh', 'square_edge_screen',
+        'square_edge_grill', 'round_edge_grill'],
+    'fittings': [
+        'contraction_sharp', 'contraction_round', 'contraction_conical',
+        'contraction_beveled', 'diffuser_sharp', 'diffuser_conical',
+        'diffuser_conical_staged', 'diffuser_curved', 'diffuser_pipe_reducer',
+        'entrance_sharp', 'entrance_distance', 'entrance_angled',
+        'entrance_rounded', 'entrance_beveled', 'entrance_beveled_orifice',
+        'exit_normal', 'bend_rounded', 'bend_miter', 'helix', 'spiral',
+        'Darby3K', 'Hooper2K', 'Kv_to_Cv', 'Cv_to_Kv', 'Kv_to_K', 'K_to_Kv',
+        'Cv_to_K', 'K_to_Cv', 'change_K_basis', 'Darby', 'Hooper',
+        'K_gate_valve_Crane', 'K_angle_valve_Crane', 'K_globe_valve_Crane',
+        'K_swing_check_valve_Crane', 'K_lift_check_valve_Crane',
+        'K_tilting_disk_check_valve_Crane', 'K_globe_stop_check_valve_Crane',
+        'K_angle_stop_check_valve_Crane', 'K_ball_valve_Crane',
+        'K_diaphragm_valve_Crane', 'K_foot_valve_Crane',
+        'K_butterfly_valve_Crane', 'K_plug_valve_Crane',
+        'K_branch_converging_Crane', 'K_run_converging_Crane',
+        'K_branch_diverging_Crane', 'K_run_diverging_Crane',
+        'v_lift_valve_Crane'],
+    'flow_meter': [
+        'C_Reader_Harris_Gallagher', 'differential_pressure_meter_solver',
+        'differential_pressure_meter_dP', 'flow_meter_discharge',
+        'orifice_expansibility', 'discharge_coefficient_to_K',
+        'K_to_discharge_coefficient', 'dP_orifice',
+        'velocity_of_approach_factor', 'flow_coefficient',
+        'nozzle_expansibility', 'C_long_radius_nozzle', 'C_ISA_1932_nozzle',
+        'C_venturi_nozzle', 'orifice_expansibility_1989', 'dP_venturi_tube',
+        'diameter_ratio_cone_meter', 'diameter_ratio_wedge_meter',
+        'cone_meter_expansibility_Stewart', 'dP_cone_meter',
+        'C_wedge_meter_Miller', 'C_wedge_meter_ISO_5167_6_2017',
+        'dP_wedge_meter', 'C_Reader_Harris_Gallagher_wet_venturi_tube',
+        'dP_Reader_Harris_Gallagher_wet_venturi_tube',
+        'differential_pressure_meter_C_epsilon',
+        'differential_pressure_meter_beta', 'ISO_5167_ORIFICE',
+        'LONG_RADIUS_NOZZLE', 'ISA_1932_NOZZLE', 'VENTURI_NOZZLE',
+        'AS_CAST_VENTURI_TUBE', 'MACHINED_CONVERGENT_VENTURI_TUBE',
+        'ROUGH_WELDED_CONVERGENT_VENTURI_TUBE', 'CONE_METER', 'WEDGE_METER'],
+    'friction': [
+        'friction_factor', 'friction_factor_curved', 'Colebrook', 'Clamond',
+        'friction_laminar', 'FrictionFactorTable', 'friction_table',
+        'transmission_factor', 'material_roughness',
+        'nearest_material_roughness', 'roughness_Farshad',
+        '_Farshad_roughness', '_roughness', 'HHR_roughness',
+        'oregon_smooth_data', 'Moody', 'Alshul_1952', 'Wood_1966',
+        'Churchill_1973', 'Eck_1973', 'Jain_1976', 'Swamee_Jain_1976',
+        'Churchill_1977', 'Chen_1979', 'Round_1980', 'Shacham_1980',
+        'Barr_1981', 'Zigrang_Sylvester_1', 'Zigrang_Sylvester_2', 'Haaland',
+        'Serghides_1', 'Serghides_2', 'Tsal_1989', 'Manadilli_1997',
+        'Romeo_2002', 'Sonnad_Goudar_2006', 'Rao_Kumar_2007', 'Buzzelli_2008',
+        'Avci_Karagoz_2009', 'Papaevangelo_2010', 'Brkic_2011_1',
+        'Brkic_2011_2', 'Fang_2011', 'Blasius', 'von_Karman',
+        'Prandtl_von_Karman_Nikuradse', 'helical_laminar_fd_White',
+        'helical_laminar_fd_Mori_Nakayama', 'helical_laminar_fd_Schmidt',
+        'helical_turbulent_fd_Schmidt', 'helical_turbulent_fd_Mori_Nakayama',
+        'helical_turbulent_fd_Prasad', 'helical_turbulent_fd_Czop',
+        'helical_turbulent_fd_Guo', 'helical_turbulent_fd_Ju',
+        'helical_turbulent_fd_Mandal_Nigam',
+        'helical_transition_Re_Seth_Stahel', 'helical_transition_Re_Ito',
+        'helical_transition_Re_Kubair_Kuloor',
+        'helical_transition_Re_Kutateladze_Borishanskii',
+        'helical_transition_Re_Schmidt', 'helical_transition_Re_Srinivasan',
+        'LAMINAR_TRANSITION_PIPE', 'oregon_smooth_data',
+        'friction_plate_Martin_1999', 'friction_plate_Martin_VDI',
+        'friction_plate_Kumar', 'friction_plate_Muley_Manglik'],
+    'geometry': [
+        'TANK', 'HelicalCoil', 'PlateExchanger', 'RectangularFinExchanger',
+        'RectangularOffsetStripFinExchanger', 'HyperbolicCoolingTower',
+        'SA_partial_sphere', 'V_partial_sphere', 'V_horiz_conical',
+        'V_horiz_ellipsoidal', 'V_horiz_guppy', 'V_horiz_spherical',
+        'V_horiz_torispherical', 'V_vertical_conical',
+        'V_vertical_ellipsoidal', 'V_vertical_spherical',
+        'V_vertical_torispherical', 'V_vertical_conical_concave',
+        'V_vertical_ellipsoidal_concave', 'V_vertical_spherical_concave',
+        'V_vertical_torispherical_concave', 'a_torispherical',
+        'SA_ellipsoidal_head', 'SA_conical_head', 'SA_guppy_head',
+        'SA_torispheroidal', 'V_from_h', 'SA_tank', 'sphericity',
+        'aspect_ratio', 'circularity', 'A_cylinder', 'V_cylinder',
+        'A_hollow_cylinder', 'V_hollow_cylinder', 'A_multiple_hole_cylinder',
+        'V_multiple_hole_cylinder'],
+    'mixing': [
+        'agitator_time_homogeneous', 'Kp_helical_ribbon_Rieger',
+        'time_helical_ribbon_Grenville', 'size_tee', 'COV_motionless_mixer',
+        'K_motionless_mixer'],
+    'open_flow': [
+        'Q_weir_V_Shen', 'Q_weir_rectangular_Kindsvater_Carter',
+        'Q_weir_rectangular_SIA', 'Q_weir_rectangular_full_Ackers',
+        'Q_weir_rectangular_full_SIA', 'Q_weir_rectangular_full_Rehbock',
+        'Q_weir_rectangular_full_Kindsvater_Carter', 'V_Manning',
+        'n_Manning_to_C_Chezy', 'C_Chezy_to_n_Manning', 'V_Chezy', 'n_natural',
+        'n_excavated_dredged', 'n_lined_built', 'n_closed_conduit', 'n_dicts'],
+    'particle_size_distribution': [
+        'ParticleSizeDistribution', 'ParticleSizeDistributionContinuous',
+        'PSDLognormal', 'PSDGatesGaudinSchuhman', 'PSDRosinRammler',
+        'PSDInterpolated', 'PSDCustom', 'psd_spacing', 'pdf_lognormal',
+        'cdf_lognormal', 'pdf_lognormal_basis_integral',
+        'pdf_Gates_Gaudin_Schuhman', 'cdf_Gates_Gaudin_Schuhman',
+        'pdf_Gates_Gaudin_Schuhman_basis_integral', 'pdf_Rosin_Rammler',
+        'cdf_Rosin_Rammler', 'pdf_Rosin_Rammler_basis_integral',
+        'ASTM_E11_sieves', 'ISO_3310_1_sieves', 'Sieve', 'ISO_3310_1_R20_3',
+        'ISO_3310_1_R20', 'ISO_3310_1_R10', 'ISO_3310_1_R40_3'],
+    'packed_bed': [
+        'dP_packed_bed', 'Ergun', 'Kuo_Nydegger', 'Jones_Krier', 'Carman',
+        'Hicks', 'Brauer', 'KTA', 'Erdim_Akgiray_Demir', 'Fahien_Schriver',
+        'Idelchik', 'Harrison_Brunner_Hecker', 'Montillet_Akkari_Comiti',
+        'Guo_Sun', 'voidage_Benyahia_Oneil',
+        'voidage_Benyahia_Oneil_spherical',
+        'voidage_Benyahia_Oneil_cylindrical'],
+    'piping': [
+        'nearest_pipe', 'gauge_from_t', 't_from_gauge', 'wire_schedules'],
+    'pump': [
+        'VFD_efficiency', 'CSA_motor_efficiency',
+        'motor_efficiency_underloaded', 'Corripio_pump_efficiency',
+        'Corripio_motor_efficiency', 'specific_speed', 'specific_diameter',
+        'speed_synchronous', 'nema_sizes', 'nema_sizes_hp', 'motor_round_size',
+        'nema_min_P', 'nema_high_P', 'plug_types',
+        'voltages_1_phase_residential', 'voltages_3_phase', 'frequencies',
+        'residential_power', 'industrial_power', 'current_ideal'],
+    'safety_valve': [
+        'API526_A_sq_inch', 'API526_letters', 'API526_A', 'API520_round_size',
+        'API520_C', 'API520_F2', 'API520_Kv', 'API520_N', 'API520_SH',
+        'API520_B', 'API520_W', 'API520_A_g', 'API520_A_steam'],
+    'packed_tower': [
+        'voidage_experimental', 'specific_area_mesh', 'Stichlmair_dry',
+        'Stichlmair_wet', 'Stichlmair_flood', 'Robbins',
+        'dP_demister_dry_Setekleiv_Svendsen_lit',
+        'dP_demister_dry_Setekleiv_Svendsen', 'dP_demister_wet_ElDessouky',
+        'separation_demister_ElDessouky'],
+    'two_phase': [
+        'two_phase_dP', 'two_phase_dP_acceleration',
+        'two_phase_dP_dz_acceleration', 'two_phase_dP_gravitational',
+        'two_phase_dP_dz_gravitational', 'Lockhart_Martinelli', 'Friedel',
+        'Chisholm', 'Kim_Mudawar', 'Baroczy_Chisholm', 'Theissing',
+        'Muller_Steinhagen_Heck', 'Gronnerud', 'Lombardi_Pedrocchi',
+        'Jung_Radermacher', 'Tran', 'Chen_Friedel', 'Zhang_Webb', 'Xu_Fang',
+        'Yu_France', 'Wang_Chiang_Lu', 'Hwang_Kim', 'Zhang_Hibiki_Mishima',
+        'Mishima_Hibiki', 'Bankoff', 'two_phase_correlations'],
+    'two_phase_voidage': [
+        'Thom', 'Zivi', 'Smith', 'Fauske', 'Chisholm_voidage', 'Turner_Wallis',
+        'homogeneous', 'Chisholm_Armand', 'Armand', 'Nishino_Yamazaki',
+        'Guzhov', 'Kawahara', 'Baroczy', 'Tandon_Varma_Gupta', 'Harms',
+        'Domanski_Didion', 'Graham', 'Yashar', 'Huq_Loth',
+        'Kopte_Newell_Chato', 'Steiner', 'Rouhani_1', 'Rouhani_2',
+        'Nicklin_Wilkes_Davidson', 'Gregory_Scott', 'Dix', 'Sun_Duffey_Peng',
+        'Xu_Fang_voidage', 'Woldesemayat_Ghajar', 'Lockhart_Martinelli_Xtt',
+        'two_phase_voidage_experimental', 'density_two_phase',
+        'Beattie_Whalley', 'McAdams', 'Cicchitti', 'Lin_Kwok', 'Fourar_Bories',
+        'liquid_gas_voidage', 'gas_liquid_viscosity',
+        'two_phase_voidage_correlations', 'liquid_gas_viscosity_correlations'],
+    'drag': [
+        'drag_sphere', 'v_terminal', 'integrate_drag_sphere',
+        'time_v_terminal_Stokes', 'Stokes', 'Barati', 'Barati_high', 'Rouse',
+        'Engelund_Hansen', 'Clift_Gauvin', 'Morsi_Alexander', 'Graf',
+        'Flemmer_Banks', 'Khan_Richardson', 'Swamee_Ojha', 'Yen',
+        'Haider_Levenspiel', 'Cheng', 'Terfous', 'Mikhailov_Freire', 'Clift',
+        'Ceylan', 'Almedeij', 'Morrison', 'Song_Xu'],
+    'saltation': [
+        'Rizk', 'Matsumoto_1974', 'Matsumoto_1975', 'Matsumoto_1977', 'Schade',
+        'Weber_saltation', 'Geldart_Ling'],
+    'separator': [
+        'v_Sounders_Brown', 'K_separator_Watkins', 'K_separator_demister_York',
+        'K_Sounders_Brown_theoretical'],
+    'jet_pump': [
+        'liquid_jet_pump', 'liquid_jet_pump_ancillary'],
+    'network': [
+        'PipeNetwork', 'Colebrook_Re_derivative'],
+}
@@ -48,12 +48,12 @@ Wind Models (requires Fortran compiler!)
 
 from __future__ import division
 import os
-from math import exp, cos, radians
+from bisect import bisect_left, bisect_right
+from math import exp, log, cos, radians
 import numpy as np
 from scipy.constants import N_A, R
-from scipy.optimize import brenth
 from scipy.integrate import quad
-from .nrlmsise00 import gtd7, nrlmsise_output, nrlmsise_input, nrlmsise_flags, ap_array
+from .nrlmsise00 import gtd7, gtd7_vectorized, nrlmsise_output, nrlmsise_input, nrlmsise_flags, ap_array
 
 __all__ = ['ATMOSPHERE_1976', 'ATMOSPHERE_NRLMSISE00', 'hwm93', 'hwm14', 'airmass']
 
@@ -80,6 +80,16 @@ M0 = 28.9644
 g0 = 9.80665
 gamma = 1.400
 
+# Layer constants as arrays, for evaluating many altitudes at once
+H_std_array = np.array(H_std)
+T_grad_array = np.array(T_grad)
+T_std_array = np.array(T_std)
+P_std_array = np.array(P_std)
+# g0*M0/R/T_grad, with 0 for the isothermal layers
+P_exponents = [g0*M0/8314.32/i if i else 0.0 for i in T_grad]
+P_exponent_array = np.array(P_exponents)
+P_std_negative = [-P for P in P_std]
+
 class ATMOSPHERE_1976(object):
     r'''US Standard Atmosphere 1976 class, which calculates `T`, `P`,
     `rho`, `v_sonic`, `mu`, `k`, and `g` as a function of altitude above 
@@ -286,19 +296,154 @@ class ATMOSPHERE_1976(object):
         -------
         delta_P : float
             Pressure difference between the elevations, [Pa]
+            
+        Notes
+        -----
+        The reference elevation is the one at which the standard atmosphere
+        has the pressure `P1`; the temperature difference `T1` has from the
+        standard atmosphere there is applied over the whole elevation 
+        difference. 
+        
+        The integral is evaluated analytically, layer by layer, except in 
+        layers where `T1` differs from the standard atmosphere by 90% or more
+        of its temperature, which are integrated numerically. With 
+        geopotential height `H`, :math:`g\,dZ = g_0\,dH`. In an isothermal 
+        layer the integral is proportional to the pressure difference; in a 
+        layer with a linear temperature profile :math:`T = T_b + L(H - H_b)` 
+        and :math:`P = P_b(T_b/T)^n`, :math:`n = g_0 M/(RL)`, the integrand
+        :math:`T^{-n}/(T + \Delta T)` has the antiderivative:
+            
+        .. math::
+            -\frac{T^{-n}}{n}\,{}_2F_1\left(1, n; n+1; 
+            -\frac{\Delta T}{T}\right) = -T^{-n}\sum_{k=0}^\infty
+            \frac{1}{n+k}\left(-\frac{\Delta T}{T}\right)^k
+        
+        Examples
+        --------
+        >>> ATMOSPHERE_1976.pressure_integral(288.6, 84100.0, 147.0)
+        1451.958306100854
+        '''
+        # Geopotential height with the standard pressure P1, by inverting the 
+        # pressure profile of its layer
+        i = min(max(bisect_left(P_std_negative, -P1) - 1, 0), 7)
+        if T_grad[i] == 0:
+            H1 = H_std[i] - log(P1/P_std[i])*ATMOSPHERE_1976.R*T_std[i]/(g0*M0)
+            dT = T1 - T_std[i]
+        else:
+            T_ref = T_std[i]*(P_std[i]/P1)**(1.0/P_exponents[i])
+            H1 = H_std[i] + (T_ref - T_std[i])/T_grad[i]
+            dT = T1 - T_ref
+        Z1 = r0*H1/(r0 - H1)
+        Z2 = Z1 + dH
+        H2 = r0*Z2/(r0 + Z2)
+        
+        # Integrate upwards over each layer crossed
+        H_low, H_high = min(H1, H2), max(H1, H2)
+        delta_P = 0.0
+        while H_low < H_high:
+            i = min(max(bisect_right(H_std, H_low) - 1, 0), 7)
+            H_end = min(H_high, H_std[i+1]) if i < 7 else H_high
+            delta_P += ATMOSPHERE_1976._pressure_integral_layer(i, H_low, H_end, dT)
+            H_low = H_end
+        return delta_P if H2 >= H1 else -delta_P
+
+    @staticmethod
+    def _pressure_integral_layer(i, H1, H2, dT):
+        # Integral of g0*rho dH from H1 to H2 within layer `i`
+        T_layer, T_increase, P_layer = T_std[i], T_grad[i], P_std[i]
+        if T_increase == 0:
+            P1 = P_layer*exp(-g0*M0*(H1 - H_std[i])/ATMOSPHERE_1976.R/T_layer)
+            P2 = P_layer*exp(-g0*M0*(H2 - H_std[i])/ATMOSPHERE_1976.R/T_layer)
+            return T_layer/(T_layer + dT)*(P1 - P2)
+        n = P_exponents[i]
+        T1 = T_layer + T_increase*(H1 - H_std[i])
+        T2 = T_layer + T_increase*(H2 - H_std[i])
+        if abs(dT) >= 0.9*min(T1, T2):
+            # The series converges slowly or not at all; integrate numerically
+            def to_int(H):
+                T = T_layer + T_increase*(H - H_std[i])
+                return g0*M0/ATMOSPHERE_1976.R*P_layer*(T_layer/T)**n/(T + dT)
+            return quad(to_int, H1, H2, epsabs=0, epsrel=1E-13, limit=200)[0]
+        # n*P_layer*T_layer**n*(T1**-n*S1 - T2**-n*S2), written relative to 
+        # the pressure at H1 to avoid overflow
+        S1 = ATMOSPHERE_1976._hypergeometric_series(-dT/T1, n)
+        S2 = ATMOSPHERE_1976._hypergeometric_series(-dT/T2, n)
+        P1 = P_layer*(T_layer/T1)**n
+        return n*P1*(S1 - S2*(T1/T2)**n)
+
+    @staticmethod
+    def _hypergeometric_series(z, n):
+        # sum of z**k/(n + k) for k >= 0, equal to 2F1(1, n; n + 1; z)/n. The
+        # layers' n are large and negative, for which scipy's hyp2f1 loses 
+        # precision; the series itself is well conditioned for |z| < 1, and
+        # is only used for |z| < 0.9, which needs under 400 terms.
+        total = 0.0
+        z_k = 1.0
+        for k in range(1000):
+            term = z_k/(n + k)
+            total += term
+            if abs(term) < 1E-17*abs(total):
+                break
+            z_k *= z
+        return total
+
+    @classmethod
+    def evaluate(cls, Z, dT=0):
+        r'''Method to calculate the properties of the atmosphere at many 
+        elevations at once. The layer of each elevation is found with a binary
+        search, and every property is calculated as an array; the result is a
+        single object whose attributes are arrays, rather than one object per
+        elevation.
+
+        Parameters
+        ----------
+        Z : array-like
+            Elevations above sea level, [m]
+        dT : float or array-like, optional
+            Temperature differences from standard conditions used in 
+            determining the properties of the atmosphere, [K]
+
+        Returns
+        -------
+        atmosphere : ATMOSPHERE_1976
+            Object with the same attributes as the one created for a single 
+            elevation, but with each attribute an array of the shape of the 
+            broadcast inputs, [-]
+
+        Examples
+        --------
+        >>> atm = ATMOSPHERE_1976.evaluate([0, 5000, 20000])
+        >>> atm.P
+        array([ 101325.        ,   54048.28614576,    5529.3118923 ])
         '''
-        # Compute the elevation to obtain the pressure specified
-        def to_solve(H):
-            return ATMOSPHERE_1976(H).P - P1
-        H_ref = brenth(to_solve, -610.0, 86000)
+        Z, dT = np.broadcast_arrays(np.asarray(Z, dtype=float), 
+                                    np.asarray(dT, dtype=float))
+        self = cls.__new__(cls)
+        self.Z = Z
+        self.dT = dT
+        self.H = r0*Z/(r0 + Z)
+        
+        # Same layer as _get_ind_from_H: the last level strictly below H
+        i = np.clip(np.searchsorted(H_std_array, self.H) - 1, 0, 7)
+        self.T_layer = T_std_array[i]
+        self.T_increase = T_grad_array[i]
+        self.P_layer = P_std_array[i]
+        self.H_layer = H_std_array[i]
         
-        # Compute the temperature delta
-        dT = T1 - ATMOSPHERE_1976(H_ref).T
+        self.H_above_layer = self.H - self.H_layer
+        T = self.T_layer + self.T_increase*self.H_above_layer
         
-        def to_int(Z):
-            atm = ATMOSPHERE_1976(Z, dT=dT)
-            return atm.g*atm.rho
-        return float(quad(to_int, H_ref, H_ref+dH)[0])
+        isothermal = self.T_increase == 0
+        self.P = np.where(isothermal, 
+                          self.P_layer*np.exp(-g0*M0*self.H_above_layer/cls.R/self.T_layer),
+                          self.P_layer*(self.T_layer/T)**P_exponent_array[i])
+        self.T = T + dT
+        self.rho = cls.density(self.T, self.P)
+        self.v_sonic = cls.sonic_velocity(self.T)
+        self.mu = cls.viscosity(self.T)
+        self.k = cls.thermal_conductivity(self.T)
+        self.g = cls.gravity(Z)
+        return self
 
     def __init__(self, Z, dT=0):
         self.Z = Z
@@ -482,7 +627,101 @@ class ATMOSPHERE_NRLMSISE00(object):
         input_obj.f107A = f107_avg
         input_obj.f107 = f107
         gtd7(input_obj, flags, output_obj)
+        self._set_outputs(output_obj)
+
+    @classmethod
+    def evaluate(cls, Z, latitude=0, longitude=0, day=0, seconds=0, 
+                 f107=150., f107_avg=150., geomagnetic_disturbance_indices=None):
+        r'''Method to calculate the properties of the atmosphere for many
+        sets of inputs at once, with a NumPy implementation of the model. All
+        inputs are broadcast together, and the result is a single object whose
+        attributes are arrays, rather than one object per set of inputs. The 
+        results are the same as those of the scalar model to floating point 
+        precision.
+
+        Parameters
+        ----------
+        Z : array-like
+            Elevation, [m]
+        latitude : array-like, optional
+            Latitude, between -90 and 90 [degrees]
+        longitude : array-like, optional
+            Longitude, between -180 and 180 or 0 and 360, [degrees]
+        day : array-like, optional
+            Day of year, 0-366 [day]
+        seconds : array-like, optional
+            Seconds since start of day, in UT1 time; using UTC provides no loss
+            in accuracy [s]
+        f107 : array-like, optional
+            Daily average 10.7 cm solar flux measurement of the strength of 
+            solar emissions on the 100 MHz band centered on 2800 MHz, averaged 
+            hourly; in sfu units, which are multiples of 10^-22 W/m^2/Hz; use 
+            150 as a default [10^-22 W/m^2/Hz]
+        f107_avg : array-like, optional
+            81-day sfu average; centered on specified day if possible, 
+            otherwise use the previous days [10^-22 W/m^2/Hz]
+        geomagnetic_disturbance_indices : list of array-like, optional
+            List of the 7 `Ap` indexes described in the class documentation;
+            each may be an array [-]
+
+        Returns
+        -------
+        atmosphere : ATMOSPHERE_NRLMSISE00
+            Object with the same attributes as the one created for a single 
+            set of inputs, but with each attribute an array of the shape of the
+            broadcast inputs, [-]
+
+        Examples
+        --------
+        >>> atm = ATMOSPHERE_NRLMSISE00.evaluate([1E3, 1E4, 1E5], 45, 45, 150)
+        >>> atm.T
+        array([ 285.54408606,  227.90822813,  187.17144692])
+        '''
+        self = cls.__new__(cls)
+        self.Z = Z = np.asarray(Z, dtype=float)
+        self.latitude = latitude
+        self.longitude = longitude
+        self.day = day
+        self.seconds = seconds
+        self.f107 = f107
+        self.f107_avg = f107_avg
+        self.geomagnetic_disturbance_indices = geomagnetic_disturbance_indices
+
+        output_obj = nrlmsise_output()
+        input_obj = nrlmsise_input()
+        flags = nrlmsise_flags()
+        flags.switches = [0] + [1]*23
+        if geomagnetic_disturbance_indices:
+            aph = ap_array()
+            aph.a = geomagnetic_disturbance_indices
+            flags.switches[9] = -1
+            input_obj.ap = geomagnetic_disturbance_indices[0]
+            input_obj.ap_a = aph
         
+        seconds = np.asarray(seconds, dtype=float)
+        longitude = np.asarray(longitude, dtype=float)
+        input_obj.doy = day
+        input_obj.year = 0
+        input_obj.sec = seconds
+        input_obj.alt = Z/1000.
+        input_obj.g_lat = latitude
+        input_obj.g_long = longitude
+        input_obj.lst = seconds/3600. + longitude/15.
+        input_obj.f107A = f107_avg
+        input_obj.f107 = f107
+        gtd7_vectorized(input_obj, flags, output_obj)
+        self._set_outputs(output_obj)
+        return self
+
+    def _set_outputs(self, output_obj):
+        r'''Sets the attributes of the object from the outputs of the model,
+        converting them to SI units; works with floats or arrays.
+
+        Parameters
+        ----------
+        output_obj : nrlmsise_output
+            Outputs of the model, [-]
+        '''
         self.He_density = output_obj.d[0]*1E6 # 1/cm^3 to 1/m^3
         self.O_density = output_obj.d[1]*1E6 # 1/cm^3 to 1/m^3
         self.N2_density = output_obj.d[2]*1E6 # 1/cm^3 to 1/m^3
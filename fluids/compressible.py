@@ -24,11 +24,14 @@ from __future__ import division
 from math import log, pi, exp
 import numpy as np
 from scipy.optimize import newton, ridder
-from scipy.constants import R
+from scipy.constants import R, g
 from scipy.special import lambertw
+from fluids.numerics import bracketed_roots, linear_recurrence
 
 __all__ = ['Panhandle_A', 'Panhandle_B', 'Weymouth', 'Spitzglass_high',
-           'Spitzglass_low', 'Oliphant', 'Fritzsche', 'Muller', 'IGT', 'isothermal_gas',
+           'Spitzglass_low', 'Oliphant', 'Fritzsche', 'Muller', 'IGT', 
+           'gas_pipeline_batch', 'gas_pipeline_profile', 'isothermal_gas', 
+           'isothermal_gas_batch',
            'isothermal_work_compression', 'polytropic_exponent',
            'isentropic_work_compression', 'isentropic_efficiency',
            'isentropic_T_rise_compression', 'T_critical_flow',
@@ -898,6 +901,189 @@ pressure, downstream pressure, diameter, or length; all other inputs \
 must be provided.')
 
 
+def _isothermal_gas_m2(rho, fd, P1, P2, L, D):
+    # Square of the mass flow of `isothermal_gas`, for arrays
+    return pi**2/16*D**4*rho/P1/(fd*L/D + 2*np.log(P1/P2))*(P1**2-P2**2)
+
+
+def _isothermal_gas_critical_ratio(fd, L, D):
+    # Ratio of the critical outlet pressure to the inlet pressure, for arrays;
+    # see `P_isothermal_critical_flow`. With t = -W_{-1}(-exp(-1 - fd*L/D)), 
+    # the ratio is t**-0.5 and t - ln(t) = 1 + fd*L/D, which is iterated 
+    # directly for long pipes where the exponential would underflow.
+    y = 1.0 + fd*L/D
+    t = np.empty_like(y)
+    short = y < 100.0
+    t[short] = -lambertw(-np.exp(-y[short]), -1).real
+    long = ~short
+    t_long = y[long]
+    for _ in range(6):
+        t_long = y[long] + np.log(t_long)
+    t[long] = t_long
+    return 1.0/np.sqrt(t)
+
+
+def isothermal_gas_batch(rho, fd, P1, P2, L, D, m):
+    r'''Solves the complete isothermal flow equation of `isothermal_gas` for
+    many pipe segments at once. In each segment, exactly one of `P1`, `P2`, 
+    `L`, `D` and `m` is unknown and given as NaN; the unknown may differ 
+    between segments. All inputs are broadcast against each other.
+    
+    Unknown pressures and diameters are found with a vectorized bracketed 
+    solver, between the pressures or diameter at which the flow would be 
+    choked and the no-flow limit; the mass flow and length are solved 
+    analytically. Segments whose specification is only possible with choked
+    flow (see `P_isothermal_critical_flow`) are flagged in `choked` rather 
+    than raising an exception, and their unknown is left as NaN.
+
+    Parameters
+    ----------
+    rho : float or ndarray
+        Average density of gas in pipe, [kg/m^3]
+    fd : float or ndarray
+        Darcy friction factor for flow in pipe [-]
+    P1 : float or ndarray
+        Inlet pressure to pipe, NaN if unknown, [Pa]
+    P2 : float or ndarray
+        Outlet pressure from pipe, NaN if unknown, [Pa]
+    L : float or ndarray
+        Length of pipe, NaN if unknown, [m]
+    D : float or ndarray
+        Diameter of pipe, NaN if unknown, [m]
+    m : float or ndarray
+        Mass flow rate of gas through pipe, NaN if unknown, [kg/s]
+
+    Returns
+    -------
+    P1 : ndarray
+        Inlet pressure to pipe, [Pa]
+    P2 : ndarray
+        Outlet pressure from pipe, [Pa]
+    L : ndarray
+        Length of pipe, [m]
+    D : ndarray
+        Diameter of pipe, [m]
+    m : ndarray
+        Mass flow rate of gas through pipe, [kg/s]
+    choked : ndarray
+        Whether or not each segment's specification requires choked flow, [-]
+
+    Notes
+    -----
+    Segments specified with an outlet pressure above their inlet pressure 
+    (reverse flow) have their unknown left as NaN, and are not flagged as
+    choked.
+    
+    When solving for `D`, the flow is choked at diameters above that at 
+    which `P2` is the critical pressure; given `P1` and `P2`, the mass flow 
+    at that diameter is the highest possible without choking.
+
+    Examples
+    --------
+    >>> P1, P2, L, D, m, choked = isothermal_gas_batch(rho=11.3, fd=0.00185,
+    ...     P1=1E6, P2=[9E5, np.nan, 1E5], L=1000, D=0.5, m=[np.nan, 145., np.nan])
+    >>> m
+    array([ 145.48475726,  145.        ,           nan])
+    >>> P2
+    array([ 900000.        ,  900746.39693917,  100000.        ])
+    >>> choked
+    array([False, False,  True], dtype=bool)
+    '''
+    rho, fd, P1, P2, L, D, m = [np.array(i, dtype=float) for i in 
+                                np.broadcast_arrays(rho, fd, P1, P2, L, D, m)]
+    shape = rho.shape
+    rho, fd, P1, P2, L, D, m = [i.ravel() for i in (rho, fd, P1, P2, L, D, m)]
+    unknown = np.isnan([P1, P2, L, D, m])
+    if np.any(unknown.sum(axis=0) != 1):
+        raise Exception('Exactly one of P1, P2, L, D, and m must be NaN in '
+                        'each segment')
+    choked = np.zeros(rho.shape, dtype=bool)
+    unknown_P1, unknown_P2, unknown_L, unknown_D, unknown_m = unknown
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        i = np.nonzero(unknown_m)[0]
+        if i.size:
+            P1i, P2i = P1[i], P2[i]
+            Pcf = P1i*_isothermal_gas_critical_ratio(fd[i], L[i], D[i])
+            choked[i] = P2i < Pcf
+            ok = ~choked[i] & (P2i <= P1i)
+            m[i] = np.where(ok, np.sqrt(_isothermal_gas_m2(rho[i], fd[i], P1i, P2i, L[i], D[i])), np.nan)
+
+        i = np.nonzero(unknown_L)[0]
+        if i.size:
+            P1i, P2i, Di, m2 = P1[i], P2[i], D[i], m[i]**2
+            Li = Di*(pi**2*Di**4*rho[i]*(P1i**2 - P2i**2) - 32*P1i*m2*np.log(P1i/P2i))/(16*P1i*fd[i]*m2)
+            # Flows too large for even a pipe of no length are choked too
+            Pcf = P1i*_isothermal_gas_critical_ratio(fd[i], np.abs(Li), Di)
+            choked[i] = (Li < 0.0) | (P2i < Pcf)
+            ok = ~choked[i] & (P2i <= P1i)
+            L[i] = np.where(ok, Li, np.nan)
+
+        i = np.nonzero(unknown_P2)[0]
+        if i.size:
+            Pcf = P1[i]*_isothermal_gas_critical_ratio(fd[i], L[i], D[i])
+            m2_max = _isothermal_gas_m2(rho[i], fd[i], P1[i], Pcf, L[i], D[i])
+            m2 = m[i]**2
+            choked[i] = m2 > m2_max
+            P2[i] = np.where(choked[i], np.nan, P1[i])
+            solve = (~choked[i]) & (m2 > 0.0)
+            j = i[solve]
+            if j.size:
+                def to_solve(P2_guess, k):
+                    k = j[k]
+                    return _isothermal_gas_m2(rho[k], fd[k], P1[k], P2_guess, L[k], D[k])/m[k]**2 - 1.0
+                P2[j] = bracketed_roots(to_solve, Pcf[solve], P1[j], 
+                                        fa=m2_max[solve]/m2[solve] - 1.0,
+                                        fb=np.full(j.size, -1.0))
+
+        i = np.nonzero(unknown_P1)[0]
+        if i.size:
+            # Inlet pressure at which `P2` is the critical pressure
+            P1_max = P2[i]/_isothermal_gas_critical_ratio(fd[i], L[i], D[i])
+            m2_max = _isothermal_gas_m2(rho[i], fd[i], P1_max, P2[i], L[i], D[i])
+            m2 = m[i]**2
+            choked[i] = m2 > m2_max
+            P1[i] = np.where(choked[i], np.nan, P2[i])
+            solve = (~choked[i]) & (m2 > 0.0)
+            j = i[solve]
+            if j.size:
+                def to_solve(P1_guess, k):
+                    k = j[k]
+                    return _isothermal_gas_m2(rho[k], fd[k], P1_guess, P2[k], L[k], D[k])/m[k]**2 - 1.0
+                P1[j] = bracketed_roots(to_solve, P2[j], P1_max[solve], 
+                                        fa=np.full(j.size, -1.0),
+                                        fb=m2_max[solve]/m2[solve] - 1.0)
+
+        i = np.nonzero(unknown_D)[0]
+        if i.size:
+            x = P2[i]/P1[i]
+            # The diameter at which `P2` is the critical pressure
+            D_max = fd[i]*L[i]/(1.0/x**2 - 1.0 + 2.0*np.log(x))
+            m2_max = _isothermal_gas_m2(rho[i], fd[i], P1[i], P2[i], L[i], D_max)
+            m2 = m[i]**2
+            choked[i] = (x < 1.0) & (m2 > m2_max)
+            solve = (x < 1.0) & ~choked[i]
+            D[i] = np.nan
+            j = i[solve]
+            if j.size:
+                def to_solve(D_guess, k):
+                    k = j[k]
+                    return np.log(_isothermal_gas_m2(rho[k], fd[k], P1[k], P2[k], L[k], D_guess)/m[k]**2)
+                D_hi = D_max[solve]
+                f_hi = np.log(m2_max[solve]/m2[solve])
+                D_lo = 0.5*D_hi
+                f_lo = to_solve(D_lo, np.arange(j.size))
+                # The mass flow rises with at least the square of the diameter
+                while np.any(f_lo > 0.0):
+                    high = f_lo > 0.0
+                    D_lo[high] *= np.exp(-0.5*(0.1 + f_lo[high]))
+                    f_lo[high] = to_solve(D_lo[high], np.nonzero(high)[0])
+                D[j] = bracketed_roots(to_solve, D_lo, D_hi, fa=f_lo, fb=f_hi)
+
+    return (P1.reshape(shape), P2.reshape(shape), L.reshape(shape), 
+            D.reshape(shape), m.reshape(shape), choked.reshape(shape))
+
+
 def Panhandle_A(SG, Tavg, L=None, D=None, P1=None, P2=None, Q=None, Ts=288.7,
                 Ps=101325., Zavg=1, E=0.92):
     r'''Calculation function for dealing with flow of a compressible gas in a
@@ -1879,3 +2065,371 @@ def IGT(SG, Tavg, mu, L=None, D=None, P1=None, P2=None, Q=None, Ts=288.7,
         return (D**(-c3)*Ps*Q*SG**c4*mu**c1/(E*Ts*c5))**(-1/c2)*(P1**2 - P2**2)/(Tavg*Zavg)
     else:
         raise Exception('This function solves for either flow, upstream pressure, downstream pressure, diameter, or length; all other inputs must be provided.')
+
+
+# Constants of the pipeline equations which are power laws in the pressure
+# term and the diameter, as used in the functions of the same names: the 
+# leading constant, then the powers of Ts/Ps, SG, (P1^2 - P2^2)/L, D, and mu
+_gas_pipeline_power_laws = {
+    'Panhandle_A': (158.0205328706957220332831680508433862787, 1.0788, 
+                    0.8539*0.5394, 0.5394, 2.6182, 0.0),
+    'Panhandle_B': (152.8811634298055458624385985866624419060, 1.02, 
+                    0.961*0.51, 0.51, 2.53, 0.0),
+    'Weymouth': (137.3295809942512546732179684618143090992, 1.0, 0.5, 0.5, 
+                 2.667, 0.0),
+    'Fritzsche': (93.50009798751128188757518688244137811221, 1.0, 
+                  0.8587*0.538, 0.538, 2.69, 0.0),
+    'Muller': (15.77439908642077352939746374951659525108, 1.0, 0.425, 0.575,
+               2.725, 0.15),
+    'IGT': (24.62412451461407054875301709443930350550, 1.0, 4/9., 5/9., 8/3., 
+            1/9.),
+}
+
+# Default pipeline efficiencies of each equation
+_gas_pipeline_E = {'Panhandle_A': 0.92, 'Panhandle_B': 0.92, 'Weymouth': 0.92,
+                   'Spitzglass_high': 1., 'Spitzglass_low': 1., 
+                   'Oliphant': 0.92, 'Fritzsche': 1., 'Muller': 1., 'IGT': 1.}
+
+_Spitzglass_c3 = 1.181102362204724409448818897637795275591 # 0.03/inch or 150/127
+_Spitzglass_c4 = 0.09144
+_Spitzglass_c5 = 125.1060
+_Oliphant_c1 = 84.587176139918568651410168968141078948974609375000
+_Oliphant_c2 = 0.2091519350460528670065940559652517549694 # 1/(30.*0.0254**0.5)
+
+
+def gas_pipeline_batch(SG, Tavg, L, D, P1, P2, Q, Ts=288.7, Ps=101325., 
+                       Zavg=1, E=None, mu=None, Method='Panhandle_A'):
+    r'''Solves one of the gas pipeline equations, such as `Panhandle_A` or
+    `Weymouth`, for many pipeline legs at once. In each leg, exactly one of
+    `L`, `D`, `P1`, `P2` and `Q` is unknown and given as NaN; the unknown may
+    differ between legs. All inputs are broadcast against each other.
+    
+    Every equation is of the form :math:`Q = K (\Delta P/L)^a g(D)`, where
+    :math:`\Delta P` is :math:`P_1^2 - P_2^2` (or proportional to 
+    :math:`P_1 - P_2` for `Spitzglass_low`), so the flow, length and 
+    pressures are solved analytically, as is the diameter for equations in
+    which :math:`g(D)` is a power of the diameter. For `Spitzglass_high`, 
+    `Spitzglass_low` and `Oliphant`, the diameter is found with a vectorized
+    bracketed solver.
+
+    Parameters
+    ----------
+    SG : float or ndarray
+        Specific gravity of fluid with respect to air at the reference
+        temperature and pressure `Ts` and `Ps`, [-]
+    Tavg : float or ndarray
+        Average temperature of the fluid in the pipeline, [K]
+    L : float or ndarray
+        Length of pipe, NaN if unknown, [m]
+    D : float or ndarray
+        Diameter of pipe, NaN if unknown, [m]
+    P1 : float or ndarray
+        Inlet pressure to pipe, NaN if unknown, [Pa]
+    P2 : float or ndarray
+        Outlet pressure from pipe, NaN if unknown, [Pa]
+    Q : float or ndarray
+        Flow rate of gas through pipe, NaN if unknown, [m^3/s]
+    Ts : float or ndarray, optional
+        Reference temperature for the specific gravity of the gas, [K]
+    Ps : float or ndarray, optional
+        Reference pressure for the specific gravity of the gas, [Pa]
+    Zavg : float or ndarray, optional
+        Average compressibility factor for gas, [-]
+    E : float or ndarray, optional
+        Pipeline efficiency, a correction factor between 0 and 1; defaults 
+        to the default of the function of the selected equation, [-]
+    mu : float or ndarray, optional
+        Average viscosity of the fluid in the pipeline, required by the 
+        `Muller` and `IGT` equations only, [Pa*s]
+    Method : string, optional
+        The name of the pipeline equation's function; one of 'Panhandle_A',
+        'Panhandle_B', 'Weymouth', 'Spitzglass_high', 'Spitzglass_low', 
+        'Oliphant', 'Fritzsche', 'Muller', or 'IGT'
+
+    Returns
+    -------
+    L : ndarray
+        Length of pipe, [m]
+    D : ndarray
+        Diameter of pipe, [m]
+    P1 : ndarray
+        Inlet pressure to pipe, [Pa]
+    P2 : ndarray
+        Outlet pressure from pipe, [Pa]
+    Q : ndarray
+        Flow rate of gas through pipe, [m^3/s]
+
+    Notes
+    -----
+    Legs for which no solution exists, such as those with a flow too large 
+    to reach any positive outlet pressure, have their unknown set to NaN.
+    
+    As in its scalar function, `Oliphant` does not use `Zavg` or `E`.
+
+    Examples
+    --------
+    >>> ans = gas_pipeline_batch(SG=0.693, Tavg=277.15, L=160E3, 
+    ...     D=[0.340, np.nan], P1=90E5, P2=20E5, Q=[np.nan, 42.56082051195928])
+    >>> ans[4]
+    array([ 42.56082051,  42.56082051])
+    >>> ans[1]
+    array([ 0.34,  0.34])
+    '''
+    if Method not in _gas_pipeline_E:
+        raise Exception('Unrecognized pipeline equation %s' %Method)
+    if E is None:
+        E = _gas_pipeline_E[Method]
+    if mu is None:
+        if Method in ('Muller', 'IGT'):
+            raise Exception('The %s equation requires the viscosity `mu`' %Method)
+        mu = 1.0
+    SG, Tavg, L, D, P1, P2, Q, Ts, Ps, Zavg, E, mu = [np.array(i, dtype=float)
+        for i in np.broadcast_arrays(SG, Tavg, L, D, P1, P2, Q, Ts, Ps, Zavg, E, mu)]
+    shape = SG.shape
+    SG, Tavg, L, D, P1, P2, Q, Ts, Ps, Zavg, E, mu = [i.ravel() for i in 
+        (SG, Tavg, L, D, P1, P2, Q, Ts, Ps, Zavg, E, mu)]
+    unknown_L, unknown_D, unknown_P1, unknown_P2, unknown_Q = unknown = np.isnan([L, D, P1, P2, Q])
+    if np.any(unknown.sum(axis=0) != 1):
+        raise Exception('Exactly one of L, D, P1, P2, and Q must be NaN in '
+                        'each leg')
+    
+    # Q = K*(dP/L)**a*D_term(D)
+    if Method in _gas_pipeline_power_laws:
+        c5, c_ref, c_SG, a, b, c_mu = _gas_pipeline_power_laws[Method]
+        K = c5*E*(Ts/Ps)**c_ref*SG**-c_SG*(Tavg*Zavg)**-a*mu**-c_mu
+        D_term = lambda D: D**b
+    elif Method == 'Oliphant':
+        a = 0.5
+        K = _Oliphant_c1*Ts/Ps*(SG*Tavg)**-0.5
+        D_term = lambda D: D**2.5 + _Oliphant_c2*D**3
+    else:
+        a = 0.5
+        K = _Spitzglass_c5*E*Ts/Ps*(SG*Zavg*Tavg)**-0.5
+        D_term = lambda D: D**2.5*(1.0 + _Spitzglass_c4/D + _Spitzglass_c3*D)**-0.5
+    if Method == 'Spitzglass_low':
+        dP_factor = 2.0*(Ps + 1210.)
+        dP = dP_factor*(P1 - P2)
+    else:
+        dP = P1*P1 - P2*P2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        i = unknown_Q
+        Q[i] = K[i]*(dP[i]/L[i])**a*D_term(D[i])
+        
+        i = unknown_L
+        L[i] = dP[i]*(K[i]*D_term(D[i])/Q[i])**(1.0/a)
+        
+        i = unknown_P1 | unknown_P2
+        dP[i] = L[i]*(Q[i]/(K[i]*D_term(D[i])))**(1.0/a)
+        if Method == 'Spitzglass_low':
+            P1[unknown_P1] = P2[unknown_P1] + dP[unknown_P1]/dP_factor[unknown_P1]
+            P2[unknown_P2] = P1[unknown_P2] - dP[unknown_P2]/dP_factor[unknown_P2]
+            P2[P2 < 0.0] = np.nan
+        else:
+            P1[unknown_P1] = np.sqrt(P2[unknown_P1]**2 + dP[unknown_P1])
+            P2[unknown_P2] = np.sqrt(P1[unknown_P2]**2 - dP[unknown_P2])
+        
+        i = np.nonzero(unknown_D)[0]
+        # The value of g(D) which gives the flow rate
+        target = Q[i]/(K[i]*(dP[i]/L[i])**a)
+        solve = i[target > 0.0]
+        target = target[target > 0.0]
+        D[i] = np.nan
+        if Method in _gas_pipeline_power_laws:
+            D[solve] = target**(1.0/b)
+        elif solve.size and Method == 'Oliphant':
+            # With s = D**0.5, s**5 + c2*s**6 = g
+            c2 = _Oliphant_c2
+            low = target/(1.0 + c2)
+            s_lo = np.minimum(low**0.2, low**(1/6.))
+            s_hi = np.minimum(target**0.2, (target/c2)**(1/6.))
+            to_solve = lambda s, k: np.log(s**5 + c2*s**6) - np.log(target[k])
+            D[solve] = bracketed_roots(to_solve, s_lo, s_hi)**2
+        elif solve.size:
+            # D**6 = g**2*(c3*D**2 + D + c4); bounded by ignoring all but c4, 
+            # and for D > 1 by replacing D**2 and D by D**2
+            c3, c4 = _Spitzglass_c3, _Spitzglass_c4
+            t = target*target
+            D_lo = (t*c4)**(1/6.)
+            D_hi = np.maximum(1.0, (t*(c3 + 1.0 + c4))**0.25)
+            to_solve = lambda D, k: 6.0*np.log(D) - np.log(t[k]*(c3*D*D + D + c4))
+            D[solve] = bracketed_roots(to_solve, D_lo, D_hi)
+    return (L.reshape(shape), D.reshape(shape), P1.reshape(shape), 
+            P2.reshape(shape), Q.reshape(shape))
+
+
+def _friction_factors(Re, eD, Method):
+    # Pipelines are mostly long runs of segments of the same pipe carrying
+    # the same flow, so the friction factor is calculated once per run
+    from fluids.friction import friction_factor
+    change = np.empty(Re.shape, dtype=bool)
+    change[0] = True
+    change[1:] = (Re[1:] != Re[:-1]) | (eD[1:] != eD[:-1])
+    starts = np.nonzero(change)[0]
+    if starts.size > 1000:
+        from fluids.vectorized import friction_factor as friction_factor_array
+        fds = friction_factor_array(Re[starts], eD[starts], Method=Method)
+    else:
+        fds = np.array([friction_factor(Re=Re_i, eD=eD_i, Method=Method) for 
+                        Re_i, eD_i in zip(Re[starts].tolist(), eD[starts].tolist())])
+    return fds[np.cumsum(change) - 1]
+
+
+def gas_pipeline_profile(m, L, D, T1, MW, mu, P1=None, P2=None, dz=0.0, 
+                         roughness=0.0, Zavg=1.0, ratio=1.0, k=None, eta=1.0, 
+                         U=0.0, T_ground=None, fd=None, Method='Clamond'):
+    r'''Calculates the pressure and temperature profile of a gas pipeline
+    made of many segments in series, each of which may have its own length,
+    diameter, roughness, elevation change, and a compressor at its inlet. 
+    Either the inlet pressure is specified and the profile marched forward, 
+    or the outlet pressure is specified and the required inlet pressure
+    back-calculated.
+    
+    Each segment is treated as isothermal at the average of its inlet and 
+    outlet temperatures, with the ideal gas law corrected by `Zavg`, and
+    with the change in kinetic energy neglected [1]_:
+    
+    .. math::
+        P_{out}^2 = e^{-s} P_{in}^2 - f_d \frac{L}{D}\left(\frac{4\dot m}
+        {\pi D^2}\right)^2 \frac{Z R T}{MW} \frac{1 - e^{-s}}{s}
+        
+    .. math::
+        s = \frac{2 g \cdot MW \Delta z}{Z R T}
+    
+    The temperature rises across each compressor as in 
+    `isentropic_T_rise_compression`, and then relaxes towards the ground 
+    temperature along each segment:
+    
+    .. math::
+        T_{out} = T_{ground} + (T_{in} - T_{ground})\exp\left(
+        \frac{-U \pi D L}{\dot m C_p}\right)
+    
+    Both are linear recurrences (in :math:`P^2` and in `T`), and are 
+    evaluated for every segment at once with `linear_recurrence`. As the 
+    Reynolds number of each segment does not depend on pressure, friction
+    factors are calculated only once for each run of identical segments, 
+    and are returned so they can be passed back in to reuse them for other
+    pressures.
+
+    Parameters
+    ----------
+    m : float
+        Mass flow rate of gas through the pipeline, [kg/s]
+    L : float or ndarray
+        Length of each segment, [m]
+    D : float or ndarray
+        Diameter of each segment, [m]
+    T1 : float
+        Temperature of the gas at the inlet of the pipeline, [K]
+    MW : float
+        Molecular weight of the gas, [g/mol]
+    mu : float or ndarray
+        Viscosity of the gas in each segment, [Pa*s]
+    P1 : float, optional
+        Pressure at the inlet of the pipeline, [Pa]
+    P2 : float, optional
+        Pressure at the outlet of the pipeline, [Pa]
+    dz : float or ndarray, optional
+        Rise in elevation along each segment, [m]
+    roughness : float or ndarray, optional
+        Roughness of each segment, [m]
+    Zavg : float or ndarray, optional
+        Average compressibility factor of the gas in each segment, [-]
+    ratio : float or ndarray, optional
+        Pressure ratio of the compressor at the inlet of each segment, 1 for
+        no compressor, [-]
+    k : float, optional
+        Isentropic exponent of the gas, required for compression or heat 
+        transfer, [-]
+    eta : float or ndarray, optional
+        Isentropic efficiency of each compressor, [-]
+    U : float or ndarray, optional
+        Overall heat transfer coefficient of each segment, based on its 
+        inner surface area, [W/m^2/K]
+    T_ground : float or ndarray, optional
+        Temperature surrounding each segment; defaults to `T1`, [K]
+    fd : float or ndarray, optional
+        Darcy friction factor of each segment, if known, [-]
+    Method : string, optional
+        Method of `friction_factor` to use to calculate friction factors
+
+    Returns
+    -------
+    P : ndarray
+        Pressure at the inlet of each segment, before its compressor, and at
+        the outlet of the pipeline, [Pa]
+    T : ndarray
+        Temperature at the inlet of each segment, before its compressor, and 
+        at the outlet of the pipeline, [K]
+    fd : ndarray
+        Darcy friction factor of each segment, [-]
+
+    Notes
+    -----
+    When marching forward, every pressure after the flow is no longer 
+    possible (a pressure falling to zero) is NaN. The Joule-Thomson effect 
+    is not included. Where kinetic energy matters, as for short pipes with
+    large pressure drops, use `isothermal_gas`.
+    
+    The heat capacity of the gas is that of an ideal gas with the 
+    isentropic exponent `k`.
+
+    Examples
+    --------
+    Two 50 km segments, the second rising 200 m, with a compressor between:
+    
+    >>> P, T, fd = gas_pipeline_profile(m=20., L=[5E4, 5E4], D=0.4, T1=300., 
+    ...     MW=18., mu=1.1E-5, P1=7E6, dz=[0., 200.], ratio=[1., 1.4], k=1.3,
+    ...     roughness=4.5E-5)
+    >>> P
+    array([ 7000000.        ,  6595288.42907643,  8785354.6800091 ])
+    >>> T
+    array([ 300.        ,  300.        ,  324.22246932])
+
+    References
+    ----------
+    .. [1] Menon, E. Shashi. Gas Pipeline Hydraulics. 1st edition. Boca Raton,
+       FL: CRC Press, 2005.
+    '''
+    if (P1 is None) == (P2 is None):
+        raise Exception('Either the inlet pressure or the outlet pressure '
+                        'must be specified, but not both')
+    if T_ground is None:
+        T_ground = T1
+    L, D, mu, dz, roughness, Zavg, ratio, eta, U, T_ground = [
+        np.array(i, dtype=float) for i in np.broadcast_arrays(
+        np.atleast_1d(L), D, mu, dz, roughness, Zavg, ratio, eta, U, T_ground)]
+    M = MW/1000.
+    if fd is None:
+        fd = _friction_factors(4.0*m/(pi*D*mu), roughness/D, Method)
+    else:
+        fd = np.array(np.broadcast_to(fd, L.shape), dtype=float)
+
+    compressed = np.any(ratio != 1.0)
+    heat_transfer = np.any(U != 0.0)
+    if (compressed or heat_transfer) and k is None:
+        raise Exception('The isentropic exponent `k` is required for '
+                        'compression or heat transfer')
+    rise = 1.0 + (ratio**((k - 1.0)/k) - 1.0)/eta if compressed else 1.0
+    if heat_transfer:
+        Cp = k/(k - 1.0)*R/M
+        decay = np.exp(-U*pi*D*L/(m*Cp))
+    else:
+        decay = np.ones(L.shape)
+    T = linear_recurrence(decay*rise, (1.0 - decay)*T_ground, T1)
+    T_avg = 0.5*(T[:-1]*rise + T[1:])
+
+    RT_M = Zavg*R*T_avg/M
+    s = 2.0*g*dz/RT_M
+    with np.errstate(divide='ignore', invalid='ignore'):
+        elevation = np.where(s == 0.0, 1.0, -np.expm1(-s)/s)
+    G = 4.0*m/(pi*D*D)
+    friction = fd*G*G*RT_M*L/D*elevation
+    a = np.exp(-s)*ratio*ratio
+    if P1 is not None:
+        P_squared = linear_recurrence(a, -friction, P1*P1)
+        P_squared[np.logical_or.accumulate(~(P_squared > 0.0))] = np.nan
+    else:
+        P_squared = linear_recurrence(1.0/a[::-1], friction[::-1]/a[::-1], 
+                                      P2*P2)[::-1]
+    return np.sqrt(P_squared), T, fd
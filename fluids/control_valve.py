@@ -22,12 +22,15 @@ SOFTWARE.'''
 
 from __future__ import division
 from math import log10, exp, pi
+import numpy as np
 from scipy.constants import R, psi, gallon, minute
-from scipy.interpolate import UnivariateSpline, interp1d
+from fluids.numerics import LinearInterpolator, SplineInterpolator, bracketed_roots
 from scipy.optimize import brenth
 from fluids.fittings import Cv_to_Kv, Kv_to_Cv
 
-__all__ = ['size_control_valve_l', 'size_control_valve_g', 'cavitation_index',
+__all__ = ['size_control_valve_l', 'size_control_valve_g', 
+           'size_control_valve_l_batch', 'size_control_valve_g_batch',
+           'cavitation_index',
            'FF_critical_pressure_ratio_l', 'is_choked_turbulent_l', 
            'is_choked_turbulent_g', 'Reynolds_valve', 
            'loss_coefficient_piping', 'Reynolds_factor',
@@ -35,7 +38,7 @@ __all__ = ['size_control_valve_l', 'size_control_valve_g', 'cavitation_index',
            'Cv_char_equal_percentage',
            'convert_flow_coefficient', 'control_valve_choke_P_l',
            'control_valve_choke_P_g', 'control_valve_noise_l_2015',
-           'control_valve_noise_g_2011']
+           'control_valve_noise_g_2011', 'ControlValveCatalog']
 
 N1 = 0.1 # m^3/hr, kPa
 N2 = 1.6E-3 # mm
@@ -885,18 +888,366 @@ def size_control_valve_g(T, MW, mu, gamma, Z, P1, P2, Q, D1=None, D2=None,
 
 
 
+def _loss_coefficients_piping_array(d, D1, D2):
+    # Array form of `loss_coefficient_piping`, for both reducers and for
+    # the inlet reducer only
+    loss_upstream = 1. - (d/D1)**4 + 0.5*(1. - (d/D1)**2)**2
+    loss = loss_upstream + (1. - (d/D2)**2)**2 - (1. - (d/D2)**4)
+    return loss, loss_upstream
+
+
+def _Reynolds_factor_array(FL, C, d, Rev):
+    # Array form of `Reynolds_factor`, choosing full or reduced trim as the
+    # sizing functions do
+    reduced = C/d**2 > 0.016*N18
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n1 = N2/np.minimum(C/d**2, 0.04)**2
+        n2 = 1 + N32*(C/d**2)**(2/3.)
+        n = np.where(reduced, n2, n1)
+        FR_a = 1 + (0.33*FL**0.5)/n**0.25*np.log10(Rev/10000.)
+        FR_b = 0.026/FL*(n*Rev)**0.5
+    FR_b = np.where(reduced, np.minimum(FR_b, 1), FR_b)
+    return np.where(Rev < 10, FR_b, np.minimum(FR_a, FR_b))
+
+
+def _iterate_laminar_array(C, nu, Q, D1, FL, Fd, d):
+    # Increases each flow coefficient by 30% until the Reynolds number 
+    # factor no longer requires more, as in the scalar sizing functions
+    Ci = 1.3*C
+    Rev = Reynolds_valve(nu=nu, Q=Q, D1=D1, FL=FL, Fd=Fd, C=Ci)
+    FR = _Reynolds_factor_array(FL, Ci, d, Rev)
+    active = np.nonzero(C/FR >= Ci)[0]
+    while active.size:
+        C[active] = Ci[active]
+        Ci[active] = 1.3*C[active]
+        j = active
+        Rev[j] = Reynolds_valve(nu=nu[j], Q=Q[j], D1=D1[j], FL=FL[j], Fd=Fd[j], C=Ci[j])
+        FR[j] = _Reynolds_factor_array(FL[j], Ci[j], d[j], Rev[j])
+        active = active[C[j]/FR[j] >= Ci[j]]
+    return Ci, Rev, FR
+
+
+def _batch_inputs(*args):
+    # Broadcasts the inputs of the batch sizing functions to flat float
+    # arrays; diameters which are None become NaN
+    args = [np.nan if i is None else i for i in args]
+    arrays = np.broadcast_arrays(*args)
+    shape = arrays[0].shape
+    return shape, [np.array(i, dtype=float).ravel() for i in arrays]
+
+
+_size_control_valve_l_fields = [('Kv', float), ('Rev', float), 
+                                ('choked', bool), ('laminar', bool), 
+                                ('FF', float), ('FP', float), ('FLP', float),
+                                ('FR', float), ('converged', bool)]
+
+
+def size_control_valve_l_batch(rho, Psat, Pc, mu, P1, P2, Q, D1=None, 
+                               D2=None, d=None, FL=0.9, Fd=1, 
+                               allow_choked=True, allow_laminar=True,
+                               full_output=False):
+    r'''Calculates the flow coefficients of control valves passing a liquid
+    according to IEC 60534, for many valves or operating cases at once. The
+    calculation is that of `size_control_valve_l`, with every input able to
+    be an array; all inputs are broadcast against each other. The iterations
+    for attached fittings and for laminar flow continue until every case has
+    converged, operating only on the cases which have not.
+
+    Parameters
+    ----------
+    rho : float or ndarray
+        Density of the liquid at the inlet [kg/m^3]
+    Psat : float or ndarray
+        Saturation pressure of the fluid at inlet temperature [Pa]
+    Pc : float or ndarray
+        Critical pressure of the fluid [Pa]
+    mu : float or ndarray
+        Viscosity of the fluid [Pa*s]
+    P1 : float or ndarray
+        Inlet pressure of the fluid before valves and reducers [Pa]
+    P2 : float or ndarray
+        Outlet pressure of the fluid after valves and reducers [Pa]
+    Q : float or ndarray
+        Volumetric flow rate of the fluid [m^3/s]
+    D1 : float or ndarray, optional
+        Diameter of the pipe before the valve [m]
+    D2 : float or ndarray, optional
+        Diameter of the pipe after the valve [m]
+    d : float or ndarray, optional
+        Diameter of the valve; cases where it is NaN are sized without 
+        diameters [m]
+    FL : float or ndarray, optional
+        Liquid pressure recovery factor of a control valve without attached 
+        fittings []
+    Fd : float or ndarray, optional
+        Valve style modifier []
+    allow_choked : bool or ndarray, optional
+        Overrides the automatic transition into the choked regime if this is
+        False and returns as if choked flow does not exist
+    allow_laminar : bool or ndarray, optional
+        Overrides the automatic transition into the laminar regime if this is
+        False and returns as if laminar flow does not exist
+    full_output : bool, optional
+        If True, returns a structured array with the fields 'Kv', 'Rev', 
+        'choked', 'laminar', 'FF', 'FP', 'FLP', 'FR', and 'converged'; 
+        factors not used in a case's calculation are NaN.
+
+    Returns
+    -------
+    Kv : ndarray
+        Metric Kv valve flow coefficient (flow rate of water at a pressure drop  
+        of 1 bar) [m^3/hr]
+
+    Notes
+    -----
+    In the full output, `FP`, `FLP`, `FR`, `Rev`, and `choked` are those of 
+    the final iteration, at the returned flow coefficient.
+    
+    For some cases with attached fittings, the flow coefficient increases 
+    without bound and `size_control_valve_l` recurses until Python's 
+    recursion limit. Here iterations stop once the flow coefficient exceeds
+    1E40, as in `size_control_valve_g`, or after 100 iterations, and 
+    'converged' is False. Unlike in `size_control_valve_g`, which stops 
+    after 20, some cases which do converge need more than 20 iterations.
+
+    Examples
+    --------
+    Examples 1 and 2 of [1]_ at once:
+
+    >>> size_control_valve_l_batch(rho=965.4, Psat=70.1E3, Pc=22120E3, 
+    ... mu=3.1472E-4, P1=680E3, P2=220E3, Q=0.1, D1=[0.15, 0.1], 
+    ... D2=[0.15, 0.1], d=[0.15, 0.1], FL=[0.9, 0.6], Fd=[0.46, 0.98])
+    array([ 164.99547637,  238.05817217])
+
+    References
+    ----------
+    .. [1] IEC 60534-2-1 / ISA-75.01.01-2007
+    '''
+    MAX_C_POSSIBLE = 1E40 # Quit iterations if C reaches this high
+    MAX_ITER = 100
+    shape, (rho, Psat, Pc, mu, P1, P2, Q, D1, D2, d, FL, Fd, allow_choked, 
+            allow_laminar) = _batch_inputs(rho, Psat, Pc, mu, P1, P2, Q, D1, 
+                                           D2, d, FL, Fd, allow_choked, 
+                                           allow_laminar)
+    allow_choked, allow_laminar = allow_choked != 0.0, allow_laminar != 0.0
+    # Pa to kPa, according to constants in standard
+    P1, P2, Psat, Pc = P1/1000., P2/1000., Psat/1000., Pc/1000.
+    Q = Q*3600. # m^3/s to m^3/hr, according to constants in standard
+    nu = mu/rho # kinematic viscosity used in standard
+    D1, D2, d = D1*1000., D2*1000., d*1000.
+
+    dP = P1 - P2
+    FF = FF_critical_pressure_ratio_l(Psat=Psat, Pc=Pc)
+    choked = dP >= FL**2*(P1 - FF*Psat)
+    C = np.where(choked & allow_choked, 
+                 Q/N1/FL*(rho/rho0/(P1 - FF*Psat))**0.5, # Choked, eq 3
+                 Q/N1*(rho/rho0/dP)**0.5) # Non-choked, eq 1
+    # Assume turbulent if no diameters are provided
+    no_diameters = np.isnan(d)
+    Rev = np.where(no_diameters, 1e5, Reynolds_valve(nu=nu, Q=Q, D1=D1, FL=FL, Fd=Fd, C=C))
+    laminar = Rev <= 10000
+    piping = ~no_diameters & (~laminar | ~allow_laminar) & ((D1 != d) | (D2 != d))
+    laminar_path = ~no_diameters & ~piping & laminar & allow_laminar
+    FP, FLP, FR = np.full(C.shape, np.nan), np.full(C.shape, np.nan), np.full(C.shape, np.nan)
+    converged = np.ones(C.shape, dtype=bool)
+
+    # Attached fittings; repeat while the flow coefficient rises over 1%
+    active = np.nonzero(piping)[0]
+    iterations = 0
+    while active.size:
+        j = active
+        Ci, dj = C[j], d[j]
+        loss, loss_upstream = _loss_coefficients_piping_array(dj, D1[j], D2[j])
+        FP[j] = (1 + loss/N2*(Ci/dj**2)**2)**-0.5
+        FLP[j] = FL[j]*(1 + FL[j]**2/N2*loss_upstream*(Ci/dj**2)**2)**-0.5
+        choked[j] = dP[j] >= (FLP[j]/FP[j])**2*(P1[j] - FF[j]*Psat[j])
+        C[j] = np.where(choked[j], 
+                        Q[j]/N1/FLP[j]*(rho[j]/rho0/(P1[j] - FF[j]*Psat[j]))**0.5,
+                        Q[j]/N1/FP[j]*(rho[j]/rho0/dP[j])**0.5) # Equation 4
+        grew = Ci/C[j] < 0.99
+        diverged = grew & ((C[j] >= MAX_C_POSSIBLE) | (iterations == MAX_ITER))
+        converged[j[diverged]] = False
+        active = j[grew & ~diverged]
+        iterations += 1
+
+    j = np.nonzero(laminar_path)[0]
+    if j.size:
+        C[j], Rev[j], FR[j] = _iterate_laminar_array(C[j], nu[j], Q[j], D1[j], 
+                                                     FL[j], Fd[j], d[j])
+    if not full_output:
+        return C.reshape(shape)
+    ans = np.empty(shape, dtype=_size_control_valve_l_fields)
+    for name, value in zip(('Kv', 'Rev', 'choked', 'laminar', 'FF', 'FP', 'FLP', 'FR', 'converged'),
+                           (C, Rev, choked, laminar, FF, FP, FLP, FR, converged)):
+        ans[name] = value.reshape(shape)
+    return ans
+
+
+_size_control_valve_g_fields = [('Kv', float), ('Rev', float), 
+                                ('choked', bool), ('laminar', bool), 
+                                ('Y', float), ('FP', float), ('xTP', float),
+                                ('FR', float), ('converged', bool)]
+
+
+def size_control_valve_g_batch(T, MW, mu, gamma, Z, P1, P2, Q, D1=None, 
+                               D2=None, d=None, FL=0.9, Fd=1, xT=0.7, 
+                               allow_choked=True, allow_laminar=True, 
+                               full_output=False):
+    r'''Calculates the flow coefficients of control valves passing a gas
+    according to IEC 60534, for many valves or operating cases at once. The
+    calculation is that of `size_control_valve_g`, with every input able to
+    be an array; all inputs are broadcast against each other. The iterations
+    for attached fittings and for laminar flow continue until every case has
+    converged, operating only on the cases which have not.
+
+    Parameters
+    ----------
+    T : float or ndarray
+        Temperature of the gas at the inlet [K]
+    MW : float or ndarray
+        Molecular weight of the gas [g/mol]
+    mu : float or ndarray
+        Viscosity of the fluid at inlet conditions [Pa*s]
+    gamma : float or ndarray
+        Specific heat capacity ratio [-]
+    Z : float or ndarray
+        Compressibility factor at inlet conditions, [-]
+    P1 : float or ndarray
+        Inlet pressure of the gas before valves and reducers [Pa]
+    P2 : float or ndarray
+        Outlet pressure of the gas after valves and reducers [Pa]
+    Q : float or ndarray
+        Volumetric flow rate of the gas at *273.15 K* and 1 atm specifically
+        [m^3/s]
+    D1 : float or ndarray, optional
+        Diameter of the pipe before the valve [m]
+    D2 : float or ndarray, optional
+        Diameter of the pipe after the valve [m]
+    d : float or ndarray, optional
+        Diameter of the valve; cases where it is NaN are sized without 
+        diameters [m]
+    FL : float or ndarray, optional
+        Liquid pressure recovery factor of a control valve without attached 
+        fittings []
+    Fd : float or ndarray, optional
+        Valve style modifier []
+    xT : float or ndarray, optional
+        Pressure difference ratio factor of a valve without fittings at choked
+        flow [-]
+    allow_choked : bool or ndarray, optional
+        Overrides the automatic transition into the choked regime if this is
+        False and returns as if choked flow does not exist
+    allow_laminar : bool or ndarray, optional
+        Overrides the automatic transition into the laminar regime if this is
+        False and returns as if laminar flow does not exist
+    full_output : bool, optional
+        If True, returns a structured array with the fields 'Kv', 'Rev', 
+        'choked', 'laminar', 'Y', 'FP', 'xTP', 'FR', and 'converged'; 
+        factors not used in a case's calculation are NaN, and 'converged' is
+        False where `size_control_valve_g` would give a warning.
+
+    Returns
+    -------
+    Kv : ndarray
+        Metric Kv valve flow coefficient (flow rate of water at a pressure drop  
+        of 1 bar) [m^3/hr]
+
+    Notes
+    -----
+    In the full output, `FP`, `xTP`, `FR`, `Rev`, and `choked` are those of 
+    the final iteration, at the returned flow coefficient.
+
+    Examples
+    --------
+    Example 3 of [1]_ at three outlet pressures:
+
+    >>> size_control_valve_g_batch(T=433., MW=44.01, mu=1.4665E-4, gamma=1.30,
+    ... Z=0.988, P1=680E3, P2=[310E3, 400E3, 500E3], Q=38/36., D1=0.08, 
+    ... D2=0.1, d=0.05, FL=0.85, Fd=0.42, xT=0.60)
+    array([ 72.58664545,  75.40102122,  88.46833476])
+
+    References
+    ----------
+    .. [1] IEC 60534-2-1 / ISA-75.01.01-2007
+    '''
+    MAX_C_POSSIBLE = 1E40 # Quit iterations if C reaches this high
+    MAX_ITER = 20
+    shape, (T, MW, mu, gamma, Z, P1, P2, Q, D1, D2, d, FL, Fd, xT, allow_choked,
+            allow_laminar) = _batch_inputs(T, MW, mu, gamma, Z, P1, P2, Q, D1, 
+                                           D2, d, FL, Fd, xT, allow_choked, 
+                                           allow_laminar)
+    allow_choked, allow_laminar = allow_choked != 0.0, allow_laminar != 0.0
+    # Pa to kPa, according to constants in standard
+    P1, P2 = P1/1000., P2/1000.
+    Q = Q*3600. # m^3/s to m^3/hr, according to constants in standard
+    # Convert dynamic viscosity to kinematic viscosity
+    Vm = Z*R*T/(P1*1000)
+    rho = (Vm)**-1*MW/1000.
+    nu = mu/rho # kinematic viscosity used in standard
+    D1, D2, d = D1*1000., D2*1000., d*1000.
+
+    dP = P1 - P2
+    Fgamma = gamma/1.40
+    x = dP/P1
+    Y = np.maximum(1 - x/(3*Fgamma*xT), 2/3.)
+    choked = x >= Fgamma*xT
+    C = np.where(choked & allow_choked, 
+                 Q/(N9*P1*Y)*(MW*T*Z/xT/Fgamma)**0.5, # Choked, eq 14a
+                 Q/(N9*P1*Y)*(MW*T*Z/x)**0.5) # Non-choked, eq 8a
+    # Assume turbulent if no diameters are provided
+    no_diameters = np.isnan(d)
+    Rev = Reynolds_valve(nu=nu, Q=Q, D1=D1, FL=FL, Fd=Fd, C=C)
+    laminar = np.where(no_diameters, False, Rev <= 10000)
+    piping = ~no_diameters & (~laminar | ~allow_laminar) & ((D1 != d) | (D2 != d))
+    laminar_path = ~no_diameters & ~piping & laminar & allow_laminar
+    FP, xTP, FR = np.full(C.shape, np.nan), np.full(C.shape, np.nan), np.full(C.shape, np.nan)
+    converged = np.ones(C.shape, dtype=bool)
+
+    # Attached fittings; repeat while the flow coefficient rises over 1%
+    active = np.nonzero(piping)[0]
+    iterations = 0
+    while active.size:
+        j = active
+        Ci, dj = C[j], d[j]
+        loss, loss_upstream = _loss_coefficients_piping_array(dj, D1[j], D2[j])
+        FP[j] = (1. + loss/N2*(Ci/dj**2)**2)**-0.5
+        xTP[j] = xT[j]/FP[j]**2/(1 + xT[j]*loss_upstream/N5*(Ci/dj**2)**2)
+        choked[j] = x[j] >= Fgamma[j]*xTP[j]
+        C[j] = np.where(choked[j],
+                        Q[j]/(N9*FP[j]*P1[j]*Y[j])*(MW[j]*T[j]*Z[j]/xTP[j]/Fgamma[j])**0.5, # eq 17a
+                        Q[j]/(N9*FP[j]*P1[j]*Y[j])*(MW[j]*T[j]*Z[j]/x[j])**0.5) # eq 11a
+        if iterations == MAX_ITER:
+            converged[j] = False
+        converged[j[Ci >= MAX_C_POSSIBLE]] = False
+        active = j[(Ci/C[j] < 0.99) & (Ci < MAX_C_POSSIBLE)] if iterations < MAX_ITER else j[:0]
+        iterations += 1
+
+    j = np.nonzero(laminar_path)[0]
+    if j.size:
+        C[j], Rev[j], FR[j] = _iterate_laminar_array(C[j], nu[j], Q[j], D1[j], 
+                                                     FL[j], Fd[j], d[j])
+    if not full_output:
+        return C.reshape(shape)
+    Rev[no_diameters] = np.nan
+    ans = np.empty(shape, dtype=_size_control_valve_g_fields)
+    for name, value in zip(('Kv', 'Rev', 'choked', 'laminar', 'Y', 'FP', 'xTP', 'FR', 'converged'),
+                           (C, Rev, choked, laminar, Y, FP, xTP, FR, converged)):
+        ans[name] = value.reshape(shape)
+    return ans
+
+
 # Valve data from Emerson Valve Handbook 5E
 opening_quick = [0.0, 0.0136, 0.02184, 0.03256, 0.04575, 0.06221, 0.07459, 0.0878, 0.10757, 0.12654, 0.14301, 0.16032, 0.18009, 0.18999, 0.20233, 0.23105, 0.25483, 0.28925, 0.32365, 0.36541, 0.42188, 0.46608, 0.53319, 0.61501, 0.7034, 0.78033, 0.84415, 0.91944, 1.000]
 frac_CV_quick = [0.0, 0.04984, 0.07582, 0.12044, 0.16614, 0.21707, 0.26998, 0.32808, 0.39353, 0.46516, 0.52125, 0.58356, 0.64798, 0.68845, 0.72277, 0.76565, 0.79399, 0.82459, 0.84589, 0.86732, 0.88078, 0.89399, 0.90867, 0.92053, 0.93973, 0.95872, 0.96817, 0.98611, 1.0]
-Cv_char_quick_opening = UnivariateSpline(opening_quick, frac_CV_quick, s=0.0)
+Cv_char_quick_opening = SplineInterpolator(opening_quick, frac_CV_quick, s=0.0)
 
 opening_linear = [0., 1.0]
 frac_CV_linear = [0, 1]
-Cv_char_linear = interp1d(opening_linear, frac_CV_linear, kind='linear')
+Cv_char_linear = LinearInterpolator(opening_linear, frac_CV_linear)
 
 opening_equal = [0.0, 0.05523, 0.09287, 0.15341, 0.18942, 0.22379, 0.25816, 0.29582, 0.33348, 0.34985, 0.3826, 0.45794, 0.49235, 0.51365, 0.54479, 0.57594, 0.60218, 0.62843, 0.77628, 0.796, 0.83298, 0.86995, 0.90936, 0.95368, 1.00]
 frac_CV_equal = [0.0, 0.00845, 0.01339, 0.01877, 0.02579, 0.0349, 0.04189, 0.05528, 0.07079, 0.07533, 0.09074, 0.13444, 0.15833, 0.17353, 0.20159, 0.23388, 0.26819, 0.30461, 0.60113, 0.64588, 0.72583, 0.80788, 0.87519, 0.94999, 1.]
-Cv_char_equal_percentage = UnivariateSpline(opening_equal, frac_CV_equal, s=0.0)
+Cv_char_equal_percentage = SplineInterpolator(opening_equal, frac_CV_equal, s=0.0)
 
 
 def convert_flow_coefficient(flow_coefficient, old_scale, new_scale):
@@ -959,6 +1310,348 @@ def convert_flow_coefficient(flow_coefficient, old_scale, new_scale):
     return ans
 
 
+def _characteristic_curves():
+    return (Cv_char_linear, Cv_char_equal_percentage, Cv_char_quick_opening)
+
+
+def _Kv_bound_expander(Kv, d):
+    # Largest flow coefficient of the simple equation for which a valve with 
+    # an expander, with the smallest combined loss coefficient of -0.5, needs 
+    # no more than `Kv`; C*FP^-1 >= C*(1 - 0.5/N2*(C/d^2)^2)^0.5 rises to a
+    # peak at C = d^2*N2^0.5, and valves which pass the peak are never pruned.
+    # Beyond the peak the piping geometry factor is outside the standard.
+    a = 0.5/N2/(d*1000.)**4
+    disc = 1.0 - 4.0*a*Kv*Kv
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(disc > 0.0, ((1.0 - np.sqrt(np.abs(disc)))/(2.0*a))**0.5,
+                        np.inf)
+
+
+class ControlValveCatalog(object):
+    r'''Class representing a vendor catalog of control valve trims, for 
+    selecting the smallest trim able to pass every one of a set of operating
+    cases at a target opening. The data of the trims is stored as columns
+    of arrays, so catalogs of hundreds of thousands of trims can be searched
+    in milliseconds.
+    
+    A trim no larger than the pipes around it passes an operating case if 
+    the flow coefficient required by the case, as calculated by 
+    `size_control_valve_l_batch` or `size_control_valve_g_batch` with the 
+    trim's own `d`, `FL`, `Fd`, and `xT`, converges and is no more than its
+    capacity at the target opening:
+    
+    .. math::
+        K_{v,required} \le K_v f(\text{opening})
+    
+    where :math:`f` is the trim's inherent characteristic; one of 
+    `Cv_char_linear`, `Cv_char_equal_percentage`, or `Cv_char_quick_opening`.
+    
+    Choking, attached reducers, and viscosity can each only raise the 
+    required flow coefficient above that of the turbulent, non-choked 
+    equation with no fittings. An expander after the valve can lower it, but
+    the combined loss coefficient of the fittings is never below -0.5, which
+    bounds the flow coefficient of the simple equation of any case a trim 
+    passes. The trims are indexed by that bound, sorted; only those with a
+    bound above the largest flow coefficient of the simple equation over all
+    the cases are sized, in order of capacity, until one passes every case.
+    
+    Parameters
+    ----------
+    Kv : list[float]
+        Metric Kv valve flow coefficient of each trim when fully open (flow 
+        rate of water at a pressure drop of 1 bar) [m^3/hr]
+    d : list[float]
+        Diameter of each valve [m]
+    FL : list[float], optional
+        Liquid pressure recovery factor of each trim without attached 
+        fittings []
+    Fd : list[float], optional
+        Valve style modifier of each trim []
+    xT : list[float], optional
+        Pressure difference ratio factor of each trim without attached 
+        fittings []
+    characteristic : str or list, optional
+        Inherent characteristic of each trim; one of 'linear', 
+        'equal percentage', or 'quick opening', [-]
+    
+    Attributes
+    ----------
+    Kv_bound : ndarray
+        Largest flow coefficient of the turbulent, non-choked equation with 
+        no fittings of any case each trim can pass, sorted in ascending order
+        [m^3/hr]
+    index : ndarray
+        Indexes of the trims in the order of `Kv_bound`
+    
+    Notes
+    -----
+    Catalogs in the `Cv` scale can be converted with 
+    `convert_flow_coefficient`. The trims need not be sorted; the indexes 
+    returned are those of the trims as given.
+    
+    Examples
+    --------
+    >>> catalog = ControlValveCatalog(Kv=[120., 300., 400.], d=[0.1, 0.15, 0.2],
+    ... FL=[0.9, 0.9, 0.85], Fd=0.46, characteristic='equal percentage')
+    >>> catalog.select_l(rho=965.4, Psat=70.1E3, Pc=22120E3, mu=3.1472E-4, 
+    ... P1=680E3, P2=220E3, Q=[0.05, 0.1], D1=0.15, D2=0.15, opening=0.8)
+    (1, array([ 0.60720413,  0.75387841]))
+    '''
+    characteristics = ('linear', 'equal percentage', 'quick opening')
+    
+    def __init__(self, Kv, d, FL=0.9, Fd=1.0, xT=0.7, characteristic='linear'):
+        Kv = np.array(Kv, dtype=float).ravel()
+        N = Kv.size
+        self.Kv = Kv
+        self.d, self.FL, self.Fd, self.xT = [np.broadcast_to(np.array(i, dtype=float).ravel(), (N,)).copy()
+                                             for i in (d, FL, Fd, xT)]
+        names, codes = np.unique(np.broadcast_to(characteristic, (N,)), 
+                                 return_inverse=True)
+        for name in names:
+            if name not in self.characteristics:
+                raise Exception('Unrecognized valve characteristic %s' %name)
+        self.characteristic = np.array([self.characteristics.index(name) 
+                                        for name in names], dtype=int)[codes]
+        
+        Kv_bound = _Kv_bound_expander(Kv, self.d)
+        self.index = np.argsort(Kv_bound, kind='mergesort')
+        self.Kv_bound = Kv_bound[self.index]
+
+    def capacity(self, opening, index=None):
+        r'''Calculates the flow coefficients of trims of the catalog at a 
+        fraction of their full opening, according to their characteristics.
+        
+        Parameters
+        ----------
+        opening : float
+            Fraction of full opening of the valves [-]
+        index : ndarray, optional
+            Indexes of the trims; all trims if not specified
+
+        Returns
+        -------
+        Kv : ndarray
+            Metric Kv valve flow coefficient of the trims at `opening` 
+            [m^3/hr]
+        '''
+        if index is None:
+            index = np.arange(self.Kv.size)
+        codes = self.characteristic[index]
+        fracs = np.array([float(char(float(opening))) for char in _characteristic_curves()])
+        return self.Kv[index]*fracs[codes]
+    
+    def opening(self, i, Kv):
+        r'''Calculates the fractions of full opening at which a trim of the
+        catalog has specified flow coefficients, by inverting its 
+        characteristic.
+        
+        Parameters
+        ----------
+        i : int
+            Index of the trim
+        Kv : ndarray
+            Metric Kv valve flow coefficients to open the valve to [m^3/hr]
+
+        Returns
+        -------
+        opening : ndarray
+            Fractions of full opening of the valve [-]
+        '''
+        frac = np.array(Kv, dtype=float)/self.Kv[i]
+        char = _characteristic_curves()[self.characteristic[i]]
+        if char is Cv_char_linear:
+            return frac
+        flat = frac.ravel()
+        return bracketed_roots(lambda x, j: char(x) - flat[j], 
+                               np.zeros(flat.size), np.ones(flat.size), 
+                               fa=-flat, fb=1.0 - flat).reshape(frac.shape)
+
+    def select_l(self, rho, Psat, Pc, mu, P1, P2, Q, D1=None, D2=None, 
+                 opening=0.8, allow_choked=True, allow_laminar=True):
+        r'''Selects the trim of the catalog with the smallest flow 
+        coefficient which can pass each of a set of liquid operating cases 
+        at no more than a target opening, sizing each case as in 
+        `size_control_valve_l_batch`.
+        
+        Parameters
+        ----------
+        rho : float or ndarray
+            Density of the liquid at the inlet [kg/m^3]
+        Psat : float or ndarray
+            Saturation pressure of the fluid at inlet temperature [Pa]
+        Pc : float or ndarray
+            Critical pressure of the fluid [Pa]
+        mu : float or ndarray
+            Viscosity of the fluid [Pa*s]
+        P1 : float or ndarray
+            Inlet pressure of the fluid before valves and reducers [Pa]
+        P2 : float or ndarray
+            Outlet pressure of the fluid after valves and reducers [Pa]
+        Q : float or ndarray
+            Volumetric flow rate of the fluid [m^3/s]
+        D1 : float or ndarray, optional
+            Diameter of the pipe before the valve; the valve's own if not
+            specified, and trims larger than it are not selected [m]
+        D2 : float or ndarray, optional
+            Diameter of the pipe after the valve; the valve's own if not
+            specified, and trims larger than it are not selected [m]
+        opening : float, optional
+            Largest fraction of full opening allowed in any case [-]
+        allow_choked : bool, optional
+            Overrides the automatic transition into the choked regime if this
+            is False and returns as if choked flow does not exist
+        allow_laminar : bool, optional
+            Overrides the automatic transition into the laminar regime if this
+            is False and returns as if laminar flow does not exist
+
+        Returns
+        -------
+        i : int
+            Index of the selected trim; None if no trim passes every case
+        openings : ndarray
+            Fraction of full opening of the selected trim in each case; None
+            if no trim passes every case [-]
+        '''
+        shape, (rho, Psat, Pc, mu, P1, P2, Q) = _batch_inputs(rho, Psat, Pc, 
+                                                             mu, P1, P2, Q)
+        # Turbulent, non-choked flow with no fittings, equation 1
+        Kv_min = np.max(Q*3600./N1*(rho/rho0/((P1 - P2)/1000.))**0.5)
+
+        def size(i, fittings):
+            if not fittings:
+                return size_control_valve_l_batch(rho, Psat, Pc, mu, P1, P2, Q,
+                        FL=self.FL[i][:, None], allow_choked=allow_choked,
+                        full_output=True)
+            return size_control_valve_l_batch(rho, Psat, Pc, mu, P1, P2, Q, 
+                        D1=self._pipe_diameter(D1, i), D2=self._pipe_diameter(D2, i),
+                        d=self.d[i][:, None], FL=self.FL[i][:, None], 
+                        Fd=self.Fd[i][:, None], allow_choked=allow_choked, 
+                        allow_laminar=allow_laminar, full_output=True)
+        return self._select(size, Kv_min, opening, shape, D1, D2)
+
+    def select_g(self, T, MW, mu, gamma, Z, P1, P2, Q, D1=None, D2=None, 
+                 opening=0.8, allow_choked=True, allow_laminar=True):
+        r'''Selects the trim of the catalog with the smallest flow 
+        coefficient which can pass each of a set of gas operating cases at no
+        more than a target opening, sizing each case as in 
+        `size_control_valve_g_batch`.
+        
+        Parameters
+        ----------
+        T : float or ndarray
+            Temperature of the gas at the inlet [K]
+        MW : float or ndarray
+            Molecular weight of the gas [g/mol]
+        mu : float or ndarray
+            Viscosity of the fluid at inlet conditions [Pa*s]
+        gamma : float or ndarray
+            Specific heat capacity ratio [-]
+        Z : float or ndarray
+            Compressibility factor at inlet conditions, [-]
+        P1 : float or ndarray
+            Inlet pressure of the gas before valves and reducers [Pa]
+        P2 : float or ndarray
+            Outlet pressure of the gas after valves and reducers [Pa]
+        Q : float or ndarray
+            Volumetric flow rate of the gas at *273.15 K* and 1 atm specifically
+            [m^3/s]
+        D1 : float or ndarray, optional
+            Diameter of the pipe before the valve; the valve's own if not
+            specified, and trims larger than it are not selected [m]
+        D2 : float or ndarray, optional
+            Diameter of the pipe after the valve; the valve's own if not
+            specified, and trims larger than it are not selected [m]
+        opening : float, optional
+            Largest fraction of full opening allowed in any case [-]
+        allow_choked : bool, optional
+            Overrides the automatic transition into the choked regime if this
+            is False and returns as if choked flow does not exist
+        allow_laminar : bool, optional
+            Overrides the automatic transition into the laminar regime if this
+            is False and returns as if laminar flow does not exist
+
+        Returns
+        -------
+        i : int
+            Index of the selected trim; None if no trim passes every case
+        openings : ndarray
+            Fraction of full opening of the selected trim in each case; None
+            if no trim passes every case [-]
+        '''
+        shape, (T, MW, mu, gamma, Z, P1, P2, Q) = _batch_inputs(T, MW, mu, 
+                                                    gamma, Z, P1, P2, Q)
+        # Turbulent, non-choked flow with no fittings and Y = 1, equation 8
+        x = (P1 - P2)/P1
+        Kv_min = np.max(Q*3600./(N9*P1/1000.)*(MW*T*Z/x)**0.5)
+
+        def size(i, fittings):
+            if not fittings:
+                return size_control_valve_g_batch(T, MW, mu, gamma, Z, P1, P2, Q,
+                        xT=self.xT[i][:, None], allow_choked=allow_choked,
+                        full_output=True)
+            return size_control_valve_g_batch(T, MW, mu, gamma, Z, P1, P2, Q, 
+                        D1=self._pipe_diameter(D1, i), D2=self._pipe_diameter(D2, i),
+                        d=self.d[i][:, None], FL=self.FL[i][:, None], 
+                        Fd=self.Fd[i][:, None], xT=self.xT[i][:, None],
+                        allow_choked=allow_choked, allow_laminar=allow_laminar,
+                        full_output=True)
+        return self._select(size, Kv_min, opening, shape, D1, D2)
+
+    def _pipe_diameter(self, D, i):
+        if D is None:
+            return self.d[i][:, None]
+        return np.array(D, dtype=float).ravel()
+
+    def _select(self, size, Kv_min, opening, shape, D1, D2):
+        # Trims no larger than the pipes which might pass the case with the 
+        # largest simple flow coefficient; then those which might at the 
+        # target opening
+        start = np.searchsorted(self.Kv_bound, Kv_min)
+        candidates = self.index[start:]
+        for D in (D1, D2):
+            if D is not None:
+                candidates = candidates[self.d[candidates] <= np.min(D)]
+        Kv_open = self.capacity(opening, candidates)
+        keep = _Kv_bound_expander(Kv_open, self.d[candidates]) >= Kv_min
+        candidates, Kv_open = candidates[keep], Kv_open[keep]
+        order = np.argsort(self.Kv[candidates], kind='mergesort')
+        candidates, Kv_open = candidates[order], Kv_open[order]
+        
+        # Size the candidates in order of capacity, in growing chunks; first
+        # without fittings or viscosity, with each trim's own FL and xT. 
+        # Unless choked, the laminar iterations then raise that at least 30%,
+        # and fittings with a positive loss coefficient at least by their 
+        # geometry factor there; others are bounded as the simple equation is
+        chunk, done = 16, 0
+        while done < candidates.size:
+            i, Kv_open_i = candidates[done:done + chunk], Kv_open[done:done + chunk]
+            done += chunk
+            chunk *= 2
+            simple = size(i, False)
+            Kv0 = simple['Kv']
+            d = self.d[i][:, None]*1000.
+            loss = _loss_coefficients_piping_array(d, self._pipe_diameter(D1, i)*1000., 
+                                                   self._pipe_diameter(D2, i)*1000.)[0]
+            with np.errstate(invalid='ignore'):
+                FP = (1. + loss/N2*(Kv0/d**2)**2)**-0.5
+            factor = np.where(simple['choked'], 1., np.minimum(1.3, 1./FP))
+            possible = np.where(loss >= 0.0, Kv0*factor <= Kv_open_i[:, None],
+                                Kv0 <= _Kv_bound_expander(Kv_open_i, self.d[i])[:, None])
+            possible = np.all(possible, axis=1)
+            i, Kv_open_i = i[possible], Kv_open_i[possible]
+            if not i.size:
+                continue
+            # Cases whose iterations did not converge do not pass
+            full = size(i, True)
+            Kv = full['Kv']
+            passes = np.all((Kv <= Kv_open_i[:, None]) & full['converged'], axis=1)
+            if np.any(passes):
+                j = int(np.argmax(passes))
+                best = int(i[j])
+                return best, self.opening(best, Kv[j]).reshape(shape)
+        return None, None
+
+
 # Third octave center frequency fi Hz
 fis_l_2015 = [12.5, 16, 20, 25, 31.5, 40, 50, 63, 80, 100, 125, 160, 200, 250, 
               315, 400, 500, 630, 800, 1000, 1250, 1600, 2000, 2500, 3150, 
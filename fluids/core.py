@@ -175,9 +175,9 @@ def Reynolds(V, D, rho=None, mu=None, nu=None):
     .. [2] Cengel, Yunus, and John Cimbala. Fluid Mechanics: Fundamentals and
        Applications. Boston: McGraw Hill Higher Education, 2006.
     '''
-    if rho and mu:
+    if rho is not None and mu is not None:
         nu = mu/rho
-    elif not nu:
+    elif nu is None:
         raise Exception('Either density and viscosity, or dynamic viscosity, \
         is needed')
     return V*D/nu
@@ -237,9 +237,9 @@ def Peclet_heat(V, L, rho=None, Cp=None, k=None, alpha=None):
     .. [2] Cengel, Yunus, and John Cimbala. Fluid Mechanics: Fundamentals and
        Applications. Boston: McGraw Hill Higher Education, 2006.
     '''
-    if rho and Cp and k:
+    if rho is not None and Cp is not None and k is not None:
         alpha =  k/(rho*Cp)
-    elif not alpha:
+    elif alpha is None:
         raise Exception('Either heat capacity and thermal conductivity and\
         density, or thermal diffusivity is needed')
     return V*L/alpha
@@ -339,9 +339,9 @@ def Fourier_heat(t, L, rho=None, Cp=None, k=None, alpha=None):
     .. [2] Cengel, Yunus, and John Cimbala. Fluid Mechanics: Fundamentals and
        Applications. Boston: McGraw Hill Higher Education, 2006.
     '''
-    if rho and Cp and k:
+    if rho is not None and Cp is not None and k is not None:
         alpha =  k/(rho*Cp)
-    elif not alpha:
+    elif alpha is None:
         raise Exception('Either heat capacity and thermal conductivity and \
 density, or thermal diffusivity is needed')
     return t*alpha/L**2
@@ -444,9 +444,9 @@ def Graetz_heat(V, D, x, rho=None, Cp=None, k=None, alpha=None):
        David P. DeWitt. Introduction to Heat Transfer. 6E. Hoboken, NJ:
        Wiley, 2011.
     '''
-    if rho and Cp and k:
+    if rho is not None and Cp is not None and k is not None:
         alpha =  k/(rho*Cp)
-    elif not alpha:
+    elif alpha is None:
         raise Exception('Either heat capacity and thermal conductivity and\
         density, or thermal diffusivity is needed')
     return V*D**2/(x*alpha)
@@ -502,9 +502,9 @@ def Schmidt(D, mu=None, nu=None, rho=None):
     .. [2] Cengel, Yunus, and John Cimbala. Fluid Mechanics: Fundamentals and
        Applications. Boston: McGraw Hill Higher Education, 2006.
     '''
-    if rho and mu:
+    if rho is not None and mu is not None:
         return mu/(rho*D)
-    elif nu:
+    elif nu is not None:
         return nu/D
     else:
         raise Exception('Insufficient information provided for Schmidt number calculation')
@@ -563,9 +563,9 @@ def Lewis(D=None, alpha=None, Cp=None, k=None, rho=None):
     .. [3] Gesellschaft, V. D. I., ed. VDI Heat Atlas. 2nd edition.
        Berlin; New York:: Springer, 2010.
     '''
-    if k and Cp and rho:
+    if k is not None and Cp is not None and rho is not None:
         alpha = k/(rho*Cp)
-    elif alpha:
+    elif alpha is not None:
         pass
     else:
         raise Exception('Insufficient information provided for Le calculation')
@@ -864,11 +864,11 @@ def Prandtl(Cp=None, k=None, mu=None, nu=None, rho=None, alpha=None):
     .. [3] Gesellschaft, V. D. I., ed. VDI Heat Atlas. 2nd edition.
        Berlin; New York:: Springer, 2010.
     '''
-    if k and Cp and mu:
+    if k is not None and Cp is not None and mu is not None:
         return Cp*mu/k
-    elif nu and rho and Cp and k:
+    elif nu is not None and rho is not None and Cp is not None and k is not None:
         return nu*rho*Cp/k
-    elif nu and alpha:
+    elif nu is not None and alpha is not None:
         return nu/alpha
     else:
         raise Exception('Insufficient information provided for Pr calculation')
@@ -936,9 +936,9 @@ def Grashof(L, beta, T1, T2=0, rho=None, mu=None, nu=None, g=g):
     .. [2] Cengel, Yunus, and John Cimbala. Fluid Mechanics: Fundamentals and
        Applications. Boston: McGraw Hill Higher Education, 2006.
     '''
-    if rho and mu:
+    if rho is not None and mu is not None:
         nu = mu/rho
-    elif not nu:
+    elif nu is None:
         raise Exception('Either density and viscosity, or dynamic viscosity, \
         is needed')
     return g*beta*abs(T2-T1)*L**3/nu**2
@@ -27,7 +27,11 @@ except: # pragma: no cover
     from io import BytesIO as StringIO
 import os
 import gzip
+import time
 import datetime
+import threading
+from multiprocessing.pool import ThreadPool
+from math import radians, sin, cos
 from calendar import isleap
 from collections import namedtuple
 
@@ -40,10 +44,10 @@ from scipy.stats import scoreatpercentile
 
 try: # pragma: no cover
     from urllib.request import urlopen
-    from urllib.error import HTTPError
+    from urllib.error import HTTPError, URLError
 except ImportError: # pragma: no cover
     from urllib2 import urlopen
-    from urllib2 import HTTPError
+    from urllib2 import HTTPError, URLError
     
 try:  # pragma: no cover
     from appdirs import user_data_dir, user_config_dir
@@ -54,8 +58,11 @@ except ImportError:  # pragma: no cover
 # TODO: Import ephem and get hours/minutes of sunlight per day.
     
 __all__ = ['get_clean_isd_history', 'IntegratedSurfaceDatabaseStation',
-           'get_closest_station', 'get_station_year_text', 'gsod_day_parser',
-           'StationDataGSOD', 'heating_degree_days', 'cooling_degree_days', 'stations']
+           'IntegratedSurfaceDatabaseStations', 'parse_isd_history', 
+           'load_isd_history', 'isd_history', 'get_closest_station', 
+           'get_closest_stations', 'get_station_year_text', 'download_gsod',
+           'gsod_source', 'get_station_year_data', 'gsod_day_parser', 'gsod_year_parser',
+           'gsod_dtype', 'StationDataGSOD', 'heating_degree_days', 'cooling_degree_days', 'stations']
 
 folder = os.path.join(os.path.dirname(__file__), 'data')
 
@@ -265,48 +272,123 @@ class IntegratedSurfaceDatabaseStation(object):
         
 
 class StationDataGSOD(object):
-    # Holds data, caches and retrieves data
-    def __init__(self, station):
+    '''Class to retrieve, cache, and summarize the daily weather data of a
+    station in the Global Surface Summary of the Day (GSOD) database. The data
+    of each year is held as a structured array from `gsod_year_parser`, 
+    loaded with `get_station_year_data`.
+
+    Parameters
+    ----------
+    station : IntegratedSurfaceDatabaseStation
+        The station to retrieve data for, [-]
+    source : str or callable, optional
+        Where to retrieve data which is not cached from; see `gsod_source`, 
+        [-]
+    threads : int, optional
+        Number of years to download at once, [-]
+        
+    Attributes
+    ----------
+    data : dict[int, ndarray]
+        Daily data of each year which could be retrieved, in SI units, [-]
+        
+    Notes
+    -----
+    The `raw_text`, `raw_data`, and `parsed_data` attributes of earlier 
+    versions, which held the data of each day as a `gsod_day`, are still
+    available as read-only properties built from `data` when accessed; 
+    `parse_data` and `load_empty_vectors` are kept for compatibility.
+    '''
+    def __init__(self, station, source=None, threads=8):
         self.station = station
+        self.source = source
+        self.threads = threads
         self.begin = datetime.datetime.strptime(str(self.station.BEGIN), '%Y%m%d')
         self.end = datetime.datetime.strptime(str(self.station.END), '%Y%m%d')
         
         self.year_range = range(self.begin.year, self.end.year + 1)
-        
-#         Would be nice to create these later, when using a download_data method
-        self.raw_text = {}
-        self.raw_data = {}
-        self.parsed_data = {}
-        self.load_empty_vectors()
+        self.data = {}
         self.download_data()
-        self.parse_data()
-        
-    def load_empty_vectors(self):
-        for year in self.year_range:
-            days_in_year = 366 if isleap(year) else 365
-            self.raw_data[year] = [None]*days_in_year
-            self.parsed_data[year] = [None]*days_in_year
-            self.raw_text[year] = None
-#        days = [None]*days_in_year(y)
 
     def download_data(self):
-        for year in self.year_range:
-            if self.raw_text[year] is None:
+        '''Retrieves the data of each year of the station not already loaded;
+        years which are not available, fail to download, or whose files are
+        not GSOD data are skipped.
+        '''
+        WMO, WBAN = self.station.USAF, self.station.WBAN
+        years = [year for year in self.year_range if year not in self.data]
+        status = download_gsod([(WMO, WBAN, year) for year in years], 
+                               source=self.source, threads=self.threads)
+        for year in years:
+            if status[(WMO, WBAN, year)] in ('cached', 'downloaded'):
                 try:
-                    year_data = get_station_year_text(self.station.USAF, self.station.WBAN, year)
-                    self.raw_text[year] = year_data
-                except:
+                    self.data[year] = get_station_year_data(WMO, WBAN, year, source=self.source)
+                except (OSError, IOError, ValueError):
+                    # The cached file could not be read, or is not GSOD data
                     pass
-    
+                except Exception as e:
+                    # `get_station_year_text` reports data which is missing
+                    # or failed to download with a plain Exception; any 
+                    # other error is a bug
+                    if type(e) is not Exception:
+                        raise
+
     def parse_data(self):
-        for year, data in self.raw_text.items():
-            if data is not None:
-                days = self.parsed_data[year]
-                for line in data.split('\n')[1:-1]:
-                    parsed = gsod_day_parser(line)
-                    doy = parsed.DATE.timetuple().tm_yday-1
-                    days[doy] = parsed
-                    
+        '''Does nothing, as the data of each year is parsed when it is 
+        retrieved; kept for compatibility.
+        '''
+
+    def load_empty_vectors(self):
+        '''Discards the data of every year, so `download_data` retrieves it
+        again; kept for compatibility.
+        '''
+        self.data = {}
+
+    @property
+    def raw_text(self):
+        '''Text of the GSOD file of each year of the station, or None if it
+        is not cached as text; read-only, [-]
+        '''
+        station = _gsod_station_name(self.station.USAF, self.station.WBAN)
+        raw_text = {}
+        for year in self.year_range:
+            path = os.path.join(data_dir, 'gsod', str(year), station + '.op')
+            text = None
+            if year in self.data and os.path.exists(path):
+                with open(path) as f:
+                    text = f.read()
+            raw_text[year] = text
+        return raw_text
+
+    @property
+    def raw_data(self):
+        '''List with None for each day of each year of the station, as in 
+        earlier versions; read-only, [-]
+        '''
+        return {year: [None]*(366 if isleap(year) else 365) 
+                for year in self.year_range}
+
+    @property
+    def parsed_data(self):
+        '''List of the data of each day of each year of the station as a
+        `gsod_day`, or None for days without data; read-only, [-]
+        '''
+        parsed_data = self.raw_data
+        for year, data in self.data.items():
+            days = parsed_data[year]
+            for record in data:
+                day = _gsod_day_from_record(record)
+                days[day.DATE.timetuple().tm_yday - 1] = day
+        return parsed_data
+
+    def years(self, older_year=None, newer_year=None):
+        '''Returns the years with data between `older_year` and `newer_year`
+        inclusive, in order; either may be None to not limit the range.
+        '''
+        return [year for year in sorted(self.data) 
+                if (older_year is None or older_year <= year) 
+                and (newer_year is None or year <= newer_year)]
+
     def coldest_month(self, older_year=None, newer_year=None, minimum_days=23):
         # Tested
         month_data = self.month_average_temperature(older_year=older_year,
@@ -329,175 +411,322 @@ class StationDataGSOD(object):
         >> station_data.month_average_temperature(1990, 2000, include_yearly=False)
         [276.1599380905833, 277.5375516246206, 281.1881231671554, 286.7367003367004, 291.8689638318671, 296.79545454545456, 299.51868686868687, 298.2097914630174, 294.4116161616162, 288.25883023786247, 282.3188552188553, 277.8282339524275]
         '''
-        # Take years, make them inclusive; add minimum valid days.
-        year_month_averages = {}
-        year_month_counts = {}
-        
-        for year, data in self.parsed_data.items():
-            if not (older_year <= year <= newer_year):
-                continue # Ignore out-of-range years easily
-            year_month_averages[year] = [0.0]*12
-            year_month_counts[year] = [0]*12
-
-            for i, day in enumerate(data):
-                if day is None:
-                    continue
-                # Don't do these comparisions to make it fast
-                if day.DATE.year < older_year or day.DATE.year > newer_year:
-                    continue # Ignore out-of-range days as possible
-                    
-                T = day.TEMP
-                if T is None:
-                    continue
-                # Cache these lookups
-                year_month_averages[year][day.DATE.month-1] += T
-                year_month_counts[year][day.DATE.month-1] += 1
-            
-            for month in range(12):
-                count = year_month_counts[year][month]
-                if count < minimum_days:
-                    ans = None
-                else:
-                    ans = year_month_averages[year][month]/count
-                year_month_averages[year][month] = ans
-                
-        # Compute the average of the month
-        actual_averages = [0.0]*12
-        actual_averages_counts = [0]*12
-        for year, average in year_month_averages.items():
-            for month in range(12):
-                if average is not None and average[month] is not None:
-                    count = actual_averages_counts[month] 
-                    if count is None:
-                        count = 1
-                    else: 
-                        count += 1
-                    actual_averages_counts[month] = count
-                    month_average_sum = actual_averages[month]
-                    if month_average_sum is None:
-                        month_average_sum = average[month]
-                    else:
-                        month_average_sum += average[month]
-                    actual_averages[month] = month_average_sum
-                    
-        for month in range(12):
-            actual_averages[month] = actual_averages[month]/actual_averages_counts[month]
-                    
-        # Don't set anything as properties - too many variables used in calculating thems
-        # Speed is not that important.
-        if include_yearly:
-            return actual_averages, year_month_averages
-        else:
-            return actual_averages
+        return self.month_average(attr='TEMP', older_year=older_year, 
+                                  newer_year=newer_year, 
+                                  include_yearly=include_yearly,
+                                  minimum_days=minimum_days)
 
-    # Copy and paste
     def month_average_windspeed(self, older_year=None, newer_year=None,
                                   include_yearly=False, minimum_days=23):
-        # Take years, make them inclusive; add minimum valid days.
-        year_month_averages = {}
-        year_month_counts = {}
+        return self.month_average(attr='WDSP', older_year=older_year, 
+                                  newer_year=newer_year, 
+                                  include_yearly=include_yearly,
+                                  minimum_days=minimum_days)
+
+    def month_average(self, attr, older_year=None, newer_year=None,
+                      include_yearly=False, minimum_days=23):
+        '''Averages a daily value for each month of the year; first for each
+        month of each year with at least `minimum_days` days with a value, 
+        and then over those years.
         
-        for year, data in self.parsed_data.items():
-            if not (older_year <= year <= newer_year):
-                continue # Ignore out-of-range years easily
-            year_month_averages[year] = [0.0]*12
-            year_month_counts[year] = [0]*12
-
-            for i, day in enumerate(data):
-                if day is None:
-                    continue
-                # Don't do these comparisions to make it fast
-                if day.DATE.year < older_year or day.DATE.year > newer_year:
-                    continue # Ignore out-of-range days as possible
-                    
-                wind_speed = day.WDSP
-                if wind_speed is None:
-                    continue
-                # Cache these lookups
-                year_month_averages[year][day.DATE.month-1] += wind_speed
-                year_month_counts[year][day.DATE.month-1] += 1
-            
-            for month in range(12):
-                count = year_month_counts[year][month]
-                if count < minimum_days:
-                    ans = None
-                else:
-                    ans = year_month_averages[year][month]/count
-                year_month_averages[year][month] = ans
+        Parameters
+        ----------
+        attr : str
+            The field of `gsod_dtype` to average, [-]
+        older_year : int, optional
+            First year to include, [year]
+        newer_year : int, optional
+            Last year to include, [year]
+        include_yearly : bool, optional
+            Whether or not to also return the averages of each year, [-]
+        minimum_days : int, optional
+            The fewest days with values for a month of a year to be used, [-]
+
+        Returns
+        -------
+        averages : list[float]
+            Average of each month, [units of `attr`]
+        year_month_averages : dict[int, list[float]], optional
+            Average of each month of each year, or None where there were too 
+            few days with values, [units of `attr`]
+        '''
+        year_month_averages = {}
+        for year in self.years(older_year, newer_year):
+            data = self.data[year]
+            values = data[attr]
+            valid = ~np.isnan(values)
+            months = (data['DATE'][valid]//100) % 100 - 1
+            counts = np.bincount(months, minlength=12).tolist()
+            sums = np.bincount(months, weights=values[valid], minlength=12).tolist()
+            year_month_averages[year] = [None if count < minimum_days else total/count
+                                         for total, count in zip(sums, counts)]
                 
         # Compute the average of the month
         actual_averages = [0.0]*12
         actual_averages_counts = [0]*12
         for year, average in year_month_averages.items():
             for month in range(12):
-                if average is not None and average[month] is not None:
-                    count = actual_averages_counts[month] 
-                    if count is None:
-                        count = 1
-                    else: 
-                        count += 1
-                    actual_averages_counts[month] = count
-                    month_average_sum = actual_averages[month]
-                    if month_average_sum is None:
-                        month_average_sum = average[month]
-                    else:
-                        month_average_sum += average[month]
-                    actual_averages[month] = month_average_sum
+                if average[month] is not None:
+                    actual_averages_counts[month] += 1
+                    actual_averages[month] += average[month]
                     
         for month in range(12):
             actual_averages[month] = actual_averages[month]/actual_averages_counts[month]
                     
         # Don't set anything as properties - too many variables used in calculating thems
-        # Speed is not that important.
         if include_yearly:
             return actual_averages, year_month_averages
         else:
             return actual_averages
 
     def percentile_extreme_condition(self, older_year=None, newer_year=None,
-                                  include_yearly=False, minimum_days=23, attr='WDSP'):
-        # Really need to normalize data with interpolation etc here.
-        # Need to get the data, and process it and score interpolation regimes.
-        # Or could just randomly drop data and try to fill it in.
+                                  include_yearly=False, minimum_days=23, attr='WDSP',
+                                  percentile=99.0):
+        '''Calculates a percentile of a daily value, as used for design 
+        conditions - i.e. the wind speed exceeded on only 1% of days. Only 
+        months of each year with at least `minimum_days` days with a value 
+        are used.
+        
+        Parameters
+        ----------
+        older_year : int, optional
+            First year to include, [year]
+        newer_year : int, optional
+            Last year to include, [year]
+        include_yearly : bool, optional
+            Whether or not to also return the percentile of each year, [-]
+        minimum_days : int, optional
+            The fewest days with values for a month of a year to be used, [-]
+        attr : str, optional
+            The field of `gsod_dtype` to find the percentile of, [-]
+        percentile : float, optional
+            The percentile to find, [%]
+
+        Returns
+        -------
+        value : float
+            The percentile of all the days used, [units of `attr`]
+        yearly : dict[int, float], optional
+            The percentile of the days used in each year, or None for years 
+            with no days used, [units of `attr`]
+        '''
         accepted_values = []
-        for year, data in self.parsed_data.items():
-            if not (older_year <= year <= newer_year):
-                continue # Ignore out-of-range years easily
+        yearly = {}
+        for year in self.years(older_year, newer_year):
+            data = self.data[year]
+            values = data[attr]
+            valid = ~np.isnan(values)
+            months = (data['DATE']//100) % 100 - 1
+            counts = np.bincount(months[valid], minlength=12)
+            year_values = values[valid & (counts[months] >= minimum_days)]
+            accepted_values.append(year_values)
+            yearly[year] = (float(scoreatpercentile(year_values, percentile)) 
+                            if year_values.size else None)
+        values = np.concatenate(accepted_values) if accepted_values else np.array([])
+        if not values.size:
+            raise Exception('No data available for the specified years')
+        value = float(scoreatpercentile(values, percentile))
+        if include_yearly:
+            return value, yearly
+        return value
+
+
+isd_history_dtype = np.dtype([('USAF', 'i4'), ('WBAN', 'i4'), ('NAME', 'S57'),
+                              ('CTRY', 'S2'), ('ST', 'S2'), ('ICAO', 'S5'), 
+                              ('LAT', 'f8'), ('LON', 'f8'), ('ELEV', 'f8'), 
+                              ('BEGIN', 'i4'), ('END', 'i4')])
+isd_history_missing_int = 99999
+
+
+def parse_isd_history(path=os.path.join(folder, 'isd-history-cleaned.tsv')):
+    '''Reads the cleaned isd-history file (see `get_clean_isd_history`) into
+    a NumPy structured array with one record per weather station, and the 
+    fields of `IntegratedSurfaceDatabaseStation`. Stations with no 
+    latitude or longitude are skipped. Missing identifiers are stored as 
+    99999, missing elevations as nan, and missing strings as empty strings.
+    
+    Parameters
+    ----------
+    path : str, optional
+        The cleaned isd-history file, [-]
 
+    Returns
+    -------
+    isd_history : ndarray
+        Structured array of `isd_history_dtype`, [-]
+    '''
+    rows = []
+    with open(path) as f:
+        for line in f:
+            values = line.rstrip('\n').split('\t')
+            try:
+                lat, lon = float(values[6]), float(values[7])
+            except ValueError:
+                continue
+            if not (lat and lon):
+                # Some stations have no lat-long; this isn't useful
+                continue
+            USAF = int(float(values[0])) if values[0] else isd_history_missing_int
+            WBAN = int(float(values[1])) if values[1] else isd_history_missing_int
+            ELEV = float(values[8]) if values[8] else np.nan
+            rows.append((USAF, WBAN, values[2], values[3], values[4], values[5],
+                         lat, lon, ELEV, int(float(values[9])), int(float(values[10]))))
+    return np.array(rows, dtype=isd_history_dtype)
 
 
-stations = []
-_latlongs = []
-'''Read in the parsed data into 
-1) a list of latitudes and longitudes, temporary, which will get converted to
-a numpy array for use in KDTree
-2) a list of IntegratedSurfaceDatabaseStation objects; the query will return
-the index of the nearest weather stations.
+def load_isd_history(path=os.path.join(folder, 'isd-history-cleaned.tsv'), 
+                     cache_dir=None):
+    '''Loads the station database as returned by `parse_isd_history`. The 
+    parsed array is saved as a .npy file, which is memory-mapped on later
+    loads and rebuilt when the isd-history file is newer than it.
+    
+    Parameters
+    ----------
+    path : str, optional
+        The cleaned isd-history file, [-]
+    cache_dir : str, optional
+        Folder to save the .npy file in; defaults to the `data_dir` of fluids
+        if it is set, and otherwise to the folder of `path`. If the file 
+        cannot be written the array is only kept in memory, [-]
+
+    Returns
+    -------
+    isd_history : ndarray
+        Structured array of `isd_history_dtype`, [-]
+    '''
+    if cache_dir is None:
+        cache_dir = data_dir if data_dir else os.path.dirname(path)
+    cache_file = os.path.join(cache_dir, os.path.splitext(os.path.basename(path))[0] + '.npy')
+    try:
+        if os.path.getmtime(cache_file) >= os.path.getmtime(path):
+            data = np.load(cache_file, mmap_mode='r')
+            if data.dtype == isd_history_dtype:
+                return data
+    except (OSError, IOError, ValueError):
+        pass
+    data = parse_isd_history(path)
+    try:
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        np.save(cache_file, data)
+    except (OSError, IOError): # pragma: no cover
+        pass
+    return data
+
+
+class IntegratedSurfaceDatabaseStations(object):
+    '''Sequence-like view of a station database from `load_isd_history`
+    which creates `IntegratedSurfaceDatabaseStation` objects as they are 
+    indexed, rather than holding one for every station.
+    '''
+    def __init__(self, data):
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        values = list(self.data[index].tolist())
+        for i in (0, 1):
+            if values[i] == isd_history_missing_int:
+                values[i] = None
+        for i in (2, 3, 4, 5):
+            values[i] = values[i].decode('ascii') if values[i] else None
+        if values[8] != values[8]:
+            values[8] = None
+        return IntegratedSurfaceDatabaseStation(*values)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+isd_history = load_isd_history()
+'''Structured array with the location, name, identifiers and period of record
+of every weather station in the Integrated Surface Database which has a 
+location. It is memory-mapped from a cache when possible.
 '''
-with open(os.path.join(folder, 'isd-history-cleaned.tsv')) as f:
-    for line in f:
-        values = line.split('\t')
-        for i in range(0, 11):
-            v = values[i]
-            if not v:
-                values[i] = None # '' case
-            else:
-                try:
-                    values[i] = float(v)
-                    if int(v) == 99999:
-                        values[i] = None
-                except:
-                    continue
-        lat, lon = values[6], values[7]
-        if lat and lon:
-            # Some stations have no lat-long; this isn't useful
-            stations.append(IntegratedSurfaceDatabaseStation(*values))
-            _latlongs.append((lat, lon))
-_latlongs = np.array(_latlongs)
-station_count = len(stations)
+stations = IntegratedSurfaceDatabaseStations(isd_history)
+_latlongs = np.column_stack((isd_history['LAT'], isd_history['LON']))
+station_count = len(isd_history)
+
+# Mean radius of the earth, m
+_earth_radius = 6371008.8
+_kd_trees = {}
+
+
+def _latlong_unit_vectors(latitude, longitude):
+    if type(latitude) is float and type(longitude) is float:
+        lat, lon = radians(latitude), radians(longitude)
+        cos_lat = cos(lat)
+        return [cos_lat*cos(lon), cos_lat*sin(lon), sin(lat)]
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    cos_lat = np.cos(lat)
+    return np.stack((cos_lat*np.cos(lon), cos_lat*np.sin(lon), np.sin(lat)), axis=-1)
+
 
+def _kd_tree(minumum_recent_data):
+    # KD-Tree of the unit vectors of only the stations with more recent data 
+    # than specified, and their indexes; built once for each date
+    try:
+        return _kd_trees[minumum_recent_data]
+    except KeyError:
+        pass
+    indexes = np.flatnonzero(isd_history['END'] > minumum_recent_data)
+    points = _latlong_unit_vectors(isd_history['LAT'][indexes], isd_history['LON'][indexes])
+    tree = cKDTree(points) if len(indexes) else None
+    if len(_kd_trees) > 16:
+        _kd_trees.clear()
+    _kd_trees[minumum_recent_data] = tree, indexes
+    return tree, indexes
+
+
+def get_closest_stations(latitudes, longitudes, minumum_recent_data=20140000):
+    '''Query function to find the nearest weather station to many 
+    coordinates at once. Optionally allows for a recent date by which the 
+    stations are required to be still active at.
+    
+    Distances are great-circle distances, found from a KD-Tree of the
+    stations' positions as unit vectors. The tree only includes stations 
+    with recent enough data, and is built once for each `minumum_recent_data`.
+    
+    Parameters
+    ----------
+    latitudes : float or ndarray
+        Latitudes to search for nearby weather stations at, [degrees]
+    longitudes : float or ndarray
+        Longitudes to search for nearby weather stations at, [degrees]
+    minumum_recent_data : int, optional
+        Date that the weather stations are required to have more recent
+        weather data than; format YYYYMMDD; set this to 0 to not restrict data
+        by date.
+        
+    Returns
+    -------
+    indexes : ndarray
+        Indexes of the nearest stations in `isd_history` and `stations`, [-]
+    distances : ndarray
+        Great-circle distances to the nearest stations, [m]
 
-kd_tree = cKDTree(_latlongs) # _latlongs must be unchanged as data is not copied
+    Examples
+    --------
+    >>> indexes, distances = get_closest_stations([51.02532675, 38.8572], 
+    ...                                           [-114.049868485806, -77.0369])
+    >>> [stations[i].NAME for i in indexes]
+    ['CALGARY INTL CS', 'RONALD REAGAN WASHINGTON NATL AP']
+    '''
+    tree, indexes = _kd_tree(minumum_recent_data)
+    if tree is None:
+        raise Exception('Could not find a station with more recent data than '
+                        'specified near the specified coordinates.')
+    if not isinstance(latitudes, float) or not isinstance(longitudes, float):
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+    chords, found = tree.query(_latlong_unit_vectors(latitudes, longitudes))
+    distances = 2.0*_earth_radius*np.arcsin(np.minimum(0.5*chords, 1.0))
+    return indexes[found], distances
 
 
 def get_closest_station(latitude, longitude, minumum_recent_data=20140000, 
@@ -517,9 +746,8 @@ def get_closest_station(latitude, longitude, minumum_recent_data=20140000,
         weather data than; format YYYYMMDD; set this to 0 to not restrict data
         by date.
     match_max : int, optional
-        The maximum number of results in the KDTree to search for before 
-        applying the filtering criteria; an internal parameter which is
-        increased automatically if the default value is insufficient [-]
+        Unused; the search always finds the nearest station with recent 
+        enough data, [-]
         
     Returns
     -------
@@ -530,38 +758,133 @@ def get_closest_station(latitude, longitude, minumum_recent_data=20140000,
         
     Notes
     -----
-    Searching for 100 stations is a reasonable choice as it takes, ~70 
-    microseconds vs 50 microsecond to find only 1 station. The search does get 
-    slower as more points are requested. Bad data is returned from a KDTree
-    search if more points are requested than are available.
+    This is a wrapper around `get_closest_stations`, which should be used 
+    when many coordinates are to be searched for.
     
     Examples
     --------
     >>> get_closest_station(51.02532675, -114.049868485806, 20150000)
     <Weather station registered in the Integrated Surface Database, name CALGARY INTL CS, country CA, USAF 713930, WBAN None, coords (51.1, -114.0) Weather data from 2004 to 2017>
     '''
-    # Both station strings may be important
-    # Searching for 100 stations is fine, 70 microseconds vs 50 microsecond for 1
-    # but there's little point for more points, it gets slower.
-    # bad data is returned if k > station_count
-    distances, indexes = kd_tree.query([latitude, longitude], k=min(match_max, station_count)) 
-    #
-    for i in indexes:
-        latlon = _latlongs[i]
-        enddate = stations[i].END
-        # Iterate for all indexes until one is found whose date is current
-        if enddate > minumum_recent_data:
-            return stations[i]
-    if match_max < station_count:
-        return get_closest_station(latitude, longitude, minumum_recent_data=minumum_recent_data, match_max=match_max*10)
-    raise Exception('Could not find a station with more recent data than '
-                    'specified near the specified coordinates.')
-
-
-# This should be agressively cached
-def get_station_year_text(WMO, WBAN, year):
+    indexes, _ = get_closest_stations(float(latitude), float(longitude), 
+                                      minumum_recent_data)
+    return stations[int(indexes)]
+
+
+# Default location the GSOD data is retrieved from; a URL of a folder laid out
+# as the GSOD database (`<year>/<station>-<year>.op.gz`), a local folder with 
+# the same layout (i.e. a mirror of the database), or a function of the 
+# station ('WMO-WBAN') and year returning the gzipped file as bytes or None if
+# there is no such file.
+gsod_source = 'ftp://ftp.ncdc.noaa.gov/pub/data/gsod/'
+
+
+def _gsod_station_name(WMO, WBAN):
+    if WMO is None:
+        WMO = 999999
+    if WBAN is None:
+        WBAN = 99999
+    return str(int(WMO)) + '-' + str(int(WBAN))
+
+
+def _fetch_gsod_year(station, year, source, timeout):
+    # Returns the decompressed data of a station-year from `source`, or None 
+    # if the source does not have it; raises for any other problem
+    name = station + '-' + str(year) + '.op.gz'
+    if callable(source):
+        compressed = source(station, year)
+    elif '://' not in source:
+        path = os.path.join(source, str(year), name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            compressed = f.read()
+    else:
+        url = source.rstrip('/') + '/' + str(year) + '/' + name
+        try:
+            compressed = urlopen(url, timeout=timeout).read()
+        except HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+        except URLError as e:
+            # FTP servers report missing files as error 550
+            if '550' in str(e.reason):
+                return None
+            raise
+    if compressed is None:
+        return None
+    f = gzip.GzipFile(fileobj=StringIO(compressed), mode="r")
+    year_station_data = f.read()
+    try: 
+        year_station_data = year_station_data.decode('utf-8')
+    except:
+        pass
+    return year_station_data
+
+
+def _write_atomic(path, text):
+    # Write to a temporary file and rename it, so an interrupted download 
+    # never leaves a partial file in the cache
+    folder = os.path.dirname(path)
+    if not os.path.exists(folder):
+        try:
+            os.makedirs(folder)
+        except OSError: # pragma: no cover
+            pass # Created by another thread
+    tmp = '%s.%d.%d.tmp' %(path, os.getpid(), threading.current_thread().ident)
+    with open(tmp, 'w') as f:
+        f.write(text)
+    try:
+        os.replace(tmp, path)
+    except AttributeError: # pragma: no cover
+        os.rename(tmp, path)
+
+
+def _get_gsod_year(WMO, WBAN, year, source=None, timeout=5.0, retries=0, 
+                   backoff=1.0, retry_missing=False, text=True):
+    # Returns (status, text or error) for a station-year, from the cache or
+    # from `source` with up to `retries` retries; only data and the absence
+    # of data are cached, never errors. If `text` is False, already parsed
+    # data is good enough and no text is returned for it.
+    station = _gsod_station_name(WMO, WBAN)
+    gsod_year_dir = os.path.join(data_dir, 'gsod', str(year))
+    path = os.path.join(gsod_year_dir, station + '.op')
+    missing_path = os.path.join(gsod_year_dir, station + '.missing')
+    if not text and os.path.exists(os.path.join(gsod_year_dir, station + '.npy')):
+        return 'cached', None
+    if os.path.exists(path):
+        with open(path) as f:
+            data = f.read()
+        # Files of 'Exception' were written on errors by older versions
+        if data and data != 'Exception':
+            return 'cached', data
+    if not retry_missing and os.path.exists(missing_path):
+        return 'missing', None
+    if source is None:
+        source = gsod_source
+    for attempt in range(retries + 1):
+        try:
+            data = _fetch_gsod_year(station, year, source, timeout)
+            break
+        except Exception as e:
+            if attempt == retries:
+                return 'failed', e
+            time.sleep(backoff*2**attempt)
+    if data is None:
+        _write_atomic(missing_path, '')
+        return 'missing', None
+    _write_atomic(path, data)
+    if os.path.exists(missing_path):
+        os.remove(missing_path)
+    return 'downloaded', data
+
+
+def get_station_year_text(WMO, WBAN, year, source=None, timeout=5.0):
     '''Basic method to download data from the GSOD database, given a 
-    station idenfifier and year. 
+    station idenfifier and year. The data is cached, as is the absence of
+    data for the station and year; failures to retrieve the data are not.
+    Use `download_gsod` to retrieve many station-years at once.
 
     Parameters
     ----------
@@ -571,57 +894,115 @@ def get_station_year_text(WMO, WBAN, year):
         Weather Bureau Army Navy (WBAN) weather station identifier, [-]
     year : int
         Year data should be retrieved from, [year]
+    source : str or callable, optional
+        Where to retrieve the data from; see `gsod_source`, which is used if
+        not specified, [-]
+    timeout : float, optional
+        Timeout of the request for the data, [s]
         
     Returns
     -------
     data : str
         Downloaded data file
     '''
-    if WMO is None:
-        WMO = 999999
-    if WBAN is None:
-        WBAN = 99999
-    station = str(int(WMO)) + '-' + str(int(WBAN)) 
+    status, data = _get_gsod_year(WMO, WBAN, year, source=source, timeout=timeout)
+    if status == 'missing':
+        raise Exception('No data is published for the specified station and '
+                        'year; check the station was specified in the '
+                        'correct form.')
+    elif status == 'failed':
+        raise Exception('Could not obtain desired data; the full error is %s' %(data))
+    return data
+
+
+def download_gsod(station_years, source=None, threads=8, retries=3, 
+                  backoff=1.0, timeout=5.0, retry_missing=False):
+    '''Downloads the GSOD data of many stations and years into the cache 
+    used by `get_station_year_text`, in parallel. Station-years already 
+    cached, or known to have no data, are not downloaded again, so an 
+    interrupted download can be resumed by calling this again; neither are
+    station-years already parsed by `get_station_year_data`. Failed 
+    requests are retried after waiting `backoff`, 2*`backoff`, 4*`backoff`...
+    seconds.
+    
+    Parameters
+    ----------
+    station_years : list[tuple(int or None, int or None, int)]
+        The WMO and WBAN identifiers and year of each station-year to 
+        download, [-]
+    source : str or callable, optional
+        Where to retrieve the data from; see `gsod_source`, which is used if
+        not specified, [-]
+    threads : int, optional
+        Number of downloads at once, [-]
+    retries : int, optional
+        The number of times to retry a failed download, [-]
+    backoff : float, optional
+        Time to wait before the first retry, [s]
+    timeout : float, optional
+        Timeout of each request, [s]
+    retry_missing : bool, optional
+        Whether or not to check again for station-years previously found to 
+        have no data, [-]
+
+    Returns
+    -------
+    status : dict[tuple, str]
+        For each station-year, one of 'cached', 'downloaded', 'missing' (the
+        source has no data for it), or 'failed', [-]
+    '''
+    station_years = [tuple(key) for key in station_years]
+    def get(key):
+        return _get_gsod_year(*key, source=source, timeout=timeout, retries=retries,
+                              backoff=backoff, retry_missing=retry_missing,
+                              text=False)[0]
+    pool = ThreadPool(max(1, min(threads, len(station_years))))
+    try:
+        return dict(zip(station_years, pool.map(get, station_years)))
+    finally:
+        pool.close()
+
+
+def get_station_year_data(WMO, WBAN, year, source=None):
+    '''Retrieves the data of a station for a year from the GSOD database
+    with `get_station_year_text` and parses it with `gsod_year_parser` into 
+    SI units. The parsed data is cached as a .npy file beside the text, so 
+    later calls only load it.
+
+    Parameters
+    ----------
+    WMO : int or None
+         World Meteorological Organization (WMO) identifiers, [-]
+    WBAN : int or None
+        Weather Bureau Army Navy (WBAN) weather station identifier, [-]
+    year : int
+        Year data should be retrieved from, [year]
+    source : str or callable, optional
+        Where to retrieve the data from if it is not cached; see 
+        `gsod_source`, [-]
+        
+    Returns
+    -------
+    data : ndarray
+        Structured array of `gsod_dtype` with one record per day, [-]
+    '''
+    station = _gsod_station_name(WMO, WBAN)
     gsod_year_dir = os.path.join(data_dir, 'gsod', str(year))
-    path = os.path.join(gsod_year_dir, station + '.op')
-    if os.path.exists(path):
-        data = open(path).read()
-        if data and data != 'Exception':
+    path = os.path.join(gsod_year_dir, station + '.npy')
+    try:
+        data = np.load(path)
+        if data.dtype == gsod_dtype:
             return data
-        else:
-            raise Exception(data)
-        
-    toget = ('ftp://ftp.ncdc.noaa.gov/pub/data/gsod/' + str(year) + '/' 
-             + station + '-' + str(year) +'.op.gz')
+    except (OSError, IOError, ValueError):
+        pass
+    data = gsod_year_parser(get_station_year_text(WMO, WBAN, year, source=source))
     try:
-        data = urlopen(toget, timeout=5)
-    except Exception as e:
         if not os.path.exists(gsod_year_dir):
             os.makedirs(gsod_year_dir)
-        open(path, 'w').write('Exception')
-        raise Exception('Could not obtain desired data; check '
-                        'if the year has data published for the '
-                        'specified station and the station was specified '
-                        'in the correct form. The full error is %s' %(e))
-        
-    data = data.read()
-    data_thing = StringIO(data)
-
-    f = gzip.GzipFile(fileobj=data_thing, mode="r")
-    year_station_data = f.read()
-    try: 
-        year_station_data = year_station_data.decode('utf-8')
-    except:
+        np.save(path, data)
+    except (OSError, IOError): # pragma: no cover
         pass
-    
-    # Cache the data for future use
-    if not os.path.exists(gsod_year_dir):
-        os.makedirs(gsod_year_dir)
-    open(path, 'w').write(year_station_data)
-    
-    
-    return year_station_data
-    
+    return data
 
 
 gsod_fields = ['DATE', # 15-18 int year; 19-22 int month/day
@@ -776,3 +1157,125 @@ def gsod_day_parser(line, SI=True, to_datetime=True):
     indicator_values = [flag == '1' for flag in obj['FRSHTT']]
     obj.update(zip(gsod_indicator_names, indicator_values))
     return gsod_day(**obj)
+
+
+# Positions of the fields in each line of a GSOD file, and their types
+gsod_columns = [('DATE', 14, 22, 'i4'), ('TEMP', 24, 30, 'f8'), 
+                ('TEMP_COUNT', 31, 33, 'i2'), ('DEWP', 35, 41, 'f8'), 
+                ('DEWP_COUNT', 42, 44, 'i2'), ('SLP', 46, 52, 'f8'), 
+                ('SLP_COUNT', 53, 55, 'i2'), ('STP', 57, 63, 'f8'), 
+                ('STP_COUNT', 64, 66, 'i2'), ('VISIB', 68, 73, 'f8'), 
+                ('VISIB_COUNT', 74, 76, 'i2'), ('WDSP', 78, 83, 'f8'), 
+                ('WDSP_COUNT', 84, 86, 'i2'), ('MXSPD', 88, 93, 'f8'), 
+                ('GUST', 95, 100, 'f8'), ('MAX', 102, 108, 'f8'), 
+                ('MIN', 110, 116, 'f8'), ('PRCP', 118, 123, 'f8'), 
+                ('SNDP', 125, 130, 'f8'), ('FRSHTT', 132, 138, 'S6')]
+gsod_line_length = 138
+gsod_dtype = np.dtype([(name, kind) for name, _, _, kind in gsod_columns]
+                      + [(name, '?') for name in gsod_indicator_names])
+gsod_bad_numbers = [float(value) for value in gsod_bad_values]
+
+
+def _fixed_width_numbers(chars):
+    # Numbers in fixed-width columns, from a 2D array of their characters;
+    # blanks and flags are ignored
+    value = np.zeros(chars.shape[0])
+    decimals = np.zeros(chars.shape[0])
+    seen_point = np.zeros(chars.shape[0], dtype=bool)
+    for j in range(chars.shape[1]):
+        c = chars[:, j]
+        is_digit = (c >= 48) & (c <= 57)
+        value = np.where(is_digit, value*10.0 + (c - 48.0), value)
+        decimals += is_digit & seen_point
+        seen_point |= c == 46
+    value /= 10.0**decimals
+    negative = (chars == 45).any(axis=1)
+    value[negative] = -value[negative]
+    return value
+
+
+def _gsod_day_from_record(record):
+    # `gsod_day` of a record of `gsod_year_parser`, as `gsod_day_parser` 
+    # gives for the same line
+    obj = {name: record[name].item() for name in gsod_fields + gsod_indicator_names}
+    obj['DATE'] = datetime.datetime.strptime(str(obj['DATE']), '%Y%m%d')
+    obj['FRSHTT'] = obj['FRSHTT'].decode('ascii')
+    for field in gsod_float_fields:
+        if obj[field] != obj[field]:
+            obj[field] = None
+    return gsod_day(**obj)
+
+
+def gsod_year_parser(text, SI=True):
+    '''Vectorized parser of a whole file (one station and year) of data in
+    the format of the GSOD database, as returned by `get_station_year_text`.
+    Returns a structured array with one record per day, and fields named as 
+    the attributes of the results of `gsod_day_parser`. The values are 
+    identical to those of `gsod_day_parser`, except that the date is an
+    integer YYYYMMDD and missing values are nan rather than None.
+    Raises ValueError if any line is not in the format of the GSOD database.
+
+    Parameters
+    ----------
+    text : str or bytes
+        Contents of a GSOD file, including its header line, [-]
+    SI : bool
+        Whether or not the results get converted to base SI units, [-] 
+
+    Returns
+    -------
+    data : ndarray
+        Structured array of `gsod_dtype`; (all values in SI units, if `SI` 
+        is True, i.e. meters, m/s, Kelvin, Pascal; otherwise the original 
+        unit set is used), [-]
+    
+    Examples
+    --------
+    >>> text = """STN--- WBAN   YEARMODA    TEMP       DEWP      SLP        STP       VISIB      WDSP     MXSPD   GUST    MAX     MIN   PRCP   SNDP   FRSHTT
+    ... 712650 99999  19990101    12.3 24     3.1 24  1022.8 24  1013.0 24    8.4 24   15.0 24   22.9   29.9    23.7     4.1   0.00G 999.9  001000
+    ... """
+    >>> data = gsod_year_parser(text)
+    >>> data['DATE'], data['TEMP'], data['SNDP'], data['snow_ice']
+    (array([19990101], dtype=int32), array([ 262.20555556]), array([ nan]), array([ True], dtype=bool))
+    '''
+    if not isinstance(text, bytes):
+        text = text.encode('latin-1')
+    lines = [line for line in text.split(b'\n') if line.strip()]
+    if lines and lines[0].startswith(b'STN'):
+        lines = lines[1:]
+    chars = np.array(lines, dtype='S%d' %gsod_line_length)
+    chars = chars.view(np.uint8).reshape(len(lines), gsod_line_length)
+    # Lines which are short, or have no date where it should be, are not 
+    # from the GSOD database; short lines are padded with zeros
+    dates = chars[:, 14:22]
+    if (np.any(chars[:, gsod_line_length - 1] == 0) 
+            or np.any((dates < 48) | (dates > 57))):
+        raise ValueError('Text is not in the format of the GSOD database')
+    data = np.zeros(len(lines), dtype=gsod_dtype)
+    for name, start, end, kind in gsod_columns:
+        if kind == 'S6':
+            data[name] = chars[:, start:end].copy().view('S6').ravel()
+            continue
+        values = _fixed_width_numbers(chars[:, start:end])
+        if kind == 'f8':
+            values[np.isin(values, gsod_bad_numbers)] = np.nan
+        data[name] = values
+    
+    if SI:
+        # All temperatures are in deg F
+        for field in ('TEMP', 'DEWP', 'MAX', 'MIN'):
+            data[field] = (data[field] + 459.67)*five_ninths
+        # Convert visibility, wind speed, pressures
+        # to si units of meters, Pascal, and meters/second.
+        data['VISIB'] *= mile
+        data['PRCP'] *= inch
+        data['SNDP'] *= inch
+        data['WDSP'] *= knot
+        data['MXSPD'] *= knot
+        data['GUST'] *= knot
+        data['SLP'] *= 100.0
+        data['STP'] *= 100.0
+    
+    for i, name in enumerate(gsod_indicator_names):
+        data[name] = chars[:, 132 + i] == 49
+    return data
@@ -21,9 +21,12 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.'''
 
 from __future__ import division
-from math import pi, sin, cos, tan, asin, acos, atan, acosh, log
+import os
+import hashlib
+from math import pi, sin, cos, tan, asin, acos, atan, acosh, log, sqrt
 import numpy as np
-from numpy.polynomial.chebyshev import chebval
+from numpy.polynomial.chebyshev import chebval, chebfit, chebder
+from numpy.polynomial.legendre import leggauss
 from scipy.interpolate import interp1d, InterpolatedUnivariateSpline
 from scipy.integrate import quad
 from scipy.optimize import newton, brenth
@@ -401,6 +404,67 @@ def V_horiz_spherical(D, L, a, h, headonly=False):
     return Vf
 
 
+def _Gauss_Legendre_01(N):
+    '''Returns the nodes and weights of the `N`-point Gauss-Legendre 
+    quadrature on [0, 1], as lists for fast iteration.
+    '''
+    x, w = leggauss(N)
+    return (0.5*(x + 1.0)).tolist(), (0.5*w).tolist()
+
+_GL_nodes_16, _GL_weights_16 = _Gauss_Legendre_01(16)
+_GL_nodes_12, _GL_weights_12 = _Gauss_Legendre_01(12)
+_V_horiz_torispherical_cache = {}
+
+
+def _V_horiz_torispherical_V1(R, kD, h):
+    # V1 with x = kD*sin(phi), and phi = phi_max*(1 - s^2) so the integrand
+    # ~ (phi_max - phi)^1.5 at the end of the knuckle is smooth in s
+    if h <= 0.0:
+        return 0.0
+    w = R - h
+    phi_max = 2.0*asin(sqrt(0.5*h/kD))
+    tot = 0.0
+    for s, weight in zip(_GL_nodes_16, _GL_weights_16):
+        c = cos(phi_max*(1.0 - s*s))
+        n = R - kD + kD*c
+        ratio = w/n
+        d = n*n - w*w
+        tot += weight*s*c*(n*n*acos(ratio if ratio < 1.0 else 1.0)
+                           - w*sqrt(d if d > 0.0 else 0.0))
+    return 2.0*kD*phi_max*tot
+
+
+def _V_horiz_torispherical_V2(R, kD, g, phi_X, w, dh):
+    # V2 with the same substitution as V1. When the liquid level is within
+    # `dh` of the knuckle/dish junction the integrand varies rapidly near 
+    # s = 0 on a scale of eps, and the interval is split geometrically there
+    eps = sqrt(dh/g)
+    breaks = [0.0]
+    if 0.0 < eps < 0.125:
+        while eps < 0.125:
+            breaks.append(eps)
+            eps *= 8.0
+    breaks.append(1.0)
+    tot = 0.0
+    for a, b in zip(breaks[:-1], breaks[1:]):
+        part = 0.0
+        for s, weight in zip(_GL_nodes_12, _GL_weights_12):
+            s = a + (b - a)*s
+            c = cos(phi_X*(1.0 - s*s))
+            n = R - kD + kD*c
+            ratio_w, ratio_g = w/n, g/n
+            if ratio_w > 1.0:
+                ratio_w = 1.0
+            elif ratio_w < -1.0:
+                ratio_w = -1.0
+            dw, dg = n*n - w*w, n*n - g*g
+            part += weight*s*c*(n*n*(acos(ratio_w) - acos(ratio_g if ratio_g < 1.0 else 1.0))
+                                - w*sqrt(dw if dw > 0.0 else 0.0) 
+                                + g*sqrt(dg if dg > 0.0 else 0.0))
+        tot += part*(b - a)
+    return 2.0*kD*phi_X*tot
+
+
 def V_horiz_torispherical(D, L, f, k, h, headonly=False):
     r'''Calculates volume of a tank with torispherical heads, according to [1]_.
 
@@ -463,12 +527,22 @@ def V_horiz_torispherical(D, L, f, k, h, headonly=False):
     V : float
         Volume [m^3]
 
+    Notes
+    -----
+    The integrals are evaluated with fixed-order Gauss-Legendre quadrature 
+    after substitutions which remove the square-root behavior of the 
+    integrands at the knuckle/dish junction; :math:`V_2` is split into more
+    intervals when the liquid level is close to :math:`h_1` or :math:`h_2`.
+    The result agrees with high-precision integration to about 1E-13 of the 
+    head volume. :math:`V_{1,max}` and :math:`V_{2,max}` are cached for each
+    head geometry.
+
     Examples
     --------
     Matching example from [1]_, with inputs in inches and volume in gallons.
 
     >>> V_horiz_torispherical(D=108., L=156., f=1., k=0.06, h=36)/231.
-    2028.626670842139
+    2028.6266708400628
 
     References
     ----------
@@ -477,49 +551,47 @@ def V_horiz_torispherical(D, L, f, k, h, headonly=False):
     R = D/2.
     Af = R**2*acos((R-h)/R) - (R-h)*(2*R*h - h**2)**0.5
     r = f*D
+    kD = k*D
     alpha = asin((1 - 2*k)/(2.*(f-k)))
     a1 = r*(1-cos(alpha))
     g = r*sin(alpha)
     z = r*cos(alpha)
-    h1 = k*D*(1-sin(alpha))
+    h1 = kD*(1-sin(alpha))
     h2 = D - h1
-
-    # Chebfun in Python failed on these functions
-    def V1_toint(x, w):
-        # No analytical integral available in MP
-        n = R - k*D + (k**2*D**2 - x**2)**0.5
-        ans = n**2*asin((n**2-w**2)**0.5/n) - w*(n**2 - w**2)**0.5
-        return ans
-    def V2_toint(x, w):
-        # No analytical integral available in MP
-        n = R - k*D + (k**2*D**2 - x**2)**0.5
-        ans = n**2*(acos(w/n) - acos(g/n)) - w*(n**2 - w**2)**0.5 + g*(n**2-g**2)**0.5
-        return ans
-    def V3_toint(x):
-        # There is an analytical integral in MP, but for all cases we seem to 
-        # get ZeroDivisionError: 0.0 cannot be raised to a negative power
-        ans = (r**2-x**2)*atan((g**2-x**2)**0.5/z)
-        return ans
+    phi_X = 0.5*pi - alpha
+    
+    # V1max and V2max depend only on the head
+    key = (D, f, k)
+    try:
+        V1max, V2max = _V_horiz_torispherical_cache[key]
+    except KeyError:
+        V1max = _V_horiz_torispherical_V1(R, kD, h1)
+        V2max = _V_horiz_torispherical_V2(R, kD, g, phi_X, -g, 0.0)
+        if len(_V_horiz_torispherical_cache) > 1000:
+            _V_horiz_torispherical_cache.clear()
+        _V_horiz_torispherical_cache[key] = (V1max, V2max)
 
     if 0 <= h <= h1:
-        w = R - h
-        Vf = 2*quad(V1_toint, 0, (2*k*D*h-h**2)**0.5, w)[0]
+        Vf = 2*_V_horiz_torispherical_V1(R, kD, h)
     elif h1 < h < h2:
         w = R - h
-        wmax1 = R - h1
-        V1max = quad(V1_toint, 0, (2*k*D*h1-h1**2)**0.5, wmax1)[0]
-        V2 = quad(V2_toint, 0, k*D*cos(alpha), w)[0]
-        V3 = quad(V3_toint, w, g)[0] - z/2.*(g**2*acos(w/g) -w*(2*g*(h-h1) - (h-h1)**2)**0.5)
+        dh1, dh2 = h - h1, h2 - h
+        V2 = _V_horiz_torispherical_V2(R, kD, g, phi_X, w, min(dh1, dh2))
+        # V3 with x = g*cos(theta), which removes the square root at x = g;
+        # theta_w = acos(w/g), written to be accurate near the junctions
+        if w >= 0.0:
+            theta_w = 2.0*asin(sqrt(0.5*dh1/g))
+        else:
+            theta_w = pi - 2.0*asin(sqrt(0.5*dh2/g))
+        V3 = 0.0
+        for t, weight in zip(_GL_nodes_16, _GL_weights_16):
+            theta = theta_w*t
+            st, ct = sin(theta), cos(theta)
+            V3 += weight*(r*r - g*g*ct*ct)*atan(g*st/z)*st
+        V3 = g*theta_w*V3 - z/2.*(g**2*theta_w - w*(dh1*dh2)**0.5)
         Vf = 2*(V1max + V2 + V3)
     else:
-        w = R - h
-        wmax1 = R - h1
-        wmax2 = R - h2
-        wwerird = R - (D - h)
-
-        V1max = quad(V1_toint, 0, (2*k*D*h1-h1**2)**0.5, wmax1)[0]
-        V1weird = quad(V1_toint, 0, (2*k*D*(D-h)-(D-h)**2)**0.5, wwerird)[0]
-        V2max = quad(V2_toint, 0, k*D*cos(alpha), wmax2)[0]
+        V1weird = _V_horiz_torispherical_V1(R, kD, D - h)
         V3max = pi*a1/6.*(3*g**2 + a1**2)
         Vf = 2*(2*V1max - V1weird + V2max + V3max)
     if headonly:
@@ -1456,6 +1528,12 @@ class TANK(object):
     c_backward : ndarray
         Coefficients for the Chebyshev approximations in calculating h from V,
         [-]
+    piecewise : bool
+        Whether or not the piecewise approximations of V from h and h from V
+        have been generated, [-]
+    cache_dir : str
+        Folder in which `set_chebyshev_approximators` caches its coefficients;
+        None (the default) to not cache them, [-]
     
     Notes
     -----
@@ -1520,6 +1598,8 @@ class TANK(object):
     '''
     table = False
     chebyshev = False
+    piecewise = False
+    cache_dir = None
 
     def __repr__(self): # pragma: no cover
         orient = 'Horizontal' if self.horizontal else 'Vertical'
@@ -1645,25 +1725,32 @@ class TANK(object):
     def V_from_h(self, h, method='full'):
         r'''Method to calculate the volume of liquid in a fully defined tank
         given a specified height `h`. `h` must be under the maximum height.
-        If the method is 'chebyshev', and the coefficients have not yet been 
-        calculated, they are created by calling `set_chebyshev_approximators`.
+        If the method is 'chebyshev' or 'piecewise', and the coefficients have
+        not yet been calculated, they are created by calling 
+        `set_chebyshev_approximators` or `set_piecewise_approximators`.
+        
+        `h` may also be an array of heights, in which case an array of volumes
+        is returned; the 'piecewise' method is much faster for these.
 
         Parameters
         ----------
-        h : float
+        h : float or ndarray
             Height specified, [m]
         method : str
-            One of 'full' (calculated rigorously) or 'chebyshev'
+            One of 'full' (calculated rigorously), 'chebyshev', or 'piecewise'
 
         Returns
         -------
-        V : float
+        V : float or ndarray
             Volume of liquid in the tank up to the specified height, [m^3]
             
         Notes
         -----
         '''
         if method == 'full':
+            if np.ndim(h):
+                return np.array([self.V_from_h(hi) for hi in np.ravel(h)]
+                                ).reshape(np.shape(h))
             return V_from_h(h, self.D, self.L, self.horizontal, self.sideA, 
                             self.sideB, self.sideA_a, self.sideB_a, 
                             self.sideA_f, self.sideA_k, self.sideB_f, 
@@ -1672,43 +1759,60 @@ class TANK(object):
             if not self.chebyshev:
                 self.set_chebyshev_approximators()
             return self.V_from_h_cheb(h)
+        elif method == 'piecewise':
+            if not self.piecewise:
+                self.set_piecewise_approximators()
+            return self._V_from_h_piecewise(h)
         else:
-            raise Exception("Allowable methods are 'full' or 'chebyshev'.")
+            raise Exception("Allowable methods are 'full', 'chebyshev', or "
+                            "'piecewise'.")
 
     def h_from_V(self, V, method='spline'):
         r'''Method to calculate the height of liquid in a fully defined tank
         given a specified volume of liquid in it `V`. `V` must be under the
         maximum volume. If the method is 'spline', and the interpolation table
         is not yet defined, creates it by calling the method set_table. If the
-        method is 'chebyshev', and the coefficients have not yet been 
-        calculated, they are created by calling `set_chebyshev_approximators`.
+        method is 'chebyshev' or 'piecewise', and the coefficients have not
+        yet been calculated, they are created by calling 
+        `set_chebyshev_approximators` or `set_piecewise_approximators`.
+        
+        `V` may also be an array of volumes, in which case an array of heights
+        is returned; the 'piecewise' method is much faster for these.
 
         Parameters
         ----------
-        V : float
+        V : float or ndarray
             Volume of liquid in the tank up to the desired height, [m^3]
         method : str
-            One of 'spline', 'chebyshev', or 'brenth'
+            One of 'spline', 'chebyshev', 'piecewise', or 'brenth'
 
         Returns
         -------
-        h : float
+        h : float or ndarray
             Height of liquid at which the volume is as desired, [m]
         '''
         if method == 'spline':
             if not self.table:
                 self.set_table()
-            return float(self.interp_h_from_V(V))
+            h = self.interp_h_from_V(V)
+            return h if np.ndim(V) else float(h)
         elif method == 'chebyshev':
             if not self.chebyshev:
                 self.set_chebyshev_approximators()
             return self.h_from_V_cheb(V)
+        elif method == 'piecewise':
+            if not self.piecewise:
+                self.set_piecewise_approximators()
+            return self._h_from_V_piecewise(V)
         elif method == 'brenth':
+            if np.ndim(V):
+                return np.array([self.h_from_V(Vi, 'brenth') for Vi in np.ravel(V)]
+                                ).reshape(np.shape(V))
             to_solve = lambda h : self.V_from_h(h, method='full') - V
             return brenth(to_solve, self.h_max, 0)
         else:
-            raise Exception("Allowable methods are 'full' or 'chebyshev', "
-                            "or 'brenth'.")
+            raise Exception("Allowable methods are 'spline', 'chebyshev', "
+                            "'piecewise', or 'brenth'.")
 
     def set_table(self, n=100, dx=None):
         r'''Method to set an interpolation table of liquids levels versus
@@ -1732,7 +1836,8 @@ class TANK(object):
         self.interp_h_from_V = InterpolatedUnivariateSpline(self.volumes, self.heights, ext=3)
         self.table = True
         
-    def set_chebyshev_approximators(self, deg_forward=50, deg_backwards=200):        
+    def set_chebyshev_approximators(self, deg_forward=50, deg_backwards=200,
+                                    cache_dir=None):
         r'''Method to derive and set coefficients for chebyshev polynomial 
         function approximation of the height-volume and volume-height
         relationship. 
@@ -1742,11 +1847,20 @@ class TANK(object):
         
         The forward relationship, `V_from_h`, requires
         far fewer coefficients in its fit than the reverse to obtain the same
-        relative accuracy. 
+        relative accuracy. The forward fit is made to the rigorous volumes;
+        the reverse fit is made to heights from the inverse of the piecewise
+        approximations (see `set_piecewise_approximators`), which are
+        accurate to about the precision of the rigorous volumes and are much
+        faster to evaluate than solving for each height.
         
         Optionally, deg_forward or deg_backwards can be set to None to try to 
         automatically fit the series to machine precision.
         
+        If `cache_dir` is given (or set as the `cache_dir` attribute of the 
+        tank or of the class), the coefficients are saved in it, and loaded
+        from it when a tank of the same geometry is fit again with the same
+        degrees.
+        
         Parameters
         ----------
         deg_forward : int, optional
@@ -1755,18 +1869,230 @@ class TANK(object):
         deg_backwards : int, optional
             The degree of the chebyshev polynomial to be created for the
             `h_from_V` curve, [-]
+        cache_dir : str, optional
+            Folder to save the coefficients in and to load them from; if None,
+            the `cache_dir` attribute is used, [-]
         '''
-        to_fit = lambda h: self.V_from_h(h, 'full')
-        self.c_forward = np.array(Chebfun.from_function(np.vectorize(to_fit), 
-                                          [0.0, self.h_max], N=deg_forward).coefficients())
+        if cache_dir is None:
+            cache_dir = self.cache_dir
+        if cache_dir is not None:
+            cache_file = os.path.join(cache_dir, 'tank_chebyshev_%s.npz' 
+                                      %self._cache_key(deg_forward, deg_backwards))
+        if cache_dir is not None and os.path.exists(cache_file):
+            with np.load(cache_file) as data:
+                self.c_forward = data['c_forward']
+                self.c_backward = data['c_backward']
+        else:
+            to_fit = lambda h: self.V_from_h(h, 'full')
+            self.c_forward = np.array(Chebfun.from_function(np.vectorize(to_fit), 
+                                              [0.0, self.h_max], N=deg_forward).coefficients())
+            
+            to_fit = lambda V: self.h_from_V(np.clip(V, 0.0, self.V_total), 'piecewise')
+            self.c_backward = np.array(Chebfun.from_function(to_fit, [0.0, self.V_total], 
+                                                             N=deg_backwards).coefficients())
+            if cache_dir is not None:
+                if not os.path.exists(cache_dir):
+                    os.makedirs(cache_dir)
+                np.savez(cache_file, c_forward=self.c_forward, 
+                         c_backward=self.c_backward)
+
         self.V_from_h_cheb = lambda x : chebval((2.0*x-self.h_max)/(self.h_max), self.c_forward)
-        
-        to_fit = lambda h: self.h_from_V(h, 'brenth')
-        self.c_backward = Chebfun.from_function(np.vectorize(to_fit), [0.0, self.V_total], N=deg_backwards).coefficients()
         self.h_from_V_cheb = lambda x : chebval((2.0*x-self.V_total)/(self.V_total), self.c_backward)
-
         self.chebyshev = True
 
+    def _cache_key(self, *args):
+        '''Returns a hash of the geometry of the tank and of `args`, used to
+        name the files of the approximations cached by 
+        `set_chebyshev_approximators`.
+        '''
+        geometry = (self.D, self.L, self.horizontal, self.sideA, self.sideB, 
+                    self.sideA_a, self.sideB_a, self.sideA_f, self.sideA_k, 
+                    self.sideB_f, self.sideB_k) + args
+        return hashlib.sha1(repr(geometry).encode('utf-8')).hexdigest()
+
+    def set_piecewise_approximators(self, n=1024, deg=64):
+        r'''Method to derive and set piecewise approximations of the 
+        height-volume and volume-height relationships, suitable for evaluating
+        arrays of heights or volumes quickly.
+        
+        The height of the tank is split into segments at every height where
+        the shape of the tank changes - the ends of the heads of vertical 
+        tanks, the middle of horizontal tanks, and the knuckles of 
+        torispherical heads. In each segment the height is mapped to an angle
+        :math:`\phi` by :math:`h = h_a + (h_b - h_a)(1 - \cos\phi)/2`, which
+        removes the square-root behavior of the volume at the ends of a 
+        segment. The volume is fit as a Chebyshev series in :math:`\phi` from
+        `deg` + 1 rigorous evaluations per segment, and the series is 
+        tabulated with its derivative at `n` + 1 evenly spaced angles. The 
+        volume at any height is then a cubic Hermite interpolation in that 
+        table; heights are found from volumes by Newton's method on the same
+        cubics, started from a table of heights at evenly spaced volumes.
+        
+        Parameters
+        ----------
+        n : int, optional
+            The number of intervals in the table of each segment, [-]
+        deg : int, optional
+            The degree of the Chebyshev series fit to each segment, [-]
+        '''
+        breaks = self._h_breakpoints()
+        y_fit = np.cos(np.pi*np.arange(deg + 1)/deg)[::-1]
+        y_table = np.linspace(-1.0, 1.0, n + 1)
+        coeffs, V_nodes = [], [0.0]
+        V_start = 0.0
+        for h_a, h_b in zip(breaks[:-1], breaks[1:]):
+            hs = h_a + (h_b - h_a)*(1.0 - np.cos(0.5*np.pi*(y_fit + 1.0)))*0.5
+            hs[0], hs[-1] = h_a, h_b
+            Vs = self.V_from_h(hs, 'full')
+            c = chebfit(y_fit, Vs - Vs[0], deg)
+            V = chebval(y_table, c)
+            # Anchor each segment exactly at the rigorous volumes of its ends
+            V += V_start - V[0]
+            V[-1] = V_start + Vs[-1] - Vs[0]
+            V_start = V[-1]
+            dV = chebval(y_table, chebder(c))*(2.0/n)
+            # Cubic Hermite polynomial of each interval in its local t in [0, 1]
+            V0, V1, m0, m1 = V[:-1], V[1:], dV[:-1], dV[1:]
+            coeffs.append([V0, m0, 3.0*(V1 - V0) - 2.0*m0 - m1, 
+                           2.0*(V0 - V1) + m0 + m1])
+            V_nodes.extend(V[1:])
+        self.piecewise_breaks = np.array(breaks)
+        self.piecewise_n = n
+        self.piecewise_coeffs = np.hstack(coeffs)
+        self.piecewise_V_max = V_start
+        # Intervals at evenly spaced volumes, for starting the inverse
+        N = self.piecewise_coeffs.shape[1]
+        V_nodes = np.array(V_nodes)
+        V_grid = np.linspace(0.0, V_start, 8*N + 1)
+        self.piecewise_V_nodes = V_nodes
+        self.piecewise_j_guess = np.clip(np.searchsorted(V_nodes, V_grid, side='right') - 1, 0, N - 1)
+        self.piecewise = True
+
+    def _h_breakpoints(self):
+        '''Returns the sorted heights at which the shape of the tank changes,
+        including 0 and `h_max`; used by `set_piecewise_approximators`.
+        '''
+        breaks = [0.0, self.h_max]
+        if self.horizontal:
+            # Several of the head formulas change form at the centerline
+            breaks.append(0.5*self.D)
+            for side, f, k in [(self.sideA, self.sideA_f, self.sideA_k), 
+                               (self.sideB, self.sideB_f, self.sideB_k)]:
+                if side == 'torispherical':
+                    alpha = asin((1 - 2*k)/(2.*(f-k)))
+                    h1 = k*self.D*(1 - sin(alpha))
+                    breaks.extend([h1, self.D - h1])
+        else:
+            a_A = self.sideA_a if self.sideA else 0.0
+            a_B = self.sideB_a if self.sideB else 0.0
+            breaks.extend([a_A, a_A + self.L])
+            if self.sideA == 'torispherical':
+                alpha = asin((1 - 2*self.sideA_k)/(2*(self.sideA_f - self.sideA_k)))
+                breaks.append(self.sideA_f*self.D*(1 - cos(alpha)))
+            if self.sideB == 'torispherical':
+                alpha = asin((1 - 2*self.sideB_k)/(2*(self.sideB_f - self.sideB_k)))
+                breaks.append(self.h_max - self.sideB_f*self.D*(1 - cos(alpha)))
+        breaks = sorted(set(h for h in breaks if 0.0 <= h <= self.h_max))
+        return breaks
+
+    def _piecewise_eval(self, G):
+        '''Evaluates the cubics of `set_piecewise_approximators` and their
+        derivatives at positions `G` in the table, where the integer part of 
+        `G` is the interval and the fractional part the position in it.
+        '''
+        N = self.piecewise_coeffs.shape[1]
+        j = np.minimum(G.astype(int), N - 1)
+        t = G - j
+        a0, a1, a2, a3 = (np.take(c, j) for c in self.piecewise_coeffs)
+        V = a0 + t*(a1 + t*(a2 + t*a3))
+        dV = a1 + t*(2.0*a2 + 3.0*t*a3)
+        return V, dV
+
+    def _V_from_h_piecewise(self, h):
+        '''Evaluates the table of `set_piecewise_approximators` at heights
+        `h`, a float or an array.
+        '''
+        h_in = h
+        h = np.asarray(h, dtype=float)
+        if np.any(h > self.h_max) or np.any(h < 0.0):
+            raise Exception('Input height is outside the tank')
+        breaks, n = self.piecewise_breaks, self.piecewise_n
+        i = np.zeros(h.shape, dtype=int)
+        for h_break in breaks[1:-1]:
+            i += h >= h_break
+        h_a, h_b = np.take(breaks, i), np.take(breaks, i + 1)
+        x = np.clip(1.0 - 2.0*(h - h_a)/(h_b - h_a), -1.0, 1.0)
+        G = np.arccos(x)*(n/np.pi) + i*n
+        V = self._piecewise_eval(G)[0]
+        return V if np.ndim(h_in) else float(V)
+
+    def _h_from_V_piecewise(self, V):
+        '''Inverts the table of `set_piecewise_approximators` at volumes
+        `V`, a float or an array, with Newton's method on the cubics.
+        '''
+        V_in = V
+        V = np.asarray(V, dtype=float)
+        V_max = self.piecewise_V_max
+        # Allow for the rounding in volumes calculated elsewhere
+        if np.any(V > V_max*(1.0 + 1E-12)) or np.any(V < -V_max*1E-12):
+            raise Exception('Input volume is outside the tank')
+        V = np.clip(V, 0.0, V_max).ravel()
+        breaks, n = self.piecewise_breaks, self.piecewise_n
+        j_guess, V_nodes = self.piecewise_j_guess, self.piecewise_V_nodes
+        M, N = j_guess.size - 1, V_nodes.size - 1
+        
+        # Interval of each volume, bracketed by the intervals at the evenly
+        # spaced volumes around it; only the volumes in the few places where 
+        # many intervals fall between those are searched for
+        l = np.minimum((V*(M/V_max)).astype(int), M - 1)
+        j, j_high = np.take(j_guess, l), np.take(j_guess, l + 1)
+        wide = np.flatnonzero(j_high - j > 4)
+        if wide.size:
+            j[wide] = np.clip(np.searchsorted(V_nodes, V[wide], side='right') - 1, 0, N - 1)
+        for _ in range(4):
+            high = (np.take(V_nodes, j + 1) <= V) & (j < N - 1)
+            if not high.any():
+                break
+            j += high
+        
+        # Newton's method on the cubic of each interval from the linear 
+        # interpolation; a few steps over every point, then the points which
+        # have not converged are continued on their own with bisection as a 
+        # safeguard
+        a0, a1, a2, a3 = (np.take(c, j) for c in self.piecewise_coeffs)
+        dV = V - a0
+        span = np.take(V_nodes, j + 1) - a0
+        t = dV/np.where(span > 0.0, span, 1.0)
+        for _ in range(3):
+            err = t*(a1 + t*(a2 + t*a3)) - dV
+            deriv = a1 + t*(2.0*a2 + 3.0*t*a3)
+            step = err/np.where(deriv > 0.0, deriv, np.inf)
+            t = np.clip(t - step, 0.0, 1.0)
+        active = np.flatnonzero(np.abs(step) > 1E-13)
+        t_low, t_high = np.zeros(active.size), np.ones(active.size)
+        for _ in range(100):
+            if not active.size:
+                break
+            ta, b1, b2, b3 = t[active], a1[active], a2[active], a3[active]
+            err = ta*(b1 + ta*(b2 + ta*b3)) - dV[active]
+            deriv = b1 + ta*(2.0*b2 + 3.0*ta*b3)
+            t_low = np.where(err < 0.0, ta, t_low)
+            t_high = np.where(err > 0.0, ta, t_high)
+            t_new = ta - err/np.where(deriv > 0.0, deriv, 1.0)
+            bisect = (deriv <= 0.0) | (t_new <= t_low) | (t_new >= t_high)
+            t_new = np.where(bisect, 0.5*(t_low + t_high), t_new)
+            t_new = np.where(err == 0.0, ta, t_new)
+            t[active] = t_new
+            keep = np.abs(t_new - ta) > 1E-13
+            active, t_low, t_high = active[keep], t_low[keep], t_high[keep]
+        G = j + t
+        
+        i = np.minimum((G*(1.0/n)).astype(int), len(breaks) - 2)
+        h_a, h_b = np.take(breaks, i), np.take(breaks, i + 1)
+        h = h_a + (h_b - h_a)*0.5*(1.0 - np.cos((G - i*n)*(np.pi/n)))
+        h = h.reshape(np.shape(V_in))
+        return h if np.ndim(V_in) else float(h)
+
     def _V_solver_error(self, Vtarget, D, L, horizontal, sideA, sideB, sideA_a,
                        sideB_a, sideA_f, sideA_k, sideB_f, sideB_k,
                        sideA_a_ratio, sideB_a_ratio):
@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+'''Chemical Engineering Design Library (ChEDL). Utilities for process modeling.
+Copyright (C) 2018 Caleb Bell <Caleb.Andrew.Bell@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.'''
+
+from __future__ import division
+from math import pi, log
+import numpy as np
+from scipy.constants import g
+from scipy.sparse import csr_matrix, diags
+from scipy.sparse.linalg import spsolve
+from fluids.friction import LAMINAR_TRANSITION_PIPE
+
+__all__ = ['PipeNetwork', 'Colebrook_Re_derivative']
+
+
+def Colebrook_Re_derivative(Re, eD, fd):
+    r'''Calculates the logarithmic derivative of the Darcy friction factor with
+    respect to Reynolds number, :math:`\text{Re}\cdot df_d/d\text{Re}`, for a
+    friction factor which satisfies the Colebrook equation. Obtained by 
+    implicit differentiation; no iteration is required once `fd` is known.
+    
+    .. math::
+        \text{Re}\frac{df_d}{d\text{Re}} = \frac{-2f_d c}{1 + c}
+        
+        c = \frac{2\cdot 2.51}{\ln(10)\text{Re}\left(\frac{\epsilon/D}{3.7}
+        + \frac{2.51}{\text{Re}\sqrt{f_d}}\right)}
+
+    Parameters
+    ----------
+    Re : float or ndarray
+        Reynolds number, [-]
+    eD : float or ndarray
+        Relative roughness, [-]
+    fd : float or ndarray
+        Darcy friction factor from `Colebrook` or `Clamond`, [-]
+
+    Returns
+    -------
+    dfd_dlnRe : float or ndarray
+        Derivative of friction factor with respect to the natural logarithm of
+        Reynolds number, [-]
+
+    Examples
+    --------
+    >>> Colebrook_Re_derivative(1E5, 1E-4, 0.01851386607747165)
+    -0.0034602179397150083
+    '''
+    z = eD/3.7 + 2.51/(Re*fd**0.5)
+    c = 2.1801582991543236/(Re*z) # 2*2.51/log(10)
+    return -2.*fd*c/(1. + c)
+
+
+class PipeNetwork(object):
+    r'''Class representing a network of pipes connecting nodes, solved for the
+    flow in every pipe and the pressure at every node. The network may contain
+    loops. Nodes either have a specified pressure (reservoirs, supply points)
+    or a specified demand; at least one pressure must be specified.
+    
+    All node and pipe data are held in numpy arrays; a network of 10000 pipes 
+    solves in a fraction of a second. The network is solved with the global
+    gradient method of [1]_ - Newton's method on all of the pipe flows and node
+    pressures at once. Each step requires the solution of one sparse, symmetric
+    linear system in the unknown pressures. The derivatives of pressure drop 
+    with respect to flow are analytical, including the change in friction 
+    factor with Reynolds number.
+
+    Pressure drop in each pipe is calculated from `friction_factor`, 
+    `K_from_f`, and `dP_from_K`, with the total loss coefficient of any 
+    fittings added to that of the pipe. Flow is laminar below 
+    `LAMINAR_TRANSITION_PIPE` and turbulent above `Re_turbulent` (4000). 
+    `friction_factor` is discontinuous at the laminar transition, which stops
+    Newton's method from converging for pipes near it; instead, between the
+    two the friction factor is interpolated with a cubic matching the value
+    and slope of both regimes, as is done in EPANET [2]_. The fluid is 
+    incompressible. 
+    
+    Parameters
+    ----------
+    start : ndarray[int]
+        Index of the node each pipe starts at; positive flow is from `start` to
+        `end`, [-]
+    end : ndarray[int]
+        Index of the node each pipe ends at, [-]
+    L : ndarray
+        Length of each pipe, [m]
+    D : ndarray
+        Inner diameter of each pipe, [m]
+    rho : float
+        Density of the fluid, [kg/m^3]
+    mu : float
+        Viscosity of the fluid, [Pa*s]
+    z : ndarray, optional
+        Elevation of each node, [m]
+    demand : ndarray, optional
+        Flow out of the network at each node (negative for flow into the
+        network), [m^3/s]
+    P : ndarray, optional
+        Specified pressures at each node; NaN for nodes whose pressure is
+        unknown, [Pa]
+    roughness : float or ndarray, optional
+        Roughness of each pipe, [m]
+    K : float or ndarray, optional
+        Total loss coefficient of the fittings in each pipe, based on the pipe's 
+        diameter (for example from `entrance_sharp`, `bend_rounded`, and 
+        `K_gate_valve_Crane`), [-]
+    Method : str, optional
+        Turbulent friction factor correlation; any method of 
+        `friction_factor`. The default is 'Clamond'.
+    
+    Attributes
+    ----------
+    Q : ndarray
+        Volumetric flow in each pipe once solved, [m^3/s]
+    V : ndarray
+        Velocity in each pipe once solved, [m/s]
+    Re : ndarray
+        Reynolds number in each pipe once solved, [-]
+    fd : ndarray
+        Darcy friction factor in each pipe once solved, [-]
+    dP : ndarray
+        Frictional pressure drop in each pipe in the direction of flow 
+        `start` to `end`, [Pa]
+    P : ndarray
+        Pressure at every node once solved, [Pa]
+    iterations : int
+        Number of Newton iterations taken by the last solution, [-]
+    
+    Notes
+    -----
+    Solutions are warm started from the previous solution, so that a network
+    which is re-solved after a small change in demands or pressures converges
+    in one or two iterations. Arrays `demand`, `P`, and `K` may be 
+    modified in place between calls to `solve`.
+    
+    The derivatives of friction factor are analytical for the 'Colebrook' and
+    'Clamond' methods, which solve the same equation; other methods use a 
+    central finite difference.
+
+    Examples
+    --------
+    Two reservoirs at 2 bar and 1 bar connected by one 100 m pipe:
+    
+    >>> net = PipeNetwork(start=[0], end=[1], L=[100.], D=[0.05], rho=1000., 
+    ...                   mu=1E-3, P=[2E5, 1E5], K=[0.5 + 1.0])
+    >>> net.solve().Q
+    array([ 0.00460842])
+
+    References
+    ----------
+    .. [1] Todini, E., and S. Pilati. "A Gradient Algorithm for the Analysis
+       of Pipe Networks." In Computer Applications in Water Supply: Vol. 1 - 
+       Systems Analysis and Simulation, 1-20. Research Studies Press, 1988.
+    .. [2] Rossman, Lewis A. "EPANET 2 Users Manual." U.S. Environmental 
+       Protection Agency, EPA/600/R-00/057, 2000.
+    '''
+    Re_turbulent = 4000.
+    
+    def __init__(self, start, end, L, D, rho, mu, z=None, demand=None, P=None,
+                 roughness=0.0, K=0.0, Method='Clamond'):
+        self.start = start = np.asarray(start, dtype=int)
+        self.end = end = np.asarray(end, dtype=int)
+        self.N_pipes = N_pipes = len(start)
+        self.N_nodes = N_nodes = int(max(start.max(), end.max())) + 1
+
+        self.L = np.asarray(L, dtype=float)*np.ones(N_pipes)
+        self.D = np.asarray(D, dtype=float)*np.ones(N_pipes)
+        self.roughness = np.asarray(roughness, dtype=float)*np.ones(N_pipes)
+        self.K = np.asarray(K, dtype=float)*np.ones(N_pipes)
+        self.A = 0.25*pi*self.D**2
+        self.rho = rho
+        self.mu = mu
+        self.Method = Method
+
+        self.z = np.zeros(N_nodes) if z is None else np.asarray(z, dtype=float)
+        self.demand = np.zeros(N_nodes) if demand is None else np.asarray(demand, dtype=float)
+        if P is None:
+            raise Exception('At least one node must have a specified pressure')
+        self.P_specified = np.asarray(P, dtype=float)
+        
+        self.fixed = fixed = ~np.isnan(self.P_specified)
+        if not fixed.any():
+            raise Exception('At least one node must have a specified pressure')
+        # Index of every node among the nodes of its own kind
+        self.free_index = free_index = np.cumsum(~fixed) - 1
+        self.fixed_index = fixed_index = np.cumsum(fixed) - 1
+        self.N_free = N_free = int((~fixed).sum())
+        N_fixed = N_nodes - N_free
+        
+        # Incidence matrices; B @ P = P[start] - P[end]
+        rows = np.concatenate([np.arange(N_pipes)]*2)
+        nodes = np.concatenate([start, end])
+        signs = np.concatenate([np.ones(N_pipes), -np.ones(N_pipes)])
+        is_fixed = fixed[nodes]
+        self.B = csr_matrix((signs[~is_fixed], (rows[~is_fixed], free_index[nodes][~is_fixed])),
+                            shape=(N_pipes, N_free))
+        self.B0 = csr_matrix((signs[is_fixed], (rows[is_fixed], fixed_index[nodes][is_fixed])),
+                             shape=(N_pipes, N_fixed))
+        self.Q = None
+
+    def pressure_drop(self, Q):
+        r'''Calculates the frictional pressure drop in each pipe and its 
+        derivative with respect to flow, for the specified flows.
+
+        Parameters
+        ----------
+        Q : ndarray
+            Volumetric flow in each pipe, [m^3/s]
+
+        Returns
+        -------
+        dP : ndarray
+            Pressure drop in each pipe, in the direction `start` to `end`, [Pa]
+        ddP_dQ : ndarray
+            Derivative of `dP` with respect to `Q`, [Pa*s/m^3]
+        '''
+        rho, mu, L, D, A, K = self.rho, self.mu, self.L, self.D, self.A, self.K
+        Q_abs = np.abs(Q)
+        self.V = V = Q/A
+        self.Re = Re = rho*np.abs(V)*D/mu
+        
+        laminar = Re < LAMINAR_TRANSITION_PIPE
+        transition = ~laminar & (Re < self.Re_turbulent)
+        turbulent = Re >= self.Re_turbulent
+        eD = self.roughness/D
+        # Laminar friction is written out so zero flow is not a special case
+        C = 0.5*rho/(A*A)
+        dP = K*C*Q*Q_abs
+        ddP_dQ = 2.*K*C*Q_abs
+
+        fd = np.empty(self.N_pipes)
+        with np.errstate(divide='ignore'):
+            fd[laminar] = 64./Re[laminar]
+        R_lam = 32.*mu*L[laminar]/(A[laminar]*D[laminar]**2)
+        dP[laminar] += R_lam*Q[laminar]
+        ddP_dQ[laminar] += R_lam
+        
+        dfd_dlnRe = np.zeros(self.N_pipes)
+        if turbulent.any():
+            fd[turbulent], dfd_dlnRe[turbulent] = self.friction(Re[turbulent], eD[turbulent])
+        if transition.any():
+            fd[transition], dfd_dlnRe[transition] = self.friction_transition(Re[transition], eD[transition])
+        
+        rough = ~laminar
+        C_t = C[rough]*L[rough]/D[rough]
+        fd_t, Q_t, Q_abs_t = fd[rough], Q[rough], Q_abs[rough]
+        dP[rough] += fd_t*C_t*Q_t*Q_abs_t
+        ddP_dQ[rough] += C_t*Q_abs_t*(2.*fd_t + dfd_dlnRe[rough])
+        self.fd = fd
+        self.dP = dP
+        return dP, ddP_dQ
+
+    def friction(self, Re, eD):
+        r'''Calculates the turbulent Darcy friction factor and its derivative 
+        with respect to the logarithm of Reynolds number, using the network's
+        `Method`.
+
+        Parameters
+        ----------
+        Re : ndarray
+            Reynolds number, [-]
+        eD : ndarray
+            Relative roughness, [-]
+
+        Returns
+        -------
+        fd : ndarray
+            Darcy friction factor, [-]
+        dfd_dlnRe : ndarray
+            Derivative of `fd` with respect to the natural logarithm of `Re`,
+            [-]
+        '''
+        from fluids.vectorized import friction_factor
+        Method = self.Method
+        fd = friction_factor(Re, eD, Method=Method)
+        if Method in ('Colebrook', 'Clamond'):
+            dfd_dlnRe = Colebrook_Re_derivative(Re, eD, fd)
+        else:
+            h = 1E-6
+            dfd_dlnRe = (friction_factor(Re*(1. + h), eD, Method=Method)
+                         - friction_factor(Re*(1. - h), eD, Method=Method))/(2.*h)
+        return fd, dfd_dlnRe
+
+    def friction_transition(self, Re, eD):
+        r'''Calculates the Darcy friction factor in the transition region 
+        between `LAMINAR_TRANSITION_PIPE` and `Re_turbulent`, and its 
+        derivative with respect to the logarithm of Reynolds number. A cubic
+        Hermite polynomial in Re matching the value and slope of the laminar
+        friction factor at the start and of the turbulent correlation at the
+        end is used, so pressure drop is smooth in flow.
+
+        Parameters
+        ----------
+        Re : ndarray
+            Reynolds number, [-]
+        eD : ndarray
+            Relative roughness, [-]
+
+        Returns
+        -------
+        fd : ndarray
+            Darcy friction factor, [-]
+        dfd_dlnRe : ndarray
+            Derivative of `fd` with respect to the natural logarithm of `Re`,
+            [-]
+        '''
+        Re1, Re2 = LAMINAR_TRANSITION_PIPE, self.Re_turbulent
+        h = Re2 - Re1
+        f1, m1 = 64./Re1, -64./(Re1*Re1)
+        f2, m2 = self.friction(np.full(Re.shape, Re2), eD)
+        m2 = m2/Re2
+        t = (Re - Re1)/h
+        t2 = t*t
+        t3 = t2*t
+        fd = ((2.*t3 - 3.*t2 + 1.)*f1 + (t3 - 2.*t2 + t)*h*m1 
+              + (-2.*t3 + 3.*t2)*f2 + (t3 - t2)*h*m2)
+        dfd_dt = ((6.*t2 - 6.*t)*f1 + (3.*t2 - 4.*t + 1.)*h*m1
+                  + (-6.*t2 + 6.*t)*f2 + (3.*t2 - 2.*t)*h*m2)
+        return fd, dfd_dt*Re/h
+
+    def solve(self, tol=1E-9, maxiter=100, warm_start=True):
+        r'''Solves the network for the flow in every pipe and the pressure at 
+        every node. The previous solution is used as the initial guess if 
+        there is one and `warm_start` is True; otherwise every pipe starts
+        with a velocity of 1 m/s.
+
+        Parameters
+        ----------
+        tol : float, optional
+            Convergence tolerance on the sum of the absolute changes in flow 
+            in a step, relative to the sum of the absolute flows, [-]
+        maxiter : int, optional
+            Maximum number of Newton iterations, [-]
+        warm_start : bool, optional
+            Whether or not to start from the previous solution, [-]
+
+        Returns
+        -------
+        network : PipeNetwork
+            The solved network; results are set as attributes, [-]
+        '''
+        rho_g = self.rho*g
+        fixed, free = self.fixed, ~self.fixed
+        B, B0, BT = self.B, self.B0, self.B.T.tocsr()
+        # Work in terms of piezometric pressure, which includes elevation
+        P0 = self.P_specified[fixed] + rho_g*self.z[fixed]
+        b0 = B0.dot(P0)
+        demand = self.demand[free]
+        
+        if warm_start and self.Q is not None:
+            Q = self.Q.copy()
+        else:
+            Q = self.A.copy()
+        
+        for i in range(maxiter):
+            dP, ddP_dQ = self.pressure_drop(Q)
+            # Pipes with no flow and no laminar resistance have no derivative
+            ddP_dQ = np.maximum(ddP_dQ, 1E-300)
+            inv_D = 1./ddP_dQ
+            S = BT.dot(diags(inv_D).dot(B))
+            rhs = -demand - BT.dot(Q) + BT.dot(inv_D*(dP - b0))
+            P = spsolve(S.tocsc(), rhs)
+            Q_new = Q + inv_D*(B.dot(P) + b0 - dP)
+            err = np.abs(Q_new - Q).sum()/max(np.abs(Q_new).sum(), 1E-300)
+            Q = Q_new
+            if err < tol:
+                break
+        else:
+            raise Exception('Network solution did not converge')
+        self.iterations = i + 1
+        self.Q = Q
+        self.pressure_drop(Q)
+        
+        P_all = np.empty(self.N_nodes)
+        P_all[free] = P
+        P_all[fixed] = P0
+        self.P = P_all - rho_g*self.z
+        return self
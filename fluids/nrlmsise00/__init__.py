@@ -25,12 +25,16 @@ SOFTWARE.'''
 from . import nrlmsise_00
 from . import nrlmsise_00_header
 from . import nrlmsise_00_data
+from . import nrlmsise_00_vectorized
 
 from .nrlmsise_00 import gtd7
+from .nrlmsise_00_vectorized import gtd7_vectorized, gts7_vectorized, globe7_vectorized
 from .nrlmsise_00_header import nrlmsise_output, nrlmsise_input, nrlmsise_flags, ap_array
 
 
-__all__ = ['nrlmsise_00', 'nrlmsise_00_header', 'nrlmsise_00_data']
+__all__ = ['nrlmsise_00', 'nrlmsise_00_header', 'nrlmsise_00_data',
+           'nrlmsise_00_vectorized']
 
 __all__.extend(nrlmsise_00.__all__)
 __all__.extend(nrlmsise_00_header.__all__)
+__all__.extend(nrlmsise_00_vectorized.__all__)
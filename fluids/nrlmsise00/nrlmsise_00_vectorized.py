@@ -0,0 +1,918 @@
+# -*- coding: utf-8 -*-
+'''Chemical Engineering Design Library (ChEDL). Utilities for process modeling.
+Copyright (C) 2018, Caleb Bell <Caleb.Andrew.Bell@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+NumPy implementation of the NRLMSISE-00 model, evaluating `gtd7`, `gts7` and
+`globe7` over arrays of inputs at once.
+
+The functions follow the scalar port in `nrlmsise_00` statement by statement so
+the results are the same to floating point precision. The differences are:
+
+* Every attribute of the `nrlmsise_input` object may be an array; they are
+  broadcast together, as are the 7 values of `ap_a.a` when daily Ap is
+  switched to -1.
+* Branches on the altitude and other inputs are evaluated on every point and
+  the result selected with `numpy.where`.
+* The shared variables the scalar port keeps as module globals (the Legendre
+  polynomials, the node temperatures, `dm28`, `apdf`, `apt`, ...) are kept in
+  a dictionary local to each call, so calls do not interfere with each other.
+* The switches in `nrlmsise_flags` apply to every point of a call.
+'''
+
+from __future__ import division
+import numpy as np
+from .nrlmsise_00_header import nrlmsise_input, nrlmsise_output, ap_array
+from .nrlmsise_00_data import pt, pd, ps, pdl, ptm, pdm, ptl, pma, pavgm
+from .nrlmsise_00 import tselec
+
+__all__ = ['gtd7_vectorized', 'gts7_vectorized', 'globe7_vectorized']
+
+rgas = 831.4
+dgtr = 1.74533E-2
+dr = 1.72142E-2
+hr = 0.2618
+sr = 7.2722E-5
+
+input_attributes = ['doy', 'sec', 'alt', 'g_lat', 'g_long', 'lst', 'f107A',
+                    'f107', 'ap']
+
+
+def broadcast_input(Input, flags):
+    '''Returns a copy of `Input` with all of its attributes converted to
+    floating point arrays of the same shape.'''
+    values = [np.asarray(getattr(Input, name), dtype=float)
+              for name in input_attributes]
+    ap_values = []
+    if flags.switches[9] == -1:
+        ap_values = [np.asarray(a, dtype=float) for a in Input.ap_a.a]
+    values = np.broadcast_arrays(*(values + ap_values))
+
+    new = nrlmsise_input(year=Input.year)
+    for name, value in zip(input_attributes, values):
+        setattr(new, name, value)
+    if ap_values:
+        new.ap_a = ap_array()
+        new.ap_a.a = values[len(input_attributes):]
+    return new
+
+
+def glatf(lat):
+    c2 = np.cos(2.0*dgtr*lat)
+    gv = 980.616*(1.0 - 0.0026373*c2)
+    reff = 2.0*gv/(3.085462E-6 + 2.27E-9*c2)*1.0E-5
+    return gv, reff
+
+
+def zeta(zz, zl, re):
+    return (zz - zl)*(re + zl)/(re + zz)
+
+
+def ccor(alt, r, h1, zh):
+    e = (alt - zh)/h1
+    ex = np.exp(e)
+    return np.where(e > 70, 1.0, np.where(e < -70, np.exp(r),
+                                          np.exp(r/(1.0 + ex))))
+
+
+def ccor2(alt, r, h1, zh, h2):
+    e1 = (alt - zh)/h1
+    e2 = (alt - zh)/h2
+    ex1 = np.exp(e1)
+    ex2 = np.exp(e2)
+    ccor2v = np.exp(r/(1.0 + 0.5*(ex1 + ex2)))
+    ccor2v = np.where((e1 < -70) & (e2 < -70), np.exp(r), ccor2v)
+    return np.where((e1 > 70) | (e2 > 70), 1.0, ccor2v)
+
+
+def scalh(alt, xm, temp, gsurf, re):
+    g = gsurf/(1.0 + alt/re)**2.0
+    return rgas*temp/(g*xm)
+
+
+def dnet(dd, dm, zhm, xmm, xm):
+    a = zhm/(xmm - xm)
+    not_positive = ~((dm > 0) & (dd > 0))
+    dd = np.where(not_positive & (dd == 0) & (dm == 0), 1.0, dd)
+    ylog = a*np.log(dm/dd)
+    net = dd*(1.0 + np.exp(ylog))**(1.0/a)
+    return np.select([not_positive & (dm == 0), not_positive & (dd == 0),
+                      ylog < -10, ylog > 10], [dd, dm, dd, dm], net)
+
+
+def splini(xa, ya, y2a, x):
+    '''Integral of the cubic spline from `xa[0]` to `x`; all node arguments
+    are lists of arrays, one per node.'''
+    n = len(xa)
+    yi = np.zeros(np.shape(x))
+    for klo in range(n - 1):
+        khi = klo + 1
+        xx = x
+        if khi < n - 1:
+            xx = np.where(x < xa[khi], x, xa[khi])
+        h = xa[khi] - xa[klo]
+        a = (xa[khi] - xx)/h
+        b = (xx - xa[klo])/h
+        a2 = a*a
+        b2 = b*b
+        term = ((1.0 - a2)*ya[klo]/2.0 + b2*ya[khi]/2.0 + ((-(1.0 + a2*a2)/4.0
+                + a2/2.0)*y2a[klo] + (b2*b2/4.0 - b2/2.0)*y2a[khi])*h*h/6.0)*h
+        # The nodes are ascending; the scalar loop stops at the first node
+        # above x
+        yi = np.where(x > xa[klo], yi + term, yi)
+    return yi
+
+
+def splint(xa, ya, y2a, x):
+    '''Cubic spline interpolation at `x`; all node arguments are lists of
+    arrays, one per node.'''
+    n = len(xa)
+    # Same interval as the bisection of the scalar version for ascending nodes
+    klo = np.zeros(np.shape(x), dtype=int)
+    for k in range(1, n - 1):
+        klo += (xa[k] <= x)
+    khi = klo + 1
+    xlo, xhi = np.choose(klo, xa), np.choose(khi, xa)
+    ylo, yhi = np.choose(klo, ya), np.choose(khi, ya)
+    y2lo, y2hi = np.choose(klo, y2a), np.choose(khi, y2a)
+    h = xhi - xlo
+    a = (xhi - x)/h
+    b = (x - xlo)/h
+    return a*ylo + b*yhi + ((a*a*a - a)*y2lo + (b*b*b - b)*y2hi)*h*h/6.0
+
+
+def spline(x, y, yp1, ypn):
+    '''Second derivatives of the cubic spline through the nodes `x`, `y`, with
+    specified end derivatives; all arguments are lists of arrays, one per
+    node.'''
+    n = len(x)
+    y2 = [0.0]*n
+    u = [0.0]*n
+    y2[0] = -0.5
+    u[0] = (3.0/(x[1] - x[0]))*((y[1] - y[0])/(x[1] - x[0]) - yp1)
+    for i in range(1, n - 1):
+        sig = (x[i] - x[i-1])/(x[i+1] - x[i-1])
+        p = sig*y2[i-1] + 2.0
+        y2[i] = (sig - 1.0)/p
+        u[i] = (6.0*((y[i+1] - y[i])/(x[i+1] - x[i]) - (y[i] - y[i-1])
+                /(x[i] - x[i-1]))/(x[i+1] - x[i-1]) - sig*u[i-1])/p
+    qn = 0.5
+    un = (3.0/(x[n-1] - x[n-2]))*(ypn - (y[n-1] - y[n-2])/(x[n-1] - x[n-2]))
+    y2[n-1] = (un - qn*u[n-2])/(qn*y2[n-2] + 1.0)
+    for k in range(n - 2, -1, -1):
+        y2[k] = y2[k]*y2[k+1] + u[k]
+    return y2
+
+
+def spline_profile(z, zn, tn, tgn, re):
+    '''Sets up the spline of inverse temperature through the nodes `zn` and
+    evaluates it at `z`. Returns the spline, the normalized position, the
+    geopotential difference across the nodes, and the temperature at `z`.'''
+    mn = len(zn)
+    z1, z2 = zn[0], zn[mn-1]
+    t1, t2 = tn[0], tn[mn-1]
+    zg = zeta(z, z1, re)
+    zgdif = zeta(z2, z1, re)
+    xs = [zeta(zn[k], z1, re)/zgdif for k in range(mn)]
+    ys = [1.0/tn[k] for k in range(mn)]
+    yd1 = -tgn[0]/(t1*t1)*zgdif
+    yd2 = -tgn[1]/(t2*t2)*zgdif*((re + z2)/(re + z1))**2.0
+    y2out = spline(xs, ys, yd1, yd2)
+    x = zg/zgdif
+    tz = 1.0/splint(xs, ys, y2out, x)
+    return xs, ys, y2out, x, zgdif, tz
+
+
+def densm(alt, d0, xm, zn3, tn3, tgn3, zn2, tn2, tgn2, gsurf, re):
+    '''Temperature and density profiles for the lower atmosphere, for
+    altitudes at or below `zn2[0]`. Returns the density (or the temperature
+    if `xm` is zero) and the temperature.'''
+    # Stratosphere/mesosphere temperature
+    z = np.where(alt > zn2[-1], alt, zn2[-1])
+    xs, ys, y2out, x, zgdif, tz_strat = spline_profile(z, zn2, tn2, tgn2, re)
+    densm_strat = d0
+    if xm != 0.0:
+        glb = gsurf/(1.0 + zn2[0]/re)**2.0
+        gamm = xm*glb*zgdif/rgas
+        expl = gamm*splini(xs, ys, y2out, x)
+        expl = np.where(expl > 50.0, 50.0, expl)
+        densm_strat = densm_strat*(tn2[0]/tz_strat)*np.exp(-expl)
+
+    # Troposphere/stratosphere temperature
+    xs, ys, y2out, x, zgdif, tz = spline_profile(alt, zn3, tn3, tgn3, re)
+    densm_tmp = densm_strat
+    if xm != 0.0:
+        glb = gsurf/(1.0 + zn3[0]/re)**2.0
+        gamm = xm*glb*zgdif/rgas
+        expl = gamm*splini(xs, ys, y2out, x)
+        expl = np.where(expl > 50.0, 50.0, expl)
+        densm_tmp = densm_tmp*(tn3[0]/tz)*np.exp(-expl)
+
+    above = alt > zn3[0]
+    tz = np.where(above, tz_strat, tz)
+    if xm == 0.0:
+        return tz, tz
+    return np.where(above, densm_strat, densm_tmp), tz
+
+
+def densu(alt, dlb, tinf, tlb, xm, alpha, zlb, s2, zn1, tn1, tgn1, gsurf, re):
+    '''Temperature and density profiles for the thermosphere. Below `zn1[0]`
+    the temperature follows a spline through the nodes `tn1[1:]`; the first
+    node and its gradient are those of the Bates profile at `zn1[0]`. Returns
+    the density (or the temperature if `xm` is zero) and the temperature.'''
+    # Joining altitude of Bates and spline
+    za = zn1[0]
+    z = np.where(alt > za, alt, za)
+    zg2 = zeta(z, zlb, re)
+
+    # Bates temperature
+    tt = tinf - (tinf - tlb)*np.exp(-s2*zg2)
+    ta = tt
+    below = alt < za
+
+    # Temperature below za, with the gradient at za from the Bates profile
+    dta = (tinf - ta)*s2*((re + zlb)/(re + za))**2.0
+    tn = [ta] + list(tn1[1:])
+    z = np.where(alt > zn1[-1], alt, zn1[-1])
+    xs, ys, y2out, x, zgdif, tz = spline_profile(z, zn1, tn, [dta, tgn1[1]], re)
+    tz = np.where(below, tz, tt)
+    if xm == 0:
+        return tz, tz
+
+    # Density above za
+    glb = gsurf/(1.0 + zlb/re)**2.0
+    gamma = xm*glb/(s2*rgas*tinf)
+    expl = np.exp(-s2*gamma*zg2)
+    expl = np.where((expl > 50.0) | (tt <= 0), 50.0, expl)
+    densa = dlb*(tlb/tt)**(1.0 + alpha + gamma)*expl
+
+    # Density below za
+    glb = gsurf/(1.0 + za/re)**2.0
+    gamm = xm*glb*zgdif/rgas
+    expl = gamm*splini(xs, ys, y2out, x)
+    expl = np.where((expl > 50.0) | (tz <= 0), 50.0, expl)
+    densb = densa*(ta/tz)**(1.0 + alpha)*np.exp(-expl)
+    return np.where(below, densb, densa), tz
+
+
+def lpoly(Input, flags):
+    '''Legendre polynomials of latitude and harmonics of local time shared by
+    `globe7_vectorized` and `glob7s`; the returned dictionary also holds the
+    magnetic activity terms each call to `globe7_vectorized` updates.'''
+    c = np.sin(Input.g_lat*dgtr)
+    s = np.cos(Input.g_lat*dgtr)
+    c2 = c*c
+    c4 = c2*c2
+    s2 = s*s
+    zero = np.zeros(np.shape(c))
+    plg = [[zero]*9 for _ in range(4)]
+    plg[0][1] = c
+    plg[0][2] = 0.5*(3.0*c2 - 1.0)
+    plg[0][3] = 0.5*(5.0*c*c2 - 3.0*c)
+    plg[0][4] = (35.0*c4 - 30.0*c2 + 3.0)/8.0
+    plg[0][5] = (63.0*c2*c2*c - 70.0*c2*c + 15.0*c)/8.0
+    plg[0][6] = (11.0*c*plg[0][5] - 5.0*plg[0][4])/6.0
+    plg[1][1] = s
+    plg[1][2] = 3.0*c*s
+    plg[1][3] = 1.5*(5.0*c2 - 1.0)*s
+    plg[1][4] = 2.5*(7.0*c2*c - 3.0*c)*s
+    plg[1][5] = 1.875*(21.0*c4 - 14.0*c2 + 1.0)*s
+    plg[1][6] = (11.0*c*plg[1][5] - 6.0*plg[1][4])/5.0
+    plg[2][2] = 3.0*s2
+    plg[2][3] = 15.0*s2*c
+    plg[2][4] = 7.5*(7.0*c2 - 1.0)*s2
+    plg[2][5] = 3.0*c*plg[2][4] - 2.0*plg[2][3]
+    plg[2][6] = (11.0*c*plg[2][5] - 7.0*plg[2][4])/4.0
+    plg[2][7] = (13.0*c*plg[2][6] - 8.0*plg[2][5])/5.0
+    plg[3][3] = 15.0*s2*s
+    plg[3][4] = 105.0*s2*s*c
+    plg[3][5] = (9.0*c*plg[3][4] - 7.*plg[3][3])/2.0
+    plg[3][6] = (11.0*c*plg[3][5] - 8.*plg[3][4])/3.0
+
+    tloc = Input.lst
+    return {'plg': plg, 'dfa': Input.f107A - 150.0,
+            'stloc': np.sin(hr*tloc), 'ctloc': np.cos(hr*tloc),
+            's2tloc': np.sin(2.0*hr*tloc), 'c2tloc': np.cos(2.0*hr*tloc),
+            's3tloc': np.sin(3.0*hr*tloc), 'c3tloc': np.cos(3.0*hr*tloc),
+            'apdf': 0.0, 'apt': 0.0}
+
+
+def g0(a, p):
+    return (a - 4.0 + (p[25] - 1.0)*(a - 4.0 + (np.exp(-abs(p[24])*(a - 4.0))
+                                                - 1.0)/abs(p[24])))
+
+
+def sumex(ex):
+    return 1.0 + (1.0 - ex**19.0)/(1.0 - ex)*ex**0.5
+
+
+def sg0(ex, p, ap):
+    return (g0(ap[1], p) + (g0(ap[2], p)*ex + g0(ap[3], p)*ex*ex
+            + g0(ap[4], p)*ex**3.0 + (g0(ap[5], p)*ex**4.0
+            + g0(ap[6], p)*ex**12.0)*(1.0 - ex**8.0)/(1.0 - ex)))/sumex(ex)
+
+
+def globe7_vectorized(p, Input, flags, state=None):
+    r'''Calculates the G(L) function of the upper thermosphere parameters
+    `p` for arrays of inputs; the vectorized version of `globe7`.
+
+    Parameters
+    ----------
+    p : list[float]
+        Coefficients of the parameter set, [-]
+    Input : nrlmsise_input
+        Inputs; every attribute may be an array, and all of them must already
+        be arrays of the same shape, [-]
+    flags : nrlmsise_flags
+        Model switches, already processed with `tselec`, [-]
+    state : dict, optional
+        Shared variables from `lpoly`; updated with the magnetic activity
+        terms, as the scalar version updates its module globals, [-]
+
+    Returns
+    -------
+    tinf : array
+        Value of the G(L) function, [-]
+    '''
+    if state is None:
+        state = lpoly(Input, flags)
+    t = [0.0]*15
+    sw, swc = flags.sw, flags.swc
+    plg, dfa = state['plg'], state['dfa']
+    stloc, ctloc = state['stloc'], state['ctloc']
+    s2tloc, c2tloc = state['s2tloc'], state['c2tloc']
+    s3tloc, c3tloc = state['s3tloc'], state['c3tloc']
+    tloc = Input.lst
+    doy = Input.doy
+
+    cd32 = np.cos(dr*(doy - p[31]))
+    cd18 = np.cos(2.0*dr*(doy - p[17]))
+    cd14 = np.cos(dr*(doy - p[13]))
+    cd39 = np.cos(2.0*dr*(doy - p[38]))
+
+    # F10.7 effect
+    df = Input.f107 - Input.f107A
+    t[0] = p[19]*df*(1.0 + p[59]*dfa) + p[20]*df*df + p[21]*dfa + p[29]*dfa**2.0
+    f1 = 1.0 + (p[47]*dfa + p[19]*df + p[20]*df*df)*swc[1]
+    f2 = 1.0 + (p[49]*dfa + p[19]*df + p[20]*df*df)*swc[1]
+
+    # Time independent
+    t[1] = ((p[1]*plg[0][2] + p[2]*plg[0][4] + p[22]*plg[0][6])
+            + (p[14]*plg[0][2])*dfa*swc[1] + p[26]*plg[0][1])
+    # Symmetrical annual
+    t[2] = p[18]*cd32
+    # Symmetrical semiannual
+    t[3] = (p[15] + p[16]*plg[0][2])*cd18
+    # Asymmetrical annual
+    t[4] = f1*(p[9]*plg[0][1] + p[10]*plg[0][3])*cd14
+    # Asymmetrical semiannual
+    t[5] = p[37]*plg[0][1]*cd39
+
+    # Diurnal
+    if sw[7]:
+        t71 = (p[11]*plg[1][2])*cd14*swc[5]
+        t72 = (p[12]*plg[1][2])*cd14*swc[5]
+        t[6] = f2*((p[3]*plg[1][1] + p[4]*plg[1][3] + p[27]*plg[1][5] + t71)
+                   *ctloc + (p[6]*plg[1][1] + p[7]*plg[1][3] + p[28]*plg[1][5]
+                             + t72)*stloc)
+    # Semidiurnal
+    if sw[8]:
+        t81 = (p[23]*plg[2][3] + p[35]*plg[2][5])*cd14*swc[5]
+        t82 = (p[33]*plg[2][3] + p[36]*plg[2][5])*cd14*swc[5]
+        t[7] = f2*((p[5]*plg[2][2] + p[41]*plg[2][4] + t81)*c2tloc
+                   + (p[8]*plg[2][2] + p[42]*plg[2][4] + t82)*s2tloc)
+    # Terdiurnal
+    if sw[14]:
+        t[13] = f2*((p[39]*plg[3][3] + (p[93]*plg[3][4] + p[46]*plg[3][6])
+                     *cd14*swc[5])*s3tloc + (p[40]*plg[3][3] + (p[94]*plg[3][4]
+                     + p[48]*plg[3][6])*cd14*swc[5])*c3tloc)
+
+    # Magnetic activity based on daily ap
+    if sw[9] == -1:
+        if p[51] != 0:
+            exp1 = np.exp(-10800.0*abs(p[51])/(1.0 + p[138]*(45.0
+                                                    - np.abs(Input.g_lat))))
+            exp1 = np.where(exp1 > 0.99999, 0.99999, exp1)
+            state['apt'] = sg0(exp1, p, Input.ap_a.a)
+            if sw[9]:
+                t[8] = state['apt']*(p[50] + p[96]*plg[0][2] + p[54]*plg[0][4]
+                        + (p[125]*plg[0][1] + p[126]*plg[0][3]
+                           + p[127]*plg[0][5])*cd14*swc[5]
+                        + (p[128]*plg[1][1] + p[129]*plg[1][3]
+                           + p[130]*plg[1][5])*swc[7]*np.cos(hr*(tloc - p[131])))
+    else:
+        apd = Input.ap - 4.0
+        p44 = p[43]
+        p45 = p[44]
+        if p44 < 0:
+            p44 = 1.0E-5
+        apdf = state['apdf'] = apd + (p45 - 1.0)*(apd + (np.exp(-p44*apd)
+                                                         - 1.0)/p44)
+        if sw[9]:
+            t[8] = apdf*(p[32] + p[45]*plg[0][2] + p[34]*plg[0][4]
+                    + (p[100]*plg[0][1] + p[101]*plg[0][3]
+                       + p[102]*plg[0][5])*cd14*swc[5]
+                    + (p[121]*plg[1][1] + p[122]*plg[1][3]
+                       + p[123]*plg[1][5])*swc[7]*np.cos(hr*(tloc - p[124])))
+
+    if sw[10]:
+        g_long, sec = Input.g_long, Input.sec
+        has_long = g_long > -1000.0
+        # Longitudinal
+        if sw[11]:
+            t[10] = np.where(has_long, (1.0 + p[80]*dfa*swc[1])
+                    *((p[64]*plg[1][2] + p[65]*plg[1][4] + p[66]*plg[1][6]
+                       + p[103]*plg[1][1] + p[104]*plg[1][3] + p[105]*plg[1][5]
+                       + swc[5]*(p[109]*plg[1][1] + p[110]*plg[1][3]
+                                 + p[111]*plg[1][5])*cd14)*np.cos(dgtr*g_long)
+                      + (p[90]*plg[1][2] + p[91]*plg[1][4] + p[92]*plg[1][6]
+                         + p[106]*plg[1][1] + p[107]*plg[1][3]
+                         + p[108]*plg[1][5] + swc[5]*(p[112]*plg[1][1]
+                         + p[113]*plg[1][3] + p[114]*plg[1][5])*cd14)
+                      *np.sin(dgtr*g_long)), 0.0)
+        # UT and mixed UT, longitude
+        if sw[12]:
+            t11 = ((1.0 + p[95]*plg[0][1])*(1.0 + p[81]*dfa*swc[1])
+                   *(1.0 + p[119]*plg[0][1]*swc[5]*cd14)
+                   *((p[68]*plg[0][1] + p[69]*plg[0][3] + p[70]*plg[0][5])
+                     *np.cos(sr*(sec - p[71]))))
+            t11 += (swc[11]*(p[76]*plg[2][3] + p[77]*plg[2][5] + p[78]*plg[2][7])
+                    *np.cos(sr*(sec - p[79]) + 2.0*dgtr*g_long)
+                    *(1.0 + p[137]*dfa*swc[1]))
+            t[11] = np.where(has_long, t11, 0.0)
+        # UT, longitude magnetic activity
+        if sw[13]:
+            if sw[9] == -1:
+                if p[51]:
+                    apt = state['apt']
+                    t12 = (apt*swc[11]*(1. + p[132]*plg[0][1])
+                           *((p[52]*plg[1][2] + p[98]*plg[1][4] + p[67]*plg[1][6])
+                             *np.cos(dgtr*(g_long - p[97])))
+                           + apt*swc[11]*swc[5]*(p[133]*plg[1][1]
+                             + p[134]*plg[1][3] + p[135]*plg[1][5])
+                           *cd14*np.cos(dgtr*(g_long - p[136]))
+                           + apt*swc[12]*(p[55]*plg[0][1] + p[56]*plg[0][3]
+                                          + p[57]*plg[0][5])
+                           *np.cos(sr*(sec - p[58])))
+                    t[12] = np.where(has_long, t12, 0.0)
+            else:
+                apdf = state['apdf']
+                t12 = (apdf*swc[11]*(1.0 + p[120]*plg[0][1])
+                       *((p[60]*plg[1][2] + p[61]*plg[1][4] + p[62]*plg[1][6])
+                         *np.cos(dgtr*(g_long - p[63])))
+                       + apdf*swc[11]*swc[5]*(p[115]*plg[1][1]
+                         + p[116]*plg[1][3] + p[117]*plg[1][5])
+                       *cd14*np.cos(dgtr*(g_long - p[118]))
+                       + apdf*swc[12]*(p[83]*plg[0][1] + p[84]*plg[0][3]
+                                       + p[85]*plg[0][5])
+                       *np.cos(sr*(sec - p[75])))
+                t[12] = np.where(has_long, t12, 0.0)
+
+    tinf = p[30]
+    for i in range(14):
+        tinf = tinf + abs(sw[i+1])*t[i]
+    return tinf
+
+
+def glob7s(p, Input, flags, state):
+    '''Version of `globe7_vectorized` for the lower atmosphere.'''
+    t = [0.0]*14
+    sw, swc = flags.sw, flags.swc
+    plg, dfa = state['plg'], state['dfa']
+    doy = Input.doy
+    cd32 = np.cos(dr*(doy - p[31]))
+    cd18 = np.cos(2.0*dr*(doy - p[17]))
+    cd14 = np.cos(dr*(doy - p[13]))
+    cd39 = np.cos(2.0*dr*(doy - p[38]))
+
+    # F10.7
+    t[0] = p[21]*dfa
+    # Time independent
+    t[1] = (p[1]*plg[0][2] + p[2]*plg[0][4] + p[22]*plg[0][6] + p[26]*plg[0][1]
+            + p[14]*plg[0][3] + p[59]*plg[0][5])
+    # Symmetrical annual
+    t[2] = (p[18] + p[47]*plg[0][2] + p[29]*plg[0][4])*cd32
+    # Symmetrical semiannual
+    t[3] = (p[15] + p[16]*plg[0][2] + p[30]*plg[0][4])*cd18
+    # Asymmetrical annual
+    t[4] = (p[9]*plg[0][1] + p[10]*plg[0][3] + p[20]*plg[0][5])*cd14
+    # Asymmetrical semiannual
+    t[5] = (p[37]*plg[0][1])*cd39
+
+    # Diurnal
+    if sw[7]:
+        t71 = p[11]*plg[1][2]*cd14*swc[5]
+        t72 = p[12]*plg[1][2]*cd14*swc[5]
+        t[6] = ((p[3]*plg[1][1] + p[4]*plg[1][3] + t71)*state['ctloc']
+                + (p[6]*plg[1][1] + p[7]*plg[1][3] + t72)*state['stloc'])
+    # Semidiurnal
+    if sw[8]:
+        t81 = (p[23]*plg[2][3] + p[35]*plg[2][5])*cd14*swc[5]
+        t82 = (p[33]*plg[2][3] + p[36]*plg[2][5])*cd14*swc[5]
+        t[7] = ((p[5]*plg[2][2] + p[41]*plg[2][4] + t81)*state['c2tloc']
+                + (p[8]*plg[2][2] + p[42]*plg[2][4] + t82)*state['s2tloc'])
+    # Terdiurnal
+    if sw[14]:
+        t[13] = (p[39]*plg[3][3]*state['s3tloc']
+                 + p[40]*plg[3][3]*state['c3tloc'])
+
+    # Magnetic activity
+    if sw[9]:
+        if sw[9] == 1:
+            t[8] = state['apdf']*(p[32] + p[45]*plg[0][2]*swc[2])
+        if sw[9] == -1:
+            apt = state['apt']
+            t[8] = (p[50]*apt + p[96]*plg[0][2]*apt*swc[2])
+
+    # Longitudinal
+    if not (sw[10] == 0 or sw[11] == 0):
+        g_long = Input.g_long
+        t10 = ((1.0 + plg[0][1]*(p[80]*swc[5]*np.cos(dr*(doy - p[81]))
+                + p[85]*swc[6]*np.cos(2.0*dr*(doy - p[86])))
+                + p[83]*swc[3]*np.cos(dr*(doy - p[84]))
+                + p[87]*swc[4]*np.cos(2.0*dr*(doy - p[88])))
+               *((p[64]*plg[1][2] + p[65]*plg[1][4] + p[66]*plg[1][6]
+                  + p[74]*plg[1][1] + p[75]*plg[1][3] + p[76]*plg[1][5])
+                 *np.cos(dgtr*g_long)
+                 + (p[90]*plg[1][2] + p[91]*plg[1][4] + p[92]*plg[1][6]
+                    + p[77]*plg[1][1] + p[78]*plg[1][3] + p[79]*plg[1][5])
+                 *np.sin(dgtr*g_long)))
+        t[10] = np.where(g_long <= -1000.0, 0.0, t10)
+    tt = 0
+    for i in range(14):
+        tt += abs(sw[i+1])*t[i]
+    return tt
+
+
+def gts7(Input, flags, output, state):
+    zn1 = [120.0, 110.0, 100.0, 90.0, 72.5]
+    alpha = [-0.38, 0.0, 0.0, 0.0, 0.17, 0.0, -0.38, 0.0, 0.0]
+    altl = [200.0, 300.0, 160.0, 250.0, 240.0, 450.0, 320.0, 450.0]
+    sw = flags.sw
+    za = pdl[1][15]
+    zn1[0] = za
+    gsurf, re = state['gsurf'], state['re']
+    alt = Input.alt
+    zlb = ptm[5]
+
+    # Tinf variations not important below za or zn1[0]
+    tinf = np.where(alt > zn1[0],
+                    ptm[0]*pt[0]*(1.0 + sw[16]*globe7_vectorized(pt, Input, flags, state)),
+                    ptm[0]*pt[0])
+    output.t[0] = tinf
+
+    # Gradient variations not important below zn1[4]
+    g0 = np.where(alt > zn1[4],
+                  ptm[3]*ps[0]*(1.0 + sw[19]*globe7_vectorized(ps, Input, flags, state)),
+                  ptm[3]*ps[0])
+    tlb = ptm[1]*(1.0 + sw[17]*globe7_vectorized(pd[3], Input, flags, state))*pd[3][0]
+    s = g0/(tinf - tlb)
+
+    # Lower thermosphere temp variations not significant for density above
+    # 300 km
+    low = alt < 300.0
+    tn1 = [None]*5
+    tgn1 = [None]*2
+    tn1[1] = np.where(low, ptm[6]*ptl[0][0]/(1.0 - sw[18]*glob7s(ptl[0], Input, flags, state)),
+                      ptm[6]*ptl[0][0])
+    tn1[2] = np.where(low, ptm[2]*ptl[1][0]/(1.0 - sw[18]*glob7s(ptl[1], Input, flags, state)),
+                      ptm[2]*ptl[1][0])
+    tn1[3] = np.where(low, ptm[7]*ptl[2][0]/(1.0 - sw[18]*glob7s(ptl[2], Input, flags, state)),
+                      ptm[7]*ptl[2][0])
+    tn1[4] = np.where(low, ptm[4]*ptl[3][0]/(1.0 - sw[18]*sw[20]*glob7s(ptl[3], Input, flags, state)),
+                      ptm[4]*ptl[3][0])
+    tgn1[1] = np.where(low, ptm[8]*pma[8][0]*(1.0 + sw[18]*sw[20]*glob7s(pma[8], Input, flags, state))
+                       *tn1[4]*tn1[4]/(ptm[4]*ptl[3][0])**2.0,
+                       ptm[8]*pma[8][0]*tn1[4]*tn1[4]/(ptm[4]*ptl[3][0])**2.0)
+    state['tn1'], state['tgn1'] = tn1, tgn1
+
+    def densu_at(alt, dlb, xm, alpha, tinf=tinf, tlb=tlb):
+        return densu(alt, dlb, tinf, tlb, xm, alpha, zlb, s, zn1, tn1, tgn1,
+                     gsurf, re)[0]
+
+    # N2 variation factor at Zlb
+    g28 = sw[21]*globe7_vectorized(pd[2], Input, flags, state)
+    # Variation of turbopause height
+    zhf = pdl[1][24]*(1.0 + sw[5]*pdl[0][24]*np.sin(dgtr*Input.g_lat)
+                      *np.cos(dr*(Input.doy - pt[13])))
+    xmm = pdm[2][4]
+    z = alt
+
+    # N2 density
+    # Diffusive density at Zlb and at Alt
+    db28 = pdm[2][0]*np.exp(g28)*pd[2][0]
+    output.d[2] = densu_at(z, db28, 28.0, alpha[2])
+    # Turbopause
+    zh28 = pdm[2][2]*zhf
+    zhm28 = pdm[2][3]*pdl[1][5]
+    xmd = 28.0 - xmm
+    # Mixed density at Zlb
+    b28 = densu_at(zh28, db28, xmd, alpha[2] - 1.0)
+    # Mixed density at Alt; the lower atmosphere also uses it
+    dm28 = state['dm28'] = densu_at(z, b28, xmm, alpha[2])
+    if sw[15]:
+        # Net density at Alt
+        output.d[2] = np.where(z <= altl[2], dnet(output.d[2], dm28, zhm28,
+                                                  xmm, 28.0), output.d[2])
+
+    # He density
+    g4 = sw[21]*globe7_vectorized(pd[0], Input, flags, state)
+    db04 = pdm[0][0]*np.exp(g4)*pd[0][0]
+    output.d[0] = densu_at(z, db04, 4., alpha[0])
+    if sw[15]:
+        zh04 = pdm[0][2]
+        b04 = densu_at(zh04, db04, 4. - xmm, alpha[0] - 1.)
+        dm04 = densu_at(z, b04, xmm, 0.)
+        zhm04 = zhm28
+        net = dnet(output.d[0], dm04, zhm04, xmm, 4.)
+        # Correction to specified mixing ratio at ground
+        rl = np.log(b28*pdm[0][1]/b04)
+        zc04 = pdm[0][4]*pdl[1][0]
+        hc04 = pdm[0][5]*pdl[1][1]
+        net = net*ccor(z, rl, hc04, zc04)
+        output.d[0] = np.where(z < altl[0], net, output.d[0])
+
+    # O density
+    g16 = sw[21]*globe7_vectorized(pd[1], Input, flags, state)
+    db16 = pdm[1][0]*np.exp(g16)*pd[1][0]
+    output.d[1] = densu_at(z, db16, 16., alpha[1])
+    if sw[15]:
+        zh16 = pdm[1][2]
+        b16 = densu_at(zh16, db16, 16.0 - xmm, alpha[1] - 1.0)
+        dm16 = densu_at(z, b16, xmm, 0.)
+        zhm16 = zhm28
+        net = dnet(output.d[1], dm16, zhm16, xmm, 16.)
+        rl = pdm[1][1]*pdl[1][16]*(1.0 + sw[1]*pdl[0][23]*(Input.f107A - 150.0))
+        hc16 = pdm[1][5]*pdl[1][3]
+        zc16 = pdm[1][4]*pdl[1][2]
+        hc216 = pdm[1][5]*pdl[1][4]
+        net = net*ccor2(z, rl, hc16, zc16, hc216)
+        # Chemistry correction
+        hcc16 = pdm[1][7]*pdl[1][13]
+        zcc16 = pdm[1][6]*pdl[1][12]
+        rc16 = pdm[1][3]*pdl[1][14]
+        net = net*ccor(z, rc16, hcc16, zcc16)
+        output.d[1] = np.where(z <= altl[1], net, output.d[1])
+
+    # O2 density
+    g32 = sw[21]*globe7_vectorized(pd[4], Input, flags, state)
+    db32 = pdm[3][0]*np.exp(g32)*pd[4][0]
+    output.d[3] = densu_at(z, db32, 32., alpha[3])
+    if sw[15]:
+        zh32 = pdm[3][2]
+        b32 = densu_at(zh32, db32, 32. - xmm, alpha[3] - 1.)
+        dm32 = densu_at(z, b32, xmm, 0.)
+        zhm32 = zhm28
+        net = dnet(output.d[3], dm32, zhm32, xmm, 32.)
+        rl = np.log(b28*pdm[3][1]/b32)
+        hc32 = pdm[3][5]*pdl[1][7]
+        zc32 = pdm[3][4]*pdl[1][6]
+        net = net*ccor(z, rl, hc32, zc32)
+        output.d[3] = np.where(z <= altl[3], net, output.d[3])
+        # Correction for general departure from diffusive equilibrium above
+        # Zlb
+        hcc32 = pdm[3][7]*pdl[1][22]
+        hcc232 = pdm[3][7]*pdl[0][22]
+        zcc32 = pdm[3][6]*pdl[1][21]
+        rc32 = pdm[3][3]*pdl[1][23]*(1. + sw[1]*pdl[0][23]*(Input.f107A - 150.))
+        output.d[3] = output.d[3]*ccor2(z, rc32, hcc32, zcc32, hcc232)
+
+    # Ar density
+    g40 = sw[21]*globe7_vectorized(pd[5], Input, flags, state)
+    db40 = pdm[4][0]*np.exp(g40)*pd[5][0]
+    output.d[4] = densu_at(z, db40, 40., alpha[4])
+    if sw[15]:
+        zh40 = pdm[4][2]
+        b40 = densu_at(zh40, db40, 40. - xmm, alpha[4] - 1.)
+        dm40 = densu_at(z, b40, xmm, 0.)
+        zhm40 = zhm28
+        net = dnet(output.d[4], dm40, zhm40, xmm, 40.)
+        rl = np.log(b28*pdm[4][1]/b40)
+        hc40 = pdm[4][5]*pdl[1][9]
+        zc40 = pdm[4][4]*pdl[1][8]
+        net = net*ccor(z, rl, hc40, zc40)
+        output.d[4] = np.where(z <= altl[4], net, output.d[4])
+
+    # Hydrogen density
+    g1 = sw[21]*globe7_vectorized(pd[6], Input, flags, state)
+    db01 = pdm[5][0]*np.exp(g1)*pd[6][0]
+    output.d[6] = densu_at(z, db01, 1., alpha[6])
+    if sw[15]:
+        zh01 = pdm[5][2]
+        b01 = densu_at(zh01, db01, 1. - xmm, alpha[6] - 1.)
+        dm01 = densu_at(z, b01, xmm, 0.)
+        zhm01 = zhm28
+        net = dnet(output.d[6], dm01, zhm01, xmm, 1.)
+        rl = np.log(b28*pdm[5][1]*abs(pdl[1][17])/b01)
+        hc01 = pdm[5][5]*pdl[1][11]
+        zc01 = pdm[5][4]*pdl[1][10]
+        net = net*ccor(z, rl, hc01, zc01)
+        # Chemistry correction
+        hcc01 = pdm[5][7]*pdl[1][19]
+        zcc01 = pdm[5][6]*pdl[1][18]
+        rc01 = pdm[5][3]*pdl[1][20]
+        net = net*ccor(z, rc01, hcc01, zcc01)
+        output.d[6] = np.where(z <= altl[6], net, output.d[6])
+
+    # Atomic nitrogen density
+    g14 = sw[21]*globe7_vectorized(pd[7], Input, flags, state)
+    db14 = pdm[6][0]*np.exp(g14)*pd[7][0]
+    output.d[7] = densu_at(z, db14, 14., alpha[7])
+    if sw[15]:
+        zh14 = pdm[6][2]
+        b14 = densu_at(zh14, db14, 14. - xmm, alpha[7] - 1.)
+        dm14 = densu_at(z, b14, xmm, 0.)
+        zhm14 = zhm28
+        net = dnet(output.d[7], dm14, zhm14, xmm, 14.)
+        rl = np.log(b28*pdm[6][1]*abs(pdl[0][2])/b14)
+        hc14 = pdm[6][5]*pdl[0][1]
+        zc14 = pdm[6][4]*pdl[0][0]
+        net = net*ccor(z, rl, hc14, zc14)
+        # Chemistry correction
+        hcc14 = pdm[6][7]*pdl[0][4]
+        zcc14 = pdm[6][6]*pdl[0][3]
+        rc14 = pdm[6][3]*pdl[0][5]
+        net = net*ccor(z, rc14, hcc14, zcc14)
+        output.d[7] = np.where(z <= altl[7], net, output.d[7])
+
+    # Anomalous oxygen density
+    g16h = sw[21]*globe7_vectorized(pd[8], Input, flags, state)
+    db16h = pdm[7][0]*np.exp(g16h)*pd[8][0]
+    tho = pdm[7][9]*pdl[0][6]
+    dd = densu_at(z, db16h, 16., alpha[8], tinf=tho, tlb=tho)
+    zsht = pdm[7][5]
+    zmho = pdm[7][4]
+    zsho = scalh(zmho, 16.0, tho, gsurf, re)
+    output.d[8] = dd*np.exp(-zsht/zsho*(np.exp(-(z - zmho)/zsht) - 1.))
+
+    # Total mass density
+    output.d[5] = 1.66E-24*(4.0*output.d[0] + 16.0*output.d[1]
+                            + 28.0*output.d[2] + 32.0*output.d[3]
+                            + 40.0*output.d[4] + output.d[6]
+                            + 14.0*output.d[7])
+
+    # Temperature
+    z = np.abs(alt)
+    output.t[1] = densu(z, 1.0, tinf, tlb, 0.0, 0.0, zlb, s, zn1, tn1, tgn1,
+                        gsurf, re)[1]
+    if sw[0]:
+        for i in range(9):
+            output.d[i] = output.d[i]*1.0E6
+        output.d[5] = output.d[5]/1000
+
+
+def new_state(Input, flags):
+    tselec(flags)
+    state = lpoly(Input, flags)
+    # Latitude variation of gravity (none for sw[2]=0)
+    xlat = Input.g_lat if flags.sw[2] != 0 else 45.0
+    state['gsurf'], state['re'] = glatf(xlat)
+    return state
+
+
+def gts7_vectorized(Input, flags, output):
+    r'''Thermospheric portion of the NRLMSISE-00 model, for arrays of inputs;
+    the vectorized version of `gts7`. Valid for altitudes above 72.5 km only.
+
+    Parameters
+    ----------
+    Input : nrlmsise_input
+        Inputs; every attribute may be an array, and they are broadcast
+        together, [-]
+    flags : nrlmsise_flags
+        Model switches, [-]
+    output : nrlmsise_output
+        Output object, whose `d` and `t` lists are filled with arrays, [-]
+    '''
+    Input = broadcast_input(Input, flags)
+    with np.errstate(all='ignore'):
+        gts7(Input, flags, output, new_state(Input, flags))
+
+
+def gtd7_vectorized(Input, flags, output):
+    r'''NRLMSISE-00 model for arrays of inputs; the vectorized version of
+    `gtd7`.
+
+    Every attribute of `Input` may be an array, and they are broadcast
+    together; each entry of the `d` and `t` lists of `output` is set to an
+    array of the broadcast shape. The results are the same as calling `gtd7`
+    once for each set of inputs.
+
+    Parameters
+    ----------
+    Input : nrlmsise_input
+        Inputs; every attribute may be an array, [-]
+    flags : nrlmsise_flags
+        Model switches, the same for all the inputs, [-]
+    output : nrlmsise_output
+        Output object, whose `d` and `t` lists are filled with arrays, [-]
+
+    Examples
+    --------
+    >>> Input, flags, output = nrlmsise_input(), nrlmsise_flags(), nrlmsise_output()
+    >>> flags.switches = [0] + [1]*23
+    >>> Input.alt = np.array([0.0, 50.0, 400.0])
+    >>> Input.f107A = Input.f107 = 150.
+    >>> Input.ap = 4.
+    >>> gtd7_vectorized(Input, flags, output)
+    >>> output.t[1]
+    array([ 300.71596651,  267.21058379,  943.23754379])
+    '''
+    mn3 = 5
+    zn3 = [32.5, 20.0, 15.0, 10.0, 0.0]
+    mn2 = 4
+    zn2 = [72.5, 55.0, 45.0, 32.5]
+    zmix = 62.5
+    soutput = nrlmsise_output()
+    Input = broadcast_input(Input, flags)
+    state = new_state(Input, flags)
+    sw = flags.sw
+    xmm = pdm[2][4]
+
+    # Thermosphere/mesosphere (above zn2[0])
+    alt = Input.alt
+    Input.alt = np.where(alt > zn2[0], alt, zn2[0])
+    with np.errstate(all='ignore'):
+        gts7(Input, flags, soutput, state)
+    Input.alt = alt
+    output.t[0] = soutput.t[0]
+    output.t[1] = soutput.t[1]
+    if np.all(alt >= zn2[0]):
+        output.d = list(soutput.d)
+        return
+    dm28m = state['dm28']*1.0E6 if sw[0] else state['dm28']
+    tn1, tgn1 = state['tn1'], state['tgn1']
+
+    with np.errstate(all='ignore'):
+        # Lower mesosphere/upper stratosphere (between zn3[0] and zn2[0])
+        # Temperature at nodes and gradients at end nodes; inverse temperature
+        # a linear function of spherical harmonics
+        tn2 = [0.0]*mn2
+        tgn2 = [0.0]*2
+        tgn2[0] = tgn1[1]
+        tn2[0] = tn1[4]
+        tn2[1] = pma[0][0]*pavgm[0]/(1.0 - sw[20]*glob7s(pma[0], Input, flags, state))
+        tn2[2] = pma[1][0]*pavgm[1]/(1.0 - sw[20]*glob7s(pma[1], Input, flags, state))
+        tn2[3] = pma[2][0]*pavgm[2]/(1.0 - sw[20]*sw[22]*glob7s(pma[2], Input, flags, state))
+        tgn2[1] = (pavgm[8]*pma[9][0]*(1.0 + sw[20]*sw[22]*glob7s(pma[9], Input, flags, state))
+                   *tn2[3]*tn2[3]/(pma[2][0]*pavgm[2])**2.0)
+
+        # Lower stratosphere and troposphere (below zn3[0])
+        tn3 = [0.0]*mn3
+        tgn3 = [0.0]*2
+        tn3[0] = tn2[3]
+        tgn3[0] = tgn2[1]
+        tn3[1] = pma[3][0]*pavgm[3]/(1.0 - sw[22]*glob7s(pma[3], Input, flags, state))
+        tn3[2] = pma[4][0]*pavgm[4]/(1.0 - sw[22]*glob7s(pma[4], Input, flags, state))
+        tn3[3] = pma[5][0]*pavgm[5]/(1.0 - sw[22]*glob7s(pma[5], Input, flags, state))
+        tn3[4] = pma[6][0]*pavgm[6]/(1.0 - sw[22]*glob7s(pma[6], Input, flags, state))
+        tgn3[1] = (pma[7][0]*pavgm[7]*(1.0 + sw[22]*glob7s(pma[7], Input, flags, state))
+                   *tn3[4]*tn3[4]/(pma[6][0]*pavgm[6])**2.0)
+
+        # Linear transition to full mixing below zn2[0]
+        dmc = np.where(alt > zmix, 1.0 - (zn2[0] - alt)/(zn2[0] - zmix), 0.0)
+        sd = soutput.d
+        dz28 = sd[2]
+        d = [0.0]*9
+
+        # N2 density
+        dmr = sd[2]/dm28m - 1.0
+        d[2], tz = densm(alt, dm28m, xmm, zn3, tn3, tgn3, zn2, tn2, tgn2,
+                         state['gsurf'], state['re'])
+        d[2] = d[2]*(1.0 + dmr*dmc)
+        # He density
+        dmr = sd[0]/(dz28*pdm[0][1]) - 1.0
+        d[0] = d[2]*pdm[0][1]*(1.0 + dmr*dmc)
+        # O2 density
+        dmr = sd[3]/(dz28*pdm[3][1]) - 1.0
+        d[3] = d[2]*pdm[3][1]*(1.0 + dmr*dmc)
+        # Ar density
+        dmr = sd[4]/(dz28*pdm[4][1]) - 1.0
+        d[4] = d[2]*pdm[4][1]*(1.0 + dmr*dmc)
+        # O, hydrogen and atomic nitrogen densities are zero
+        # Total mass density
+        d[5] = 1.66E-24*(4.0*d[0] + 16.0*d[1] + 28.0*d[2] + 32.0*d[3]
+                         + 40.0*d[4] + d[6] + 14.0*d[7])
+        if sw[0]:
+            d[5] = d[5]/1000
+
+    high = alt >= zn2[0]
+    output.d = [np.where(high, sd[i], d[i]) for i in range(9)]
+    output.t[1] = np.where(high, soutput.t[1], tz)
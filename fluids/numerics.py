@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+'''Chemical Engineering Design Library (ChEDL). Utilities for process modeling.
+Copyright (C) 2018 Caleb Bell <Caleb.Andrew.Bell@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.'''
+
+from __future__ import division
+from bisect import bisect_right
+import numpy as np
+
+__all__ = ['interp', 'interp2d_linear', 'horner', 'LinearInterpolator', 
+           'SplineInterpolator', 'BilinearInterpolator', 'bracketed_roots',
+           'linear_recurrence']
+
+'''Interpolation of the tabulated data in fluids, and numerical methods
+shared by the array functions in fluids. Scipy's interpolation objects take
+a significant time to import and construct, and have an overhead of tens of 
+microseconds per call; the interpolators here are constructed for free or on
+their first use, and evaluate scalars in pure Python.
+'''
+
+number_types = (float, int)
+
+
+def interp(x, dx, dy):
+    r'''Linearly interpolates the value at `x` in a table of points `dx` 
+    (sorted, ascending) and values `dy`. Values outside the table raise an 
+    exception, as with scipy's `interp1d`.
+
+    Parameters
+    ----------
+    x : float
+        Point to evaluate the table at, [-]
+    dx : list[float]
+        Points of the table, [-]
+    dy : list[float]
+        Values at the points of the table, [-]
+
+    Returns
+    -------
+    y : float
+        Interpolated value, [-]
+
+    Examples
+    --------
+    >>> interp(2.5, [1, 2, 3], [1, 4, 9])
+    6.5
+    '''
+    if x < dx[0] or x > dx[-1]:
+        raise ValueError('%g is outside the interpolation range [%g, %g]' %(x, dx[0], dx[-1]))
+    i = bisect_right(dx, x) - 1
+    if i == len(dx) - 1:
+        return dy[-1]
+    return dy[i] + (dy[i+1] - dy[i])*(x - dx[i])/(dx[i+1] - dx[i])
+
+
+def interp2d_linear(x, y, dx, dy, dz):
+    r'''Bilinearly interpolates the value at (`x`, `y`) in a table of values
+    `dz` on the grid of points `dx` and `dy` (both sorted, ascending). Points
+    outside the table take the value at the nearest edge of the table, as 
+    with scipy's `interp2d`.
+
+    Parameters
+    ----------
+    x : float
+        First coordinate to evaluate the table at, [-]
+    y : float
+        Second coordinate to evaluate the table at, [-]
+    dx : list[float]
+        First coordinates of the table, [-]
+    dy : list[float]
+        Second coordinates of the table, [-]
+    dz : list[list[float]]
+        Values of the table; `dz[j][i]` is at (`dx[i]`, `dy[j]`), [-]
+
+    Returns
+    -------
+    z : float
+        Interpolated value, [-]
+
+    Examples
+    --------
+    >>> interp2d_linear(1.5, 0.5, [1, 2], [0, 1], [[1, 2], [3, 4]])
+    2.5
+    '''
+    if x < dx[0]:
+        x = dx[0]
+    elif x > dx[-1]:
+        x = dx[-1]
+    if y < dy[0]:
+        y = dy[0]
+    elif y > dy[-1]:
+        y = dy[-1]
+    i = min(bisect_right(dx, x) - 1, len(dx) - 2)
+    j = min(bisect_right(dy, y) - 1, len(dy) - 2)
+    tx = (x - dx[i])/(dx[i+1] - dx[i])
+    ty = (y - dy[j])/(dy[j+1] - dy[j])
+    z0, z1 = dz[j], dz[j+1]
+    return ((1. - ty)*((1. - tx)*z0[i] + tx*z0[i+1]) 
+            + ty*((1. - tx)*z1[i] + tx*z1[i+1]))
+
+
+def horner(coeffs, x):
+    r'''Evaluates a polynomial with coefficients `coeffs` (the highest power
+    first) at `x` with Horner's method.
+
+    Parameters
+    ----------
+    coeffs : list[float]
+        Coefficients of the polynomial, [-]
+    x : float
+        Point to evaluate the polynomial at, [-]
+
+    Returns
+    -------
+    y : float
+        Value of the polynomial, [-]
+
+    Examples
+    --------
+    >>> horner([1., 0., -1.], 3.)
+    8.0
+    '''
+    tot = 0.
+    for c in coeffs:
+        tot = tot*x + c
+    return tot
+
+
+class LinearInterpolator(object):
+    r'''Linear interpolator of tabulated data, a replacement for scipy's
+    `interp1d` with its default settings. Scalars are interpolated with
+    `interp`, and arrays with `np.interp`; values outside the table raise an
+    exception.
+
+    Parameters
+    ----------
+    x : list[float]
+        Points of the table, sorted in ascending order, [-]
+    y : list[float]
+        Values at the points of the table, [-]
+
+    Examples
+    --------
+    >>> f = LinearInterpolator([0., 1.], [0., 2.])
+    >>> f(0.25)
+    0.5
+    '''
+    def __init__(self, x, y):
+        self.x = [float(i) for i in x]
+        self.y = [float(i) for i in y]
+
+    def __call__(self, x):
+        if isinstance(x, number_types):
+            return interp(x, self.x, self.y)
+        x = np.asarray(x, dtype=float)
+        if np.any(x < self.x[0]) or np.any(x > self.x[-1]):
+            raise ValueError('A value is outside the interpolation range [%g, %g]' %(self.x[0], self.x[-1]))
+        return np.interp(x, self.x, self.y)
+
+
+class SplineInterpolator(object):
+    r'''Spline interpolator (or smoother) of tabulated data, equivalent to 
+    scipy's `UnivariateSpline`. The spline is only fit on the first call; 
+    scalars are then evaluated from the coefficients of the spline's 
+    polynomial on each interval, and arrays with `splev`. Values outside
+    the table are extrapolated.
+
+    Parameters
+    ----------
+    x : list[float]
+        Points of the table, sorted in ascending order, [-]
+    y : list[float]
+        Values at the points of the table, [-]
+    s : float, optional
+        Smoothing factor, as in `UnivariateSpline`; 0 to interpolate, [-]
+    k : int, optional
+        Degree of the spline, [-]
+
+    Examples
+    --------
+    >>> f = SplineInterpolator([0., 1., 2., 3.], [0., 1., 8., 27.])
+    >>> round(f(1.5), 12)
+    3.375
+    '''
+    tck = None
+    
+    def __init__(self, x, y, s=0.0, k=3):
+        self.x = x
+        self.y = y
+        self.s = s
+        self.k = k
+
+    def construct(self):
+        '''Fits the spline, and computes the polynomial coefficients of each
+        of its intervals; called automatically on first use.
+        '''
+        from scipy.interpolate import splrep, PPoly
+        tck = splrep(self.x, self.y, k=self.k, s=self.s)
+        pp = PPoly.from_spline(tck)
+        # Knots are repeated at the ends of the spline; skip the empty intervals
+        keep = np.nonzero(np.diff(pp.x) > 0)[0]
+        self.breaks = pp.x[keep].tolist()
+        self.coeffs = pp.c[:, keep].T.tolist()
+        self.tck = tck
+
+    def __call__(self, x):
+        if self.tck is None:
+            self.construct()
+        if isinstance(x, number_types):
+            i = bisect_right(self.breaks, x) - 1
+            if i < 0:
+                i = 0
+            return horner(self.coeffs[i], x - self.breaks[i])
+        from scipy.interpolate import splev
+        return splev(x, self.tck)
+
+
+
+class BilinearInterpolator(object):
+    r'''Bilinear interpolator of data tabulated on a regular grid, a 
+    replacement for scipy's `interp2d` with its default settings. Points 
+    outside the table take the value at the nearest edge of the table. 
+    Scalars are interpolated with `interp2d_linear`; arrays (broadcast 
+    against each other) are interpolated point by point.
+
+    Parameters
+    ----------
+    x : list[float]
+        First coordinates of the table, sorted in ascending order, [-]
+    y : list[float]
+        Second coordinates of the table, sorted in ascending order, [-]
+    z : list[list[float]]
+        Values of the table; `z[j][i]` is at (`x[i]`, `y[j]`), [-]
+
+    Examples
+    --------
+    >>> f = BilinearInterpolator([1., 2.], [0., 1.], [[1., 2.], [3., 4.]])
+    >>> f(1.5, 0.5)
+    2.5
+    >>> f(np.array([1., 1.5, 5.]), 0.5)
+    array([ 2. ,  2.5,  3. ])
+    '''
+    def __init__(self, x, y, z):
+        self.x = [float(i) for i in x]
+        self.y = [float(i) for i in y]
+        self.z = [[float(i) for i in row] for row in z]
+        self.x_array = np.array(self.x)
+        self.y_array = np.array(self.y)
+        self.z_array = np.array(self.z)
+
+    def __call__(self, x, y):
+        if isinstance(x, number_types) and isinstance(y, number_types):
+            return interp2d_linear(x, y, self.x, self.y, self.z)
+        dx, dy, dz = self.x_array, self.y_array, self.z_array
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float), 
+                                   np.asarray(y, dtype=float))
+        x = np.clip(x, dx[0], dx[-1])
+        y = np.clip(y, dy[0], dy[-1])
+        i = np.minimum(np.searchsorted(dx, x, side='right') - 1, len(dx) - 2)
+        j = np.minimum(np.searchsorted(dy, y, side='right') - 1, len(dy) - 2)
+        tx = (x - dx[i])/(dx[i+1] - dx[i])
+        ty = (y - dy[j])/(dy[j+1] - dy[j])
+        return ((1. - ty)*((1. - tx)*dz[j, i] + tx*dz[j, i+1]) 
+                + ty*((1. - tx)*dz[j+1, i] + tx*dz[j+1, i+1]))
+
+
+def bracketed_roots(f, a, b, fa=None, fb=None, xtol=0.0, rtol=1E-13, 
+                    maxiter=100):
+    r'''Finds a root of each of many functions at once, each bracketed by
+    a sign change between `a` and `b`, with the Illinois variant of regula 
+    falsi. Steps which would leave the bracket, or which follow several 
+    steps that all kept the same end of the bracket, are replaced by 
+    bisection.
+    Functions are only evaluated while their root has not converged.
+
+    Parameters
+    ----------
+    f : callable
+        Function `f(x, i)` evaluating the functions numbered by the integer
+        array `i` at the points `x`, [-]
+    a : ndarray
+        One side of the bracket of each root, [-]
+    b : ndarray
+        The other side of the bracket of each root, [-]
+    fa : ndarray, optional
+        The functions evaluated at `a`, if known, [-]
+    fb : ndarray, optional
+        The functions evaluated at `b`, if known, [-]
+    xtol : float, optional
+        Absolute tolerance of the roots, [-]
+    rtol : float, optional
+        Relative tolerance of the roots, [-]
+    maxiter : int, optional
+        Maximum number of iterations, [-]
+
+    Returns
+    -------
+    x : ndarray
+        The roots; the last estimate for any which did not converge in
+        `maxiter` iterations, [-]
+
+    Examples
+    --------
+    >>> c = np.array([2., 3., 4.])
+    >>> bracketed_roots(lambda x, i: x*x - c[i], np.zeros(3), np.full(3, 3.))
+    array([ 1.41421356,  1.73205081,  2.        ])
+    '''
+    a = np.array(a, dtype=float)
+    b = np.array(b, dtype=float)
+    index = np.arange(a.size)
+    fa = f(a, index) if fa is None else np.array(fa, dtype=float)
+    fb = f(b, index) if fb is None else np.array(fb, dtype=float)
+    x = np.where(np.abs(fa) < np.abs(fb), a, b)
+    active = index[(fa != 0.0) & (fb != 0.0)]
+    a, b, fa, fb = a[active], b[active], fa[active], fb[active]
+    # Number of consecutive steps which have kept the same end of the bracket
+    stale = np.zeros(active.size, dtype=int)
+    for _ in range(maxiter):
+        if not active.size:
+            break
+        with np.errstate(divide='ignore', invalid='ignore'):
+            c = b - fb*(b - a)/(fb - fa)
+        bisect = (stale > 2) | ~((c > np.minimum(a, b)) & (c < np.maximum(a, b)))
+        c[bisect] = 0.5*(a[bisect] + b[bisect])
+        fc = f(c, active)
+        # Keep the bracket; halve the value at the retained end (Illinois)
+        crossed = (fc > 0.0) != (fb > 0.0)
+        a = np.where(crossed, b, a)
+        fa = np.where(crossed, fb, 0.5*fa)
+        stale = np.where(crossed, 0, stale + 1)
+        b, fb = c, fc
+        converged = (fc == 0.0) | (np.abs(b - a) <= xtol + rtol*np.abs(b))
+        x[active] = b
+        remaining = ~converged
+        active, a, b, fa, fb, stale = (active[remaining], a[remaining], 
+                                       b[remaining], fa[remaining], 
+                                       fb[remaining], stale[remaining])
+    return x
+
+
+def linear_recurrence(a, b, x0):
+    r'''Evaluates the first-order linear recurrence 
+    :math:`x_{i+1} = a_i x_i + b_i` from its initial value, as an array 
+    operation. The maps :math:`x \to a_i x + b_i` are composed with a 
+    parallel prefix scan in :math:`\log_2 n` array steps, which avoids the 
+    overflow and loss of precision of dividing by cumulative products.
+
+    Parameters
+    ----------
+    a : ndarray
+        Coefficients multiplying each value, [-]
+    b : ndarray
+        Terms added to each value, [-]
+    x0 : float
+        Initial value, [-]
+
+    Returns
+    -------
+    x : ndarray
+        The initial value and the `n` values following it, [-]
+
+    Examples
+    --------
+    >>> linear_recurrence([2., 2., 0.5], [1., 0., -1.], 1.)
+    array([ 1.,  3.,  6.,  2.])
+    '''
+    a = np.array(a, dtype=float).ravel()
+    b = np.array(b, dtype=float).ravel()
+    n = a.size
+    shift = 1
+    while shift < n:
+        # Compose each map with the one `shift` places before it
+        b[shift:] = a[shift:]*b[:-shift] + b[shift:]
+        a[shift:] = a[shift:]*a[:-shift]
+        shift *= 2
+    x = np.empty(n + 1)
+    x[0] = x0
+    x[1:] = a*x0 + b
+    return x
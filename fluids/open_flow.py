@@ -21,7 +21,7 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.'''
 
 from __future__ import division
-from scipy.interpolate import interp1d
+from fluids.numerics import LinearInterpolator
 from scipy.optimize import fsolve
 from scipy.constants import g
 from math import tan, radians
@@ -44,8 +44,8 @@ angles_Shen = [20, 40, 60, 80, 100]
 Cs_Shen = [0.59, 0.58, 0.575, 0.575, 0.58]
 k_Shen = [0.0028, 0.0017, 0.0012, 0.001, 0.001]
 
-Cs_Shen_i = interp1d(angles_Shen, Cs_Shen)
-k_Shen_i = interp1d(angles_Shen, k_Shen)
+Cs_Shen_i = LinearInterpolator(angles_Shen, Cs_Shen)
+k_Shen_i = LinearInterpolator(angles_Shen, k_Shen)
 
 
 ### V-Notch Weirs (Triangular weir)
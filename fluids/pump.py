@@ -23,7 +23,8 @@ SOFTWARE.'''
 from __future__ import division
 from math import log
 from collections import namedtuple
-from scipy.interpolate import interp1d, interp2d
+import numpy as np
+from fluids.numerics import LinearInterpolator, BilinearInterpolator
 from scipy.constants import hp
 import os
 from io import open
@@ -134,9 +135,9 @@ VFD_efficiencies = [[0.31, 0.77, 0.86, 0.9, 0.91, 0.93, 0.94],
                     [0.55, 0.89, 0.94, 0.95, 0.96, 0.97, 0.97],
                     [0.61, 0.91, 0.95, 0.96, 0.96, 0.97, 0.97],
                     [0.61, 0.91, 0.95, 0.96, 0.96, 0.97, 0.97]]
-VFD_efficiency_interp = interp2d([0.016, 0.125, 0.25, 0.42, 0.5, 0.75, 1],
-                                 [3, 5, 10, 20, 30, 50, 60, 75, 100, 200, 400],
-                                 VFD_efficiencies)
+VFD_efficiency_interp = BilinearInterpolator([0.016, 0.125, 0.25, 0.42, 0.5, 0.75, 1],
+                                             [3, 5, 10, 20, 30, 50, 60, 75, 100, 200, 400],
+                                             VFD_efficiencies)
 
 
 def VFD_efficiency(P, load=1):
@@ -146,14 +147,14 @@ def VFD_efficiency(P, load=1):
 
     Parameters
     ----------
-    P : float
+    P : float or ndarray
         Power, [W]
-    load : float, optional
+    load : float or ndarray, optional
         Fraction of motor's rated electrical capacity being used
 
     Returns
     -------
-    efficiency : float
+    efficiency : float or ndarray
         VFD efficiency, [-]
 
     Notes
@@ -170,6 +171,8 @@ def VFD_efficiency(P, load=1):
     are interpolated linearly. Load values extend down to 0.016.
     
     The table used is for Pulse Width Modulation (PWM) VFDs.
+    
+    Arrays of powers and loads are evaluated element by element.
 
     Examples
     --------
@@ -177,6 +180,8 @@ def VFD_efficiency(P, load=1):
     0.96
     >>> VFD_efficiency(100*hp, load=0.2)
     0.92
+    >>> VFD_efficiency(np.array([1., 10., 100.])*hp, load=0.5)
+    array([ 0.91,  0.94,  0.96])
 
     References
     ----------
@@ -184,13 +189,11 @@ def VFD_efficiency(P, load=1):
        http://www.variablefrequencydrive.org/vfd-efficiency
     '''
     P = P/hp
-    if P < 3:
-        P = 3
-    elif P > 400:
-        P = 400
-    if load < 0.016:
-        load = 0.016
-    return round(float(VFD_efficiency_interp(load, P)), 4)
+    # Values outside the table take the value at the nearest edge of it
+    efficiency = VFD_efficiency_interp(load, P)
+    if isinstance(efficiency, np.ndarray):
+        return np.round(efficiency, 4)
+    return round(efficiency, 4)
 
 
 nema_sizes_hp = [.25, 1/3., .5, .75, 1, 1.5, 2, 3, 4, 5, 5.5, 7.5, 10, 15, 20, 25, 30, 40, 50, 60, 75, 100, 125, 150, 175, 200, 250, 300, 350, 400, 450, 500]
@@ -245,13 +248,13 @@ nema_high_full_closed_2p = [0.77, 0.84, 0.855, 0.865, 0.885, 0.885, 0.885, 0.895
 nema_high_full_closed_4p = [0.855, 0.865, 0.865, 0.895, 0.895, 0.895, 0.895, 0.917, 0.917, 0.924, 0.93, 0.936, 0.936, 0.941, 0.945, 0.95, 0.954, 0.954, 0.954, 0.958, 0.962, 0.962]
 nema_high_full_closed_6p = [0.825, 0.875, 0.885, 0.895, 0.895, 0.895, 0.895, 0.91, 0.91, 0.917, 0.917, 0.93, 0.93, 0.941, 0.941, 0.945, 0.945, 0.95, 0.95, 0.958, 0.958, 0.958]
 
-nema_high_full_open_2p_i = interp1d(nema_high_P, nema_high_full_open_2p)
-nema_high_full_open_4p_i = interp1d(nema_high_P, nema_high_full_open_4p)
-nema_high_full_open_6p_i = interp1d(nema_high_P, nema_high_full_open_6p)
+nema_high_full_open_2p_i = LinearInterpolator(nema_high_P, nema_high_full_open_2p)
+nema_high_full_open_4p_i = LinearInterpolator(nema_high_P, nema_high_full_open_4p)
+nema_high_full_open_6p_i = LinearInterpolator(nema_high_P, nema_high_full_open_6p)
 
-nema_high_full_closed_2p_i = interp1d(nema_high_P, nema_high_full_closed_2p)
-nema_high_full_closed_4p_i = interp1d(nema_high_P, nema_high_full_closed_4p)
-nema_high_full_closed_6p_i = interp1d(nema_high_P, nema_high_full_closed_6p)
+nema_high_full_closed_2p_i = LinearInterpolator(nema_high_P, nema_high_full_closed_2p)
+nema_high_full_closed_4p_i = LinearInterpolator(nema_high_P, nema_high_full_closed_4p)
+nema_high_full_closed_6p_i = LinearInterpolator(nema_high_P, nema_high_full_closed_6p)
 
 nema_min_P = [1, 1.5, 2, 3, 4, 5, 5.5, 7.5, 10, 15, 20, 25, 30, 40, 50, 60, 75, 100, 125, 150, 175, 200, 250, 300, 350, 400, 450, 500]
 nema_min_full_open_2p  = [0.755, 0.825, 0.84, 0.84, 0.84, 0.855, 0.855, 0.875, 0.885, 0.895, 0.902, 0.91, 0.91, 0.917, 0.924, 0.93, 0.93, 0.93, 0.936, 0.936, 0.945, 0.945, 0.945, 0.95, 0.95, 0.954, 0.958, 0.958]
@@ -263,15 +266,15 @@ nema_min_full_closed_4p = [0.825, 0.84, 0.84, 0.875, 0.875, 0.875, 0.875, 0.895,
 nema_min_full_closed_6p = [0.8, 0.855, 0.865, 0.875, 0.875, 0.875, 0.875, 0.895, 0.895, 0.902, 0.902, 0.917, 0.917, 0.93, 0.93, 0.936, 0.936, 0.941, 0.941, 0.95, 0.95, 0.95, 0.95, 0.95, 0.95, 0.95, 0.95, 0.95]
 nema_min_full_closed_8p = [0.74, 0.77, 0.825, 0.84, 0.84, 0.855, 0.855, 0.855, 0.885, 0.885, 0.895, 0.895, 0.91, 0.91, 0.917, 0.917, 0.93, 0.93, 0.936, 0.936, 0.941, 0.941, 0.945, 0.945, 0.945, 0.945, 0.945, 0.945]
 
-nema_min_full_open_2p_i = interp1d(nema_min_P, nema_min_full_open_2p)
-nema_min_full_open_4p_i = interp1d(nema_min_P, nema_min_full_open_4p)
-nema_min_full_open_6p_i = interp1d(nema_min_P, nema_min_full_open_6p)
-nema_min_full_open_8p_i = interp1d(nema_min_P, nema_min_full_open_8p)
+nema_min_full_open_2p_i = LinearInterpolator(nema_min_P, nema_min_full_open_2p)
+nema_min_full_open_4p_i = LinearInterpolator(nema_min_P, nema_min_full_open_4p)
+nema_min_full_open_6p_i = LinearInterpolator(nema_min_P, nema_min_full_open_6p)
+nema_min_full_open_8p_i = LinearInterpolator(nema_min_P, nema_min_full_open_8p)
 
-nema_min_full_closed_2p_i = interp1d(nema_min_P, nema_min_full_closed_2p)
-nema_min_full_closed_4p_i = interp1d(nema_min_P, nema_min_full_closed_4p)
-nema_min_full_closed_6p_i = interp1d(nema_min_P, nema_min_full_closed_6p)
-nema_min_full_closed_8p_i = interp1d(nema_min_P, nema_min_full_closed_8p)
+nema_min_full_closed_2p_i = LinearInterpolator(nema_min_P, nema_min_full_closed_2p)
+nema_min_full_closed_4p_i = LinearInterpolator(nema_min_P, nema_min_full_closed_4p)
+nema_min_full_closed_6p_i = LinearInterpolator(nema_min_P, nema_min_full_closed_6p)
+nema_min_full_closed_8p_i = LinearInterpolator(nema_min_P, nema_min_full_closed_8p)
 
 
 def CSA_motor_efficiency(P, closed=False, poles=2, high_efficiency=False):
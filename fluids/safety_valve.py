@@ -22,10 +22,11 @@ SOFTWARE.'''
 
 from __future__ import division
 from math import exp
+import numpy as np
 from scipy.constants import psi, inch, atm
 from fluids.core import F2K, C2K
 from fluids.compressible import is_critical_flow
-from scipy.interpolate import interp1d, interp2d
+from fluids.numerics import LinearInterpolator, BilinearInterpolator
 
 __all__ = ['API526_A_sq_inch', 'API526_letters', 'API526_A',
 'API520_round_size', 'API520_C', 'API520_F2', 'API520_Kv', 'API520_N',
@@ -294,7 +295,8 @@ _KSH_factors = [[1, 0.98, 0.93, 0.88, 0.84, 0.8, 0.77, 0.74, 0.72, 0.7],
 [1, 1, 1, 1, 0.95, 0.86, 0.8, 0.76, 0.72, 0.69],
 [1, 1, 1, 1, 0.95, 0.85, 0.78, 0.73, 0.69, 0.66],
 [1, 1, 1, 1, 1, 0.82, 0.74, 0.69, 0.65, 0.62]]
-API520_KSH = interp2d(_KSH_tempKs, _KSH_Pa, _KSH_factors)
+API520_KSH = BilinearInterpolator(_KSH_tempKs, _KSH_Pa, _KSH_factors)
+_KSH_T_min, _KSH_T_max = float(C2K(149)), float(C2K(649))
 
 
 def API520_SH(T1, P1):
@@ -305,48 +307,59 @@ def API520_SH(T1, P1):
 
     Parameters
     ----------
-    T1 : float
+    T1 : float or ndarray
         Temperature of the fluid entering the valve [K]
-    P1 : float
+    P1 : float or ndarray
         Upstream relieving pressure; the set pressure plus the allowable
         overpressure, plus atmospheric pressure, [Pa]
 
     Returns
     -------
-    KSH : float
+    KSH : float or ndarray
         Correction due to steam superheat [-]
 
     Notes
     -----
     For P above 20679 kPag, use the critical flow model.
     Superheat cannot be above 649 degrees Celcius.
-    If T1 is above 149 degrees Celcius, returns 1.
+    If T1 is below 149 degrees Celcius, returns 1.
+    
+    Arrays of temperatures and pressures are evaluated element by element.
 
     Examples
     --------
     Custom example from table 9:
 
     >>> API520_SH(593+273.15, 1066.325E3)
-    0.7201800000000002
+    0.72018
+    >>> API520_SH(np.array([100., 400., 593.])+273.15, 1066.325E3)
+    array([ 1.        ,  0.82919074,  0.72018   ])
 
     References
     ----------
     .. [1] API Standard 520, Part 1 - Sizing and Selection.
     '''
+    if isinstance(T1, np.ndarray) or isinstance(P1, np.ndarray):
+        T1, P1 = np.broadcast_arrays(T1, P1)
+        if np.any(P1 > 20679E3+atm):
+            raise Exception('For P above 20679 kPag, use the critical flow model')
+        if np.any(T1 > _KSH_T_max):
+            raise Exception('Superheat cannot be above 649 degrees Celcius')
+        return np.where(T1 < _KSH_T_min, 1., API520_KSH(T1, P1))
     if P1 > 20679E3+atm:
         raise Exception('For P above 20679 kPag, use the critical flow model')
-    if T1 > C2K(649):
+    if T1 > _KSH_T_max:
         raise Exception('Superheat cannot be above 649 degrees Celcius')
-    if T1 < C2K(149):
+    if T1 < _KSH_T_min:
         return 1. # No superheat under 15 psig
-    return float(API520_KSH(T1, P1))
+    return API520_KSH(T1, P1)
 
 
 
 # Kw, for liquids. Applicable for all overpressures.
 _Kw_x = [15., 16.5493, 17.3367, 18.124, 18.8235, 19.5231, 20.1351, 20.8344, 21.4463, 22.0581, 22.9321, 23.5439, 24.1556, 24.7674, 25.0296, 25.6414, 26.2533, 26.8651, 27.7393, 28.3511, 28.9629, 29.6623, 29.9245, 30.5363, 31.2357, 31.8475, 32.7217, 33.3336, 34.0329, 34.6448, 34.8196, 35.4315, 36.1308, 36.7428, 37.7042, 38.3162, 39.0154, 39.7148, 40.3266, 40.9384, 41.6378, 42.7742, 43.386, 43.9978, 44.6098, 45.2216, 45.921, 46.5329, 47.7567, 48.3685, 49.0679, 49.6797, 50.]
 _Kw_y = [1, 0.996283, 0.992565, 0.987918, 0.982342, 0.976766, 0.97119, 0.964684, 0.958178, 0.951673, 0.942379, 0.935874, 0.928439, 0.921933, 0.919145, 0.912639, 0.906134, 0.899628, 0.891264, 0.884758, 0.878253, 0.871747, 0.868959, 0.862454, 0.855948, 0.849442, 0.841078, 0.834572, 0.828067, 0.821561, 0.819703, 0.814126, 0.806691, 0.801115, 0.790892, 0.785316, 0.777881, 0.771375, 0.76487, 0.758364, 0.751859, 0.740706, 0.734201, 0.727695, 0.722119, 0.715613, 0.709108, 0.702602, 0.69052, 0.684015, 0.677509, 0.671004, 0.666357]
-API520_Kw = interp1d(_Kw_x, _Kw_y)
+API520_Kw = LinearInterpolator(_Kw_x, _Kw_y)
 
 
 def API520_W(Pset, Pback):
@@ -394,11 +407,11 @@ def API520_W(Pset, Pback):
 # Kb Backpressure correction factor, for gases
 _16_over_x = [37.6478, 38.1735, 38.6991, 39.2904, 39.8817, 40.4731, 40.9987, 41.59, 42.1156, 42.707, 43.2326, 43.8239, 44.4152, 44.9409, 45.5322, 46.0578, 46.6491, 47.2405, 47.7661, 48.3574, 48.883, 49.4744, 50]
 _16_over_y = [0.998106, 0.994318, 0.99053, 0.985795, 0.982008, 0.97822, 0.973485, 0.96875, 0.964962, 0.961174, 0.956439, 0.951705, 0.947917, 0.943182, 0.939394, 0.935606, 0.930871, 0.926136, 0.921402, 0.918561, 0.913826, 0.910038, 0.90625]
-API520_Kb_16 = interp1d(_16_over_x, _16_over_y)
+API520_Kb_16 = LinearInterpolator(_16_over_x, _16_over_y)
 
 _10_over_x = [30.0263, 30.6176, 31.1432, 31.6689, 32.1945, 32.6544, 33.18, 33.7057, 34.1656, 34.6255, 35.0854, 35.5453, 36.0053, 36.4652, 36.9251, 37.385, 37.8449, 38.2392, 38.6334, 39.0276, 39.4875, 39.9474, 40.4074, 40.8016, 41.1958, 41.59, 42.0499, 42.4442, 42.8384, 43.2326, 43.6925, 44.0867, 44.4809, 44.8752, 45.2694, 45.6636, 46.0578, 46.452, 46.8463, 47.2405, 47.6347, 48.0289, 48.4231, 48.883, 49.2773, 49.6715]
 _10_over_y = [0.998106, 0.995265, 0.99053, 0.985795, 0.981061, 0.975379, 0.969697, 0.963068, 0.957386, 0.950758, 0.945076, 0.938447, 0.930871, 0.925189, 0.918561, 0.910985, 0.904356, 0.897727, 0.891098, 0.883523, 0.876894, 0.870265, 0.862689, 0.856061, 0.848485, 0.840909, 0.83428, 0.827652, 0.820076, 0.8125, 0.805871, 0.798295, 0.79072, 0.783144, 0.775568, 0.768939, 0.762311, 0.754735, 0.747159, 0.739583, 0.732008, 0.724432, 0.716856, 0.70928, 0.701705, 0.695076]
-API520_Kb_10 = interp1d(_10_over_x, _10_over_y)
+API520_Kb_10 = LinearInterpolator(_10_over_x, _10_over_y)
 
 
 
@@ -23,7 +23,7 @@ SOFTWARE.'''
 from __future__ import division
 from math import log, exp, pi
 from scipy.constants import g
-from scipy.interpolate import UnivariateSpline
+from fluids.numerics import SplineInterpolator
 from scipy.constants import foot, psi
 
 __all__ = ['v_Sounders_Brown', 'K_separator_Watkins',
@@ -64,7 +64,7 @@ Kv_Watkins = [0.23722, 0.248265, 0.260298, 0.272915, 0.284578, 0.297283,
     0.0651011, 0.060839, 0.0567521, 0.0529401, 0.0492041, 0.0458154,
     0.0426601, 0.039722, 0.036919, 0.0343137, 0.0318924, 0.0296419,
     0.0275001, 0.0255595, 0.0237127, 0.0219993, 0.0207107]
-Watkins_interp = UnivariateSpline(v_factors_Watkins, Kv_Watkins, s=.00001)
+Watkins_interp = SplineInterpolator(v_factors_Watkins, Kv_Watkins, s=.00001)
 
 
 def K_separator_Watkins(x, rhol, rhog, horizontal=False, method='spline'):
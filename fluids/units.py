@@ -28,8 +28,11 @@ import types
 import re
 import inspect
 import functools
-import collections
 from copy import copy
+try:
+    from collections.abc import Iterable
+except ImportError: # pragma: no cover
+    from collections import Iterable
 import fluids
 import fluids.vectorized
 import numpy as np
@@ -111,7 +114,10 @@ def check_args_order(func):
     
     >>> check_args_order(fluids.core.Reynolds)
     '''
-    argspec = inspect.getargspec(func)
+    try:
+        argspec = inspect.getfullargspec(func)
+    except AttributeError: # pragma: no cover
+        argspec = inspect.getargspec(func)
     parsed_data = parse_numpydoc_variables_units(func)
     # compare the parsed arguments with those actually defined
     parsed_units = parsed_data['Parameters']['units']
@@ -161,6 +167,85 @@ def convert_input(val, unit, ureg, strict=True):
             return val
 
 
+# Conversions from the units of a quantity to the units documented for an 
+# argument, as (scale, offset) so the converted magnitude is 
+# `magnitude*scale + offset`; keyed by (registry, units of the quantity, 
+# documented units). All units pint supports convert with a scale and offset.
+_conversion_factors = {}
+# Parsed documented units, as (multiplier, units); keyed by (registry, text)
+_parsed_units = {}
+
+
+def conversion_factors(units, unit, ureg):
+    '''Returns the scale and offset which convert a magnitude in `units` to
+    one in the units of the expression `unit`; these are computed with pint
+    once for each pair of units and cached.
+    
+    >>> conversion_factors((1*u.inch).units, 'm', u)
+    (0.0254, 0.0)
+    '''
+    key = (id(ureg), units, unit)
+    try:
+        return _conversion_factors[key]
+    except KeyError:
+        pass
+    offset = ureg.Quantity(0.0, units).to(unit).magnitude
+    scale = ureg.Quantity(1.0, units).to(unit).magnitude - offset
+    _conversion_factors[key] = factors = (scale, offset)
+    return factors
+
+
+def parse_units(unit, ureg):
+    '''Returns the multiplier and pint units of the unit expression `unit`,
+    parsed only once for each expression.
+    
+    >>> parse_units('m^3/s', u)
+    (1, <Unit('meter ** 3 / second')>)
+    '''
+    key = (id(ureg), unit)
+    try:
+        return _parsed_units[key]
+    except KeyError:
+        pass
+    parsed = ureg.parse_expression(unit)
+    if isinstance(parsed, ureg.Quantity):
+        parsed = (parsed.magnitude, parsed.units)
+    else:
+        parsed = (parsed, ureg.dimensionless)
+    _parsed_units[key] = parsed
+    return parsed
+
+
+def convert_input_cached(val, unit, ureg, strict=True):
+    '''Equivalent to `convert_input`, but with the conversion factors from
+    `conversion_factors` so converting a value in units already seen is only
+    a multiplication.
+    '''
+    if type(val) != ureg.Quantity:
+        return convert_input(val, unit, ureg, strict)
+    magnitude = val.magnitude
+    if unit == 'dimensionless':
+        return magnitude
+    units = val._units
+    try:
+        scale, offset = conversion_factors(units, unit, ureg)
+    except Exception:
+        # Let pint raise the appropriate error
+        return convert_input(val, unit, ureg, strict)
+    if scale == 1.0 and offset == 0.0:
+        return magnitude
+    if offset == 0.0:
+        return magnitude*scale
+    return magnitude*scale + offset
+
+
+def multiply_units(value, unit, ureg):
+    multiplier, units = parse_units(unit, ureg)
+    if multiplier != 1:
+        value = value*multiplier
+    return ureg.Quantity(value, units)
+
+
 def convert_output(result, out_units, out_vars, ureg):
     # Attempt to handle multiple return values
     # Must be able to convert all values to a pint expression
@@ -170,15 +255,26 @@ def convert_output(result, out_units, out_vars, ureg):
     elif t == dict:
         for key, ans in result.items():
             unit = out_units[out_vars.index(key)]
-            result[key] = ans*ureg.parse_expression(unit)
+            result[key] = multiply_units(ans, unit, ureg)
         return result
-    elif isinstance(result, collections.Iterable):
+    elif isinstance(result, Iterable):
         conveted_result = []
         for ans, unit in zip(result, out_units):
-            conveted_result.append(ans*ureg.parse_expression(unit))
+            conveted_result.append(multiply_units(ans, unit, ureg))
         return conveted_result
     else:
-        return result*ureg.parse_expression(out_units[0])
+        return multiply_units(result, out_units[0], ureg)
+
+
+def array_kernel(func):
+    '''Returns the function evaluating `func` on numpy arrays; the version
+    in `fluids.vectorized`, which for most closed-form correlations evaluates
+    whole arrays at once, or np.vectorize of `func` if there is none.
+    '''
+    vectorized = getattr(fluids.vectorized, func.__name__, None)
+    if vectorized is None:
+        return np.vectorize(func)
+    return vectorized
 
 
 def wraps_numpydoc(ureg, strict=True):    
@@ -204,27 +300,34 @@ def wraps_numpydoc(ureg, strict=True):
             out_units.pop(0)
             out_vars.pop(0)
 
+        kernel = array_kernel(func)
+
         @functools.wraps(func, assigned=assigned, updated=updated)
         def wrapper(*values, **kw):
             # Convert input ordered variables to dimensionless form, after converting
             # them to the the units specified by their documentation
+            arrays = False
             conv_values = [] 
             for val, unit in zip(values, in_units):
-                conv_values.append(convert_input(val, unit, ureg, strict))
+                val = convert_input_cached(val, unit, ureg, strict)
+                if type(val) == np.ndarray:
+                    arrays = True
+                conv_values.append(val)
                         
             # For keyword arguments, lookup their unit; convert to that;
             # handle dimensionless arguments the same way
             kwargs = {}
             for name, val in kw.items():
-                unit = in_vars_to_dict[name]
-                kwargs[name] = convert_input(val, unit, ureg, strict)
-            if any([type(i.m) == np.ndarray for i in list(kw.values()) + list(values) if type(i) == u.Quantity]):
-                result = getattr(fluids.vectorized, func.__name__)(*conv_values, **kwargs)
+                val = convert_input_cached(val, in_vars_to_dict[name], ureg, strict)
+                if type(val) == np.ndarray:
+                    arrays = True
+                kwargs[name] = val
+            if arrays:
+                result = kernel(*conv_values, **kwargs)
             else:
                 result = func(*conv_values, **kwargs)
             if type(result) == np.ndarray:
-                units = convert_output(result, out_units, out_vars, ureg)[0].units
-                return result*units
+                return multiply_units(result, out_units[0], ureg)
             else:
                 return convert_output(result, out_units, out_vars, ureg)
             
@@ -305,14 +408,14 @@ class UnitAwareClass(object):
         in_vars, in_units, in_vars_to_dict, out_vars, out_units = self.method_units[name]
         conv_values = [] 
         for val, unit in zip(values, in_units):
-            conv_values.append(convert_input(val, unit, self.ureg, self.strict))
+            conv_values.append(convert_input_cached(val, unit, self.ureg, self.strict))
                     
         # For keyword arguments, lookup their unit; convert to that;
         # handle dimensionless arguments the same way
         kwargs = {}
         for name, val in kw.items():
             unit = in_vars_to_dict[name]
-            kwargs[name] = convert_input(val, unit, self.ureg, self.strict)
+            kwargs[name] = convert_input_cached(val, unit, self.ureg, self.strict)
         return conv_values, kwargs
 
 
@@ -397,6 +500,7 @@ for name in dir(fluids):
     
 globals().update(__funcs)
 __all__.extend(['wraps_numpydoc', 'convert_output', 'convert_input',
+                'convert_input_cached', 'conversion_factors', 'parse_units',
                 'check_args_order', 'match_parse_units', 'parse_numpydoc_variables_units', 
                 'wrap_numpydoc_obj', 'UnitAwareClass'])
 
@@ -41,7 +41,10 @@ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLI
 
 from __future__ import division, print_function
 import time
+import numpy as np
+from numpy.testing import assert_allclose
 from fluids.nrlmsise00.nrlmsise_00 import gtd7
+from fluids.nrlmsise00.nrlmsise_00_vectorized import gtd7_vectorized
 from fluids.nrlmsise00.nrlmsise_00_header import nrlmsise_output, nrlmsise_input, nrlmsise_flags , ap_array
 import pytest
 
@@ -174,9 +177,47 @@ def test_gtd7():
         print('\n')
 
 
-
-
-
+def test_gtd7_vectorized():
+    # The inputs of test_gtd7, evaluated in two calls; the last two use the
+    # ap array
+    doy = np.array([172, 81] + [172]*15)
+    sec = np.array([29000, 29000, 75000] + [29000]*14)
+    alt = np.array([400, 400, 1000, 100] + [400]*6 + [0, 10, 30, 50, 70, 400, 100])
+    g_lat = np.array([60]*4 + [0] + [60]*12)
+    g_long = np.array([-70]*5 + [0] + [-70]*11)
+    lst = np.array([16]*6 + [4] + [16]*10)
+    f107A = np.array([150]*7 + [70] + [150]*9)
+    f107 = np.array([150]*8 + [180] + [150]*8)
+    ap = np.array([4]*9 + [40] + [4]*7)
+    
+    expect = []
+    for i in range(17):
+        Input = nrlmsise_input(doy=doy[i], sec=sec[i], alt=alt[i], 
+                               g_lat=g_lat[i], g_long=g_long[i], lst=lst[i],
+                               f107A=f107A[i], f107=f107[i], ap=ap[i])
+        Input.ap_a = ap_array()
+        Input.ap_a.a = [100]*7
+        flags = nrlmsise_flags()
+        flags.switches = [0] + [1]*23
+        if i >= 15:
+            flags.switches[9] = -1
+        output = nrlmsise_output()
+        gtd7(Input, flags, output)
+        expect.append(output.d + output.t)
+    expect = np.array(expect).T
+
+    for sl, switch9 in zip([slice(0, 15), slice(15, 17)], [1, -1]):
+        Input = nrlmsise_input(doy=doy[sl], sec=sec[sl], alt=alt[sl], 
+                               g_lat=g_lat[sl], g_long=g_long[sl], lst=lst[sl],
+                               f107A=f107A[sl], f107=f107[sl], ap=ap[sl])
+        Input.ap_a = ap_array()
+        Input.ap_a.a = [100]*7
+        flags = nrlmsise_flags()
+        flags.switches = [0] + [1]*23
+        flags.switches[9] = switch9
+        output = nrlmsise_output()
+        gtd7_vectorized(Input, flags, output)
+        assert_allclose(output.d + output.t, expect[:, sl], rtol=1E-13)
 
 
 if __name__ == '__main__':
@@ -82,3 +82,38 @@ def test_ATMOSPHERE_NRLMSISE00():
     atm = ATMOSPHERE_NRLMSISE00(Z=1E3, latitude=45, longitude=45, day=150)
     assert_allclose(atm.particle_density, 2.2929008167737723e+25)
     assert_allclose(atm.zs, [0.7811046347676225, 0.2095469403691101, 0.009343183088772914, 5.241774494627779e-06, 0.0, 0.0, 0.0])
+
+
+def test_ATMOSPHERE_NRLMSISE00_evaluate():
+    # Altitudes cross the boundaries of the model's regions at 32.5, 62.5, 
+    # 72.5, 120 and 300 km
+    Zs = np.array([0, 5, 15, 25, 32.5, 40, 55, 62.5, 65, 72.5, 80, 95, 105,
+                   115, 120, 130, 160, 200, 250, 300, 350, 450, 600, 1000])*1E3
+    lats = [-90, -30, 0, 45, 89.5]
+    longs = [-120, 0, 45, 300]
+    days = [1, 172, 366]
+    seconds = [0, 29000]
+    grid = np.array(np.meshgrid(Zs, lats, longs, days, seconds)).reshape(5, -1)
+    attrs = ['He_density', 'O_density', 'N2_density', 'O2_density', 
+             'Ar_density', 'H_density', 'N_density', 'O_anomalous_density', 
+             'rho', 'T', 'T_exospheric', 'P', 'rho_calculated', 
+             'particle_density']
+    
+    for ap in [None, [4, 5, 6, 20, 40, 15, 8]]:
+        atm = ATMOSPHERE_NRLMSISE00.evaluate(*grid, f107=180., f107_avg=140., 
+                                             geomagnetic_disturbance_indices=ap)
+        atms = [ATMOSPHERE_NRLMSISE00(*args, f107=180., f107_avg=140., 
+                                      geomagnetic_disturbance_indices=ap)
+                for args in grid.T]
+        for attr in attrs:
+            expect = [getattr(a, attr) for a in atms]
+            assert_allclose(getattr(atm, attr), expect, rtol=1E-12)
+        assert_allclose(atm.zs, np.array([a.zs for a in atms]).T, rtol=1E-12)
+    
+    # Broadcasting, and an array of Ap indexes
+    atm = ATMOSPHERE_NRLMSISE00.evaluate([[1E3], [2E5]], latitude=[0, 45, 60],
+                                         geomagnetic_disturbance_indices=[4, 4, 4, [4, 40, 100], 4, 4, 4])
+    assert atm.T.shape == (2, 3)
+    expect = ATMOSPHERE_NRLMSISE00(2E5, latitude=60, geomagnetic_disturbance_indices=[4, 4, 4, 100, 4, 4, 4])
+    assert_allclose(atm.rho[1, 2], expect.rho, rtol=1E-13)
+    assert_allclose(atm.T[1, 2], expect.T, rtol=1E-13)
@@ -20,8 +20,9 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.'''
 
+import numpy as np
 from numpy.testing import assert_allclose
-from fluids.atmosphere import ATMOSPHERE_1976, hwm93, hwm14, airmass
+from fluids.atmosphere import ATMOSPHERE_1976, hwm93, hwm14, airmass, r0, H_std
 
 
 
@@ -58,6 +59,52 @@ def test_ATMOSPHERE_1976():
 
     delta_P = ATMOSPHERE_1976.pressure_integral(288.6, 84100.0, 147.0)
     assert_allclose(delta_P, 1451.9583061008857)
+
+
+def test_ATMOSPHERE_1976_pressure_integral():
+    from scipy.integrate import quad
+    def pressure_integral_quad(T1, P1, dH):
+        Zs = np.linspace(-610, 86000, 100001)
+        Ps = ATMOSPHERE_1976.evaluate(Zs).P
+        Z1 = np.interp(-P1, -Ps, Zs)
+        for _ in range(3):
+            atm = ATMOSPHERE_1976(Z1)
+            Z1 += (atm.P - P1)/(atm.rho*atm.g)
+        dT = T1 - ATMOSPHERE_1976(Z1).T
+        def to_int(Z):
+            atm = ATMOSPHERE_1976(Z, dT=dT)
+            return atm.g*atm.rho
+        return quad(to_int, Z1, Z1 + dH, epsabs=0, epsrel=1E-13, limit=200,
+                    points=[H*r0/(r0 - H) for H in H_std[1:]] if abs(dH) > 1000 else None)[0]
+
+    # Within a layer, across several layers, downwards, and warm and cold
+    for T1, P1, dH in [(288.6, 84100.0, 147.0), (250.0, 101325.0, 20000.0), 
+                       (240.0, 30000.0, 60000.0), (310.0, 5000.0, -25000.0),
+                       (200.0, 1.0, 1.0), (300.0, 110000.0, 300.0),
+                       (600.0, 101325.0, 100.0), (900.0, 50000.0, -3000.0),
+                       (20.0, 101325.0, 100.0)]:
+        assert_allclose(ATMOSPHERE_1976.pressure_integral(T1, P1, dH), 
+                        pressure_integral_quad(T1, P1, dH), rtol=1E-10)
+    assert 0 == ATMOSPHERE_1976.pressure_integral(288.6, 84100.0, 0.0)
+    # Gas over twice as hot as the standard atmosphere
+    assert_allclose(ATMOSPHERE_1976.pressure_integral(600., 101325., 100.), 
+                    573.8231043970187, rtol=1E-9)
+
+
+def test_ATMOSPHERE_1976_evaluate():
+    # Every layer, the layer boundaries, and above the model's limit
+    Zs = np.concatenate([np.linspace(-610, 90000, 301), 
+                         [0, 11E3*r0/(r0 - 11E3), 84852.1, 2E5]])
+    for dT in [0, 7.5]:
+        atm = ATMOSPHERE_1976.evaluate(Zs, dT)
+        for attr in ['T', 'P', 'rho', 'mu', 'k', 'g', 'v_sonic']:
+            expect = [getattr(ATMOSPHERE_1976(Z, dT), attr) for Z in Zs]
+            assert_allclose(getattr(atm, attr), expect, rtol=1E-13)
+    
+    atm = ATMOSPHERE_1976.evaluate([[0], [5000]], dT=[0, 1, 2])
+    assert atm.T.shape == (2, 3)
+    assert_allclose(atm.P[1, 2], ATMOSPHERE_1976(5000, dT=2).P)
+    assert_allclose(atm.rho[1, 2], ATMOSPHERE_1976(5000, dT=2).rho)
     
     
 def test_airmass():
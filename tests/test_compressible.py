@@ -283,6 +283,129 @@ def test_IGT():
         IGT(D=D, P2=P2, L=L, SG=SG, mu=mu, Tavg=Tavg)
 
 
+def test_gas_pipeline_batch():
+    import numpy as np
+    nan = np.nan
+    methods = ['Panhandle_A', 'Panhandle_B', 'Weymouth', 'Spitzglass_high', 
+               'Spitzglass_low', 'Oliphant', 'Fritzsche', 'Muller', 'IGT']
+    np.random.seed(0)
+    N = 50
+    SG = np.random.uniform(0.55, 0.9, N)
+    Tavg = np.random.uniform(270., 320., N)
+    L = np.random.uniform(1E3, 2E5, N)
+    D = np.random.uniform(0.05, 1.2, N)
+    Zavg = np.random.uniform(0.85, 1., N)
+    for Method in methods:
+        scalar = globals()[Method]
+        if Method == 'Spitzglass_low':
+            P1 = np.random.uniform(1.1E5, 1.2E5, N)
+            P2 = P1 - np.random.uniform(100., 5000., N)
+        else:
+            P1 = np.random.uniform(2E6, 1E7, N)
+            P2 = P1*np.random.uniform(0.2, 0.95, N)
+        kwargs = {'mu': 1E-5} if Method in ('Muller', 'IGT') else {}
+        Q = gas_pipeline_batch(SG, Tavg, L, D, P1, P2, nan, Zavg=Zavg, 
+                               Method=Method, **kwargs)[4]
+        for i in range(0, N, 10):
+            assert_allclose(Q[i], scalar(SG=SG[i], Tavg=Tavg[i], L=L[i], D=D[i], 
+                                         P1=P1[i], P2=P2[i], Zavg=Zavg[i], **kwargs),
+                            rtol=1E-13)
+        # A different unknown in each leg
+        args = [L.copy(), D.copy(), P1.copy(), P2.copy(), Q.copy()]
+        for k in range(5):
+            args[k][k::5] = nan
+        ans = gas_pipeline_batch(SG, Tavg, *args, Zavg=Zavg, Method=Method, **kwargs)
+        for calc, expect in zip(ans, [L, D, P1, P2, Q]):
+            assert_allclose(calc, expect, rtol=1E-11)
+
+    # Same as the scalar functions in the tests above
+    ans = gas_pipeline_batch(SG=0.693, Tavg=277.15, L=160E3, D=[0.34, nan], 
+                             P1=90E5, P2=20E5, Q=[nan, 48.92351786788815], 
+                             mu=1E-5, Method='IGT')
+    assert_allclose(ans[4][0], 48.92351786788815)
+    assert_allclose(ans[1][1], 0.34)
+
+    # Flows too large for the upstream pressure give NaN
+    ans = gas_pipeline_batch(0.693, 277.15, 160E3, 0.34, 90E5, nan, [40., 400.])
+    assert np.isnan(ans[3][1]) and np.isfinite(ans[3][0])
+
+    with pytest.raises(Exception):
+        gas_pipeline_batch(0.693, 277.15, 160E3, 0.34, 90E5, 20E5, nan, Method='IGT')
+    with pytest.raises(Exception):
+        gas_pipeline_batch(0.693, 277.15, 160E3, 0.34, 90E5, 20E5, nan, Method='Darcy')
+    with pytest.raises(Exception):
+        gas_pipeline_batch(0.693, 277.15, 160E3, 0.34, 90E5, 20E5, 40.)
+
+
+def test_gas_pipeline_profile():
+    import numpy as np
+    from math import exp, expm1, pi
+    from scipy.constants import R, g
+    np.random.seed(0)
+    N = 500
+    m, T1, MW, k = 25., 310., 18., 1.3
+    L = np.random.uniform(100., 2000., N)
+    D = np.where(np.arange(N) < 200, 0.5, 0.4)
+    dz = np.random.uniform(-20., 20., N)
+    Zavg = np.random.uniform(0.9, 1., N)
+    ratio = np.ones(N)
+    ratio[[0, 150, 300]] = [1.2, 1.5, 1.3]
+    U, T_ground, eta = 3., 285., 0.8
+    P, T, fd = gas_pipeline_profile(m, L, D, T1, MW, 1.1E-5, P1=6E6, dz=dz, 
+                                    roughness=4.5E-5, Zavg=Zavg, ratio=ratio,
+                                    k=k, eta=eta, U=U, T_ground=T_ground)
+    assert_allclose(fd[[0, 300]], [friction_factor(4*m/(pi*D_i*1.1E-5), 4.5E-5/D_i)
+                                   for D_i in (0.5, 0.4)], rtol=1E-13)
+
+    # March one segment at a time
+    Cp = k/(k-1)*R/(MW/1000.)
+    Ps, Ts = [6E6], [T1]
+    for i in range(N):
+        T_in = isentropic_T_rise_compression(Ts[-1], 1., ratio[i], k, eta)
+        T_out = T_ground + (T_in - T_ground)*exp(-U*pi*D[i]*L[i]/(m*Cp))
+        RT_M = Zavg[i]*R*0.5*(T_in + T_out)/(MW/1000.)
+        s = 2*g*dz[i]/RT_M
+        G = m/(pi/4*D[i]**2)
+        P_out2 = exp(-s)*(Ps[-1]*ratio[i])**2 - fd[i]*L[i]/D[i]*G**2*RT_M*-expm1(-s)/s
+        Ps.append(P_out2**0.5)
+        Ts.append(T_out)
+    assert_allclose(P, Ps, rtol=1E-11)
+    assert_allclose(T, Ts, rtol=1E-12)
+
+    # Back-calculating the inlet pressure, reusing the friction factors
+    P_back, T_back, fd_back = gas_pipeline_profile(m, L, D, T1, MW, 1.1E-5, 
+        P2=P[-1], dz=dz, Zavg=Zavg, ratio=ratio, k=k, eta=eta, U=U, 
+        T_ground=T_ground, fd=fd)
+    assert_allclose(P_back, P, rtol=1E-11)
+    assert_allclose(fd_back, fd)
+    
+    # Flat, it is `isothermal_gas` without the kinetic energy term
+    P, T, fd = gas_pipeline_profile(m=20., L=5E4, D=0.4, T1=300., MW=18., 
+                                    mu=1.1E-5, P1=7E6, roughness=4.5E-5)
+    rho = 7E6*0.018/(R*300.)
+    P2 = isothermal_gas_batch(rho=rho, fd=fd[0], P1=7E6, P2=np.nan, L=5E4, 
+                              D=0.4, m=20.)[1]
+    assert_allclose(P[-1], P2, rtol=1E-5)
+    assert_allclose(T, [300., 300.])
+    
+    # No flow is the barometric formula
+    P = gas_pipeline_profile(m=1E-9, L=[1000.]*10, D=0.4, T1=300., MW=18., 
+                             mu=1.1E-5, P1=7E6, dz=100.)[0]
+    assert_allclose(P[-1], 7E6*exp(-g*0.018*1000./(R*300.)), rtol=1E-12)
+    
+    # A flow too large for the inlet pressure
+    P = gas_pipeline_profile(m=60., L=[5E4]*4, D=0.4, T1=300., MW=18., 
+                             mu=1.1E-5, P1=7E6)[0]
+    assert np.isfinite(P[1]) and np.all(np.isnan(P[2:]))
+
+    with pytest.raises(Exception):
+        gas_pipeline_profile(20., 5E4, 0.4, 300., 18., 1.1E-5)
+    with pytest.raises(Exception):
+        gas_pipeline_profile(20., 5E4, 0.4, 300., 18., 1.1E-5, P1=7E6, P2=6E6)
+    with pytest.raises(Exception):
+        gas_pipeline_profile(20., 5E4, 0.4, 300., 18., 1.1E-5, P1=7E6, ratio=1.2)
+
+
 def test_isothermal_gas():
     mcalc = isothermal_gas(11.3, 0.00185, P1=1E6, P2=9E5, L=1000, D=0.5)
     assert_allclose(mcalc, 145.484757264)
@@ -327,6 +450,79 @@ def test_isothermal_gas():
     assert_allclose(m2, 145.48786057477403)
 
 
+def test_isothermal_gas_batch():
+    import numpy as np
+    nan = np.nan
+    rho, fd = 11.3, 0.00185
+    # Each unknown in turn, including the Newton-defeating P1 case above
+    P1 = [1E6, nan, 1E6, 1E6, 1E6, nan]
+    P2 = [9E5, 9E5, nan, 9E5, 9E5, 9E5]
+    L = [1000., 1000., 1000., nan, 1000., 1000.]
+    D = [0.5, 0.5, 0.5, 0.5, nan, 0.5]
+    m = [nan, 145.484757264, 145.484757264, 145.484757264, 145.484757264, 390.]
+    P1s, P2s, Ls, Ds, ms, choked = isothermal_gas_batch(rho, fd, P1, P2, L, D, m)
+    assert not np.any(choked)
+    assert_allclose(P1s, [1E6]*5 + [2298973.786533209], rtol=1E-9)
+    assert_allclose(P2s, [9E5]*6, rtol=1E-9)
+    assert_allclose(Ls, [1000.]*6, rtol=1E-9)
+    assert_allclose(Ds, [0.5]*6, rtol=1E-9)
+    assert_allclose(ms, [145.484757264]*5 + [390.], rtol=1E-9)
+
+    # Random feasible segments agree with the scalar solver for every unknown
+    np.random.seed(0)
+    N = 200
+    rho = np.random.uniform(1., 50., N)
+    fd = np.random.uniform(0.001, 0.03, N)
+    P1 = np.random.uniform(1E5, 1E7, N)
+    L = np.random.uniform(1., 2000., N)
+    D = np.random.uniform(0.1, 1.5, N)
+    Pcf = np.array([P_isothermal_critical_flow(P1[i], fd[i], D[i], L[i]) for i in range(N)])
+    P2 = Pcf + np.random.uniform(0.01, 0.99, N)*(P1 - Pcf)
+    m = isothermal_gas_batch(rho, fd, P1, P2, L, D, nan)[4]
+    for i in range(0, N, 20):
+        assert_allclose(m[i], isothermal_gas(rho[i], fd[i], P1=P1[i], P2=P2[i], L=L[i], D=D[i]))
+    for k, known in enumerate((P1, P2, L, D)):
+        args = [P1, P2, L, D, m]
+        args[k] = nan
+        ans = isothermal_gas_batch(rho, fd, *args)
+        assert not np.any(ans[5])
+        assert_allclose(ans[k], known, rtol=1E-7)
+
+    # Long pipelines, where the critical pressure ratio is small
+    L = np.random.uniform(1E4, 1E6, N)
+    D = np.random.uniform(0.01, 1.5, N)
+    # The critical pressure ratio is less than (1 + fd*L/D)**-0.5
+    ratio = (1.0 + fd*L/D)**-0.5
+    P2 = P1*(ratio + np.random.uniform(0.01, 0.99, N)*(1.0 - ratio))
+    m = isothermal_gas_batch(rho, fd, P1, P2, L, D, nan)[4]
+    assert np.all(np.isfinite(m))
+    for k, known in enumerate((P1, P2, L, D)):
+        args = [P1, P2, L, D, m]
+        args[k] = nan
+        assert_allclose(isothermal_gas_batch(rho, fd, *args)[k], known, rtol=1E-7)
+
+    # Choked and reverse flow segments are masked, not raised
+    P1s, P2s, Ls, Ds, ms, choked = isothermal_gas_batch(11.3, 0.00185, 
+        P1=[1E6, nan, 1E6, 1E6, 1E6, 9E5], P2=[1E5, 9E5, nan, 5E5, 1E5, 1E6], 
+        L=[1000., 1000., 1000., nan, 1000., 1000.], D=[0.5, 0.5, 0.5, 0.5, nan, 0.5],
+        m=[nan, 400., 400., 200., 1E5, nan])
+    assert choked.tolist() == [True, True, True, False, True, False]
+    assert np.all(np.isnan([ms[0], P1s[1], P2s[2], Ds[4], ms[5]]))
+    assert_allclose(Ls[3], isothermal_gas(11.3, 0.00185, P1=1E6, P2=5E5, m=200., D=0.5))
+    # The analytical length is negative for flows too large for any pipe
+    assert isothermal_gas_batch(11.3, 0.00185, 1E6, 1E5, nan, 0.5, 400.)[5]
+    
+    # Broadcasting and the shape of the outputs
+    ans = isothermal_gas_batch(11.3, 0.00185, 1E6, 9E5, 1000., 0.5, [[nan, nan]])
+    assert ans[4].shape == (1, 2)
+    assert_allclose(ans[4], [[145.484757264]*2])
+    
+    with pytest.raises(Exception):
+        isothermal_gas_batch(11.3, 0.00185, 1E6, 9E5, 1000., 0.5, 145.)
+    with pytest.raises(Exception):
+        isothermal_gas_batch(11.3, 0.00185, 1E6, nan, 1000., 0.5, nan)
+
+
 def test_P_isothermal_critical_flow():
     P2_max = P_isothermal_critical_flow(P=1E6, fd=0.00185, L=1000., D=0.5)
     assert_allclose(P2_max, 389699.7317645518)
\ No newline at end of file
@@ -219,6 +219,173 @@ def test_control_valve_size_g():
     size_control_valve_g(Q=1000000000.0, **kwargs)
 
 
+def check_batch_matches_scalar(batch, scalar, kwargs, fields):
+    out = batch(full_output=True, **kwargs)
+    N = out.shape[0]
+    for i in range(N):
+        row = {k: (v[i] if isinstance(v, np.ndarray) else v) for k, v in kwargs.items()}
+        row['allow_choked'] = bool(row['allow_choked'])
+        row['allow_laminar'] = bool(row['allow_laminar'])
+        try:
+            ans = scalar(full_output=True, **row)
+        except Exception:
+            # Diverging iterations the scalar function cannot stop
+            assert not out['converged'][i]
+            continue
+        assert_allclose(out['Kv'][i], ans['Kv'], rtol=1E-13)
+        assert out['converged'][i] == ('warning' not in ans)
+        for field in fields:
+            assert out[field][i] == ans[field]
+    assert_allclose(batch(**kwargs), out['Kv'])
+
+
+def test_size_control_valve_l_batch():
+    np.random.seed(0)
+    N = 300
+    d = np.random.choice([0.01, 0.025, 0.05, 0.1, 0.15], N)
+    kwargs = dict(rho=np.random.uniform(600, 1100, N), 
+                  Psat=np.random.uniform(1E3, 3E5, N), Pc=22120E3, 
+                  mu=10**np.random.uniform(-4, -1, N), P1=8E5, 
+                  P2=8E5*np.random.uniform(0.3, 0.95, N), 
+                  Q=10**np.random.uniform(-6, -1, N), d=d, 
+                  D1=d*np.random.choice([1, 1.5, 2], N), 
+                  D2=d*np.random.choice([1, 1.5], N), 
+                  FL=np.random.uniform(0.8, 0.95, N), 
+                  Fd=np.random.uniform(0.1, 1, N), 
+                  allow_choked=np.random.rand(N) > 0.2, 
+                  allow_laminar=np.random.rand(N) > 0.2)
+    check_batch_matches_scalar(size_control_valve_l_batch, size_control_valve_l, 
+                               kwargs, ['FF', 'laminar'])
+
+    # Without diameters
+    del kwargs['d'], kwargs['D1'], kwargs['D2']
+    check_batch_matches_scalar(size_control_valve_l_batch, size_control_valve_l, 
+                               kwargs, ['FF', 'laminar', 'Rev', 'choked'])
+
+    # Examples 1 and 2, and one the scalar function cannot converge
+    ans = size_control_valve_l_batch(rho=965.4, Psat=70.1E3, Pc=22120E3, 
+                                     mu=3.1472E-4, P1=680E3, P2=[220E3, 220E3, 650E3], 
+                                     Q=0.1, D1=[0.15, 0.1, 0.1], D2=[0.15, 0.1, 0.09], 
+                                     d=[0.15, 0.1, 0.08], FL=[0.9, 0.6, 0.9], 
+                                     Fd=[0.46, 0.98, 0.46], full_output=True)
+    assert_allclose(ans['Kv'][:2], [164.9954763704956, 238.05817216710483])
+    assert ans['converged'].tolist() == [True, True, False]
+    with pytest.raises(RuntimeError):
+        size_control_valve_l(rho=965.4, Psat=70.1E3, Pc=22120E3, mu=3.1472E-4, 
+                             P1=680E3, P2=650E3, Q=0.1, D1=0.1, D2=0.09, d=0.08,
+                             FL=0.9, Fd=0.46)
+
+    # Converges slowly, after more than 20 iterations
+    kwargs = dict(rho=838.8, Psat=270E3, Pc=22120E3, mu=2.1E-4, P1=800E3, 
+                  P2=584E3, Q=0.064, d=0.05, D1=0.075, D2=0.075, FL=0.7, Fd=0.46)
+    ans = size_control_valve_l_batch(full_output=True, **kwargs)
+    assert ans['converged']
+    assert_allclose(ans['Kv'], size_control_valve_l(**kwargs), rtol=1E-13)
+    assert_allclose(ans['Kv'], 571.8694463172541, rtol=1E-13)
+
+
+def test_size_control_valve_g_batch():
+    np.random.seed(0)
+    N = 300
+    d = np.random.choice([0.001, 0.01, 0.025, 0.05, 0.1, 0.15], N)
+    P1 = np.random.uniform(1E5, 2E6, N)
+    kwargs = dict(T=np.random.uniform(250, 500, N), MW=np.random.uniform(2, 60, N), 
+                  mu=np.random.uniform(1E-5, 2E-4, N), 
+                  gamma=np.random.uniform(1.1, 1.67, N), 
+                  Z=np.random.uniform(0.8, 1, N), P1=P1, 
+                  P2=P1*np.random.uniform(0.05, 0.99, N), 
+                  Q=10**np.random.uniform(-6, 0, N), d=d, 
+                  D1=d*np.random.choice([1, 1.5, 2], N), 
+                  D2=d*np.random.choice([1, 1.5], N), 
+                  FL=np.random.uniform(0.8, 0.95, N), 
+                  Fd=np.random.uniform(0.05, 1, N), 
+                  xT=np.random.uniform(0.2, 0.9, N), 
+                  allow_choked=np.random.rand(N) > 0.2, 
+                  allow_laminar=np.random.rand(N) > 0.2)
+    out = size_control_valve_g_batch(full_output=True, **kwargs)
+    # Includes cases in each path
+    assert np.any(out['laminar']) and np.any(~out['converged'])
+    assert np.any(np.isfinite(out['xTP']))
+    check_batch_matches_scalar(size_control_valve_g_batch, size_control_valve_g, 
+                               kwargs, ['Y', 'laminar'])
+
+    del kwargs['d'], kwargs['D1'], kwargs['D2']
+    check_batch_matches_scalar(size_control_valve_g_batch, size_control_valve_g, 
+                               kwargs, ['Y', 'laminar', 'choked'])
+
+    # Output shape follows the broadcast inputs
+    Kv = size_control_valve_g_batch(T=433., MW=44.01, mu=1.4665E-4, gamma=1.30,
+                                    Z=0.988, P1=680E3, P2=[[310E3], [400E3]], 
+                                    Q=[38/36., 1.], D1=0.08, D2=0.1, d=0.05, 
+                                    FL=0.85, Fd=0.42, xT=0.60)
+    assert Kv.shape == (2, 2)
+    assert_allclose(Kv[0, 0], 72.58664545391052)
+
+
+def test_ControlValveCatalog():
+    np.random.seed(0)
+    N = 3000
+    d = np.random.choice([0.025, 0.05, 0.08, 0.1, 0.15, 0.2, 0.25], N)
+    Kv = (d*1000)**2*np.random.uniform(0.005, 0.035, N)
+    FL, Fd = np.random.uniform(0.5, 0.95, N), np.random.uniform(0.3, 1, N)
+    xT = np.random.uniform(0.3, 0.8, N)
+    characteristic = np.random.choice(['linear', 'equal percentage', 'quick opening'], N)
+    catalog = ControlValveCatalog(Kv, d, FL, Fd, xT, characteristic)
+    
+    def smallest(batch, kwargs, opening, D1, D2):
+        # Size every trim for every case
+        D1 = d[:, None] if D1 is None else D1
+        D2 = d[:, None] if D2 is None else D2
+        required = batch(D1=D1, D2=D2, d=d[:, None], FL=FL[:, None], 
+                         Fd=Fd[:, None], full_output=True, **kwargs)
+        fits = (d <= np.min(D1, axis=-1)) & (d <= np.min(D2, axis=-1))
+        passes = (required['Kv'] <= catalog.capacity(opening)[:, None]) & required['converged']
+        passes = np.all(passes, axis=1) & fits
+        passes = np.nonzero(passes)[0]
+        return passes[np.argmin(Kv[passes])] if passes.size else None
+
+    liquid = dict(rho=965.4, Psat=70.1E3, Pc=22120E3, mu=3.1472E-4, P1=680E3,
+                  P2=[220E3, 220E3, 500E3])
+    gas = dict(T=433., MW=44.01, mu=1.4665E-4, gamma=1.30, Z=0.988, P1=680E3, 
+               P2=[310E3, 310E3, 600E3])
+    pipes = [(None, None), (0.2, 0.2), (0.3, 0.25), (None, 0.3), (0.1, 0.1)]
+    selected = []
+    for Q in ([0.01, 0.02, 0.005], [0.05, 0.08, 0.02], [0.2, 0.3, 0.1]):
+        for D1, D2 in pipes:
+            i, openings = catalog.select_l(Q=Q, D1=D1, D2=D2, opening=0.8, **liquid)
+            assert i == smallest(size_control_valve_l_batch, dict(Q=Q, **liquid), 0.8, D1, D2)
+            selected.append(i)
+    for Q in ([1., 2., 0.5], [5., 8., 2.], [20., 30., 10.]):
+        for D1, D2 in pipes:
+            i, openings = catalog.select_g(Q=Q, D1=D1, D2=D2, opening=0.7, **gas)
+            assert i == smallest(lambda **kw: size_control_valve_g_batch(xT=xT[:, None], **kw),
+                                 dict(Q=Q, **gas), 0.7, D1, D2)
+            selected.append(i)
+    # Includes cases with and without a suitable trim
+    assert None in selected and len(set(selected)) > 10
+
+    # The openings give the required flow coefficients on the characteristic
+    Q = [0.01, 0.02, 0.005]
+    i, openings = catalog.select_l(Q=Q, D1=0.2, D2=0.2, opening=0.8, **liquid)
+    required = size_control_valve_l_batch(Q=Q, D1=0.2, D2=0.2, d=d[i], FL=FL[i], 
+                                          Fd=Fd[i], **liquid)
+    assert np.all(openings <= 0.8)
+    assert_allclose([catalog.capacity(x, [i])[0] for x in openings], required)
+
+    # A case whose iterations stop before converging, at a flow coefficient
+    # below the capacity of the trim, does not pass
+    gas = dict(T=337.5, MW=34.17, mu=1.37E-4, gamma=1.3, Z=0.95, P1=1664E3, 
+               P2=975E3, Q=2.03, D1=0.0375, D2=0.0375)
+    ans = size_control_valve_g_batch(d=0.025, FL=0.85, Fd=0.45, xT=0.755, 
+                                     full_output=True, **gas)
+    assert not ans['converged'] and ans['Kv'] < 0.8*250.
+    catalog = ControlValveCatalog(Kv=[250.], d=[0.025], FL=0.85, Fd=0.45, xT=0.755)
+    assert catalog.select_g(opening=0.8, **gas) == (None, None)
+    
+    with pytest.raises(Exception):
+        ControlValveCatalog(Kv, d, characteristic='parabolic')
+
+
 def test_control_valve_choke_P_l():
     P2 = control_valve_choke_P_l(69682.89291024722, 22048320.0, 0.6, 680000.0)
     assert_allclose(P2, 458887.5306077305)
@@ -23,6 +23,7 @@ SOFTWARE.'''
 from numpy.testing import assert_allclose
 import pytest
 import numpy as np
+import datetime
 from fluids.design_climate import *
 from fluids.design_climate import _latlongs, stations
 
@@ -75,6 +76,48 @@ def test_get_closest_station():
     
     with pytest.raises(Exception):
          get_closest_station(51.02532675, -114.049868485806, 90150000)
+
+
+def test_get_closest_stations():
+    np.random.seed(0)
+    lats = np.random.uniform(-80, 80, 200)
+    lons = np.random.uniform(-180, 180, 200)
+    indexes, distances = get_closest_stations(lats, lons, 20150000)
+    
+    # Brute force haversine search of the recent stations
+    recent = np.flatnonzero(isd_history['END'] > 20150000)
+    lat2, lon2 = np.radians(isd_history['LAT'][recent]), np.radians(isd_history['LON'][recent])
+    for i in range(len(lats)):
+        lat1, lon1 = np.radians(lats[i]), np.radians(lons[i])
+        a = np.sin(0.5*(lat2 - lat1))**2 + np.cos(lat1)*np.cos(lat2)*np.sin(0.5*(lon2 - lon1))**2
+        d = 2*6371008.8*np.arcsin(np.sqrt(a))
+        # Some stations share a location, so compare the distances
+        assert_allclose(distances[i], d.min(), rtol=1E-9)
+        assert_allclose(d[np.searchsorted(recent, indexes[i])], d.min(), rtol=1E-9)
+    assert np.all(isd_history['END'][indexes] > 20150000)
+
+    # Scalars and date filtering
+    index, distance = get_closest_stations(51.02532675, -114.049868485806, 20150000)
+    assert stations[int(index)].NAME == 'CALGARY INTL CS'
+    index_old, _ = get_closest_stations(51.02532675, -114.049868485806, 0)
+    assert index_old != index
+    with pytest.raises(Exception):
+         get_closest_stations([51.0], [-114.0], 90150000)
+
+
+def test_load_isd_history(tmpdir):
+    data = load_isd_history(cache_dir=str(tmpdir))
+    assert type(data) is np.ndarray
+    assert len(tmpdir.listdir()) == 1
+    cached = load_isd_history(cache_dir=str(tmpdir))
+    assert isinstance(cached, np.memmap)
+    assert cached.tobytes() == data.tobytes()
+    assert data.shape[0] == len(stations)
+    
+    station = stations[int(np.flatnonzero(data['NAME'] == b'CALGARY INTL CS')[0])]
+    assert (station.USAF, station.WBAN, station.CTRY, station.ST, station.ICAO) == (713930, None, 'CA', None, None)
+    assert (station.LAT, station.LON, station.ELEV) == (51.1, -114.0, 1081.0)
+    assert len(stations[10:20]) == 10
          
     
 sample_data_random_station_1999 = '''STN--- WBAN   YEARMODA    TEMP       DEWP      SLP        STP       VISIB      WDSP     MXSPD   GUST    MAX     MIN   PRCP   SNDP   FRSHTT
@@ -443,6 +486,242 @@ sample_data_random_station_1999 = '''STN--- WBAN   YEARMODA    TEMP       DEWP
 '''
 
 
+def test_gsod_year_parser():
+    lines = sample_data_random_station_1999.split('\n')[1:-1]
+    for SI in (True, False):
+        data = gsod_year_parser(sample_data_random_station_1999, SI=SI)
+        assert data.dtype == gsod_dtype
+        assert len(data) == len(lines)
+        for record, line in zip(data, lines):
+            day = gsod_day_parser(line, SI=SI, to_datetime=False)
+            for name in gsod_dtype.names:
+                value, expect = record[name], getattr(day, name)
+                if name == 'DATE':
+                    assert value == int(expect)
+                elif name == 'FRSHTT':
+                    assert value.decode('ascii') == expect
+                elif expect is None:
+                    assert np.isnan(value)
+                else:
+                    assert value == expect
+    # bytes, and no trailing newline
+    data = gsod_year_parser(sample_data_random_station_1999.encode('ascii').strip())
+    assert len(data) == len(lines)
+    assert_allclose(data['MIN'][1], (5.0 + 459.67)*5/9.)
+    
+    # Only a header is no data; anything else not in the format is an error
+    assert len(gsod_year_parser(sample_data_random_station_1999.split('\n')[0])) == 0
+    for text in ['Exception', lines[0][:100], lines[0].replace('1999', '19X9', 1)]:
+        with pytest.raises(ValueError):
+            gsod_year_parser(text)
+
+
+def make_gsod_year(year, T_missing_month=None):
+    # Text of a synthetic GSOD file, with temperatures following the seasons;
+    # and no temperatures for most of one month
+    template = sample_data_random_station_1999.split('\n')[1]
+    lines = [sample_data_random_station_1999.split('\n')[0]]
+    date = datetime.date(year, 1, 1)
+    while date.year == year:
+        T = 50.0 - 30.0*np.cos(2*np.pi*(date.timetuple().tm_yday - 15 + 3*(year - 1998))/365.0)
+        T = '%6.1f' %T
+        if date.month == T_missing_month and date.day > 5:
+            T = '9999.9'
+        wind = '%5.1f' %(10 + 5*np.sin(date.toordinal()))
+        line = template[:14] + date.strftime('%Y%m%d') + template[22:24] + T + template[30:78] + wind + template[83:]
+        lines.append(line)
+        date += datetime.timedelta(days=1)
+    return '\n'.join(lines) + '\n'
+
+
+def test_StationDataGSOD_cached(tmpdir, monkeypatch):
+    import fluids.design_climate
+    monkeypatch.setattr(fluids.design_climate, 'data_dir', str(tmpdir))
+    for year, missing in zip([1998, 1999, 2000], [None, 3, 7]):
+        folder = tmpdir.join('gsod', str(year))
+        folder.ensure(dir=True)
+        folder.join('712650-99999.op').write(make_gsod_year(year, missing))
+    station = IntegratedSurfaceDatabaseStation(712650.0, 99999.0, 'TEST', 'CA', None, None, 45.0, -75.0, 100.0, 19980101.0, 20001231.0)
+    station_data = StationDataGSOD(station)
+    assert sorted(station_data.data) == [1998, 1999, 2000]
+    
+    # Attributes of earlier versions
+    parsed_data, raw_text = station_data.parsed_data, station_data.raw_text
+    for year in [1998, 1999, 2000]:
+        text = make_gsod_year(year, [None, 3, 7][year - 1998])
+        assert raw_text[year] == text
+        days = [gsod_day_parser(line) for line in text.split('\n')[1:-1]]
+        assert [day for day in parsed_data[year] if day is not None] == days
+        assert len(parsed_data[year]) == len(station_data.raw_data[year])
+    
+    # Reference: the per-day parser and Python sums
+    sums, counts = {}, {}
+    for year in [1998, 1999, 2000]:
+        text = make_gsod_year(year, [None, 3, 7][year - 1998])
+        for line in text.split('\n')[1:-1]:
+            day = gsod_day_parser(line)
+            if day.TEMP is not None:
+                key = (year, day.DATE.month - 1)
+                sums[key] = sums.get(key, 0.0) + day.TEMP
+                counts[key] = counts.get(key, 0) + 1
+    Ts, yearly = station_data.month_average_temperature(1998, 2000, include_yearly=True)
+    for year in [1998, 1999, 2000]:
+        for month in range(12):
+            key = (year, month)
+            if counts.get(key, 0) < 23:
+                assert yearly[year][month] is None
+            else:
+                assert yearly[year][month] == sums[key]/counts[key]
+    for month in range(12):
+        values = [yearly[year][month] for year in yearly if yearly[year][month] is not None]
+        assert_allclose(Ts[month], np.mean(values), rtol=1E-13)
+    assert yearly[1999][2] is None and yearly[2000][6] is None
+    assert station_data.coldest_month(1998, 2000) == 0
+    assert station_data.warmest_month(1998, 2000) == 6
+    # No year with enough data for March
+    with pytest.raises(ZeroDivisionError):
+        station_data.month_average_temperature(1999, 1999)
+
+    # Percentiles of the daily wind speed
+    wind = np.concatenate([station_data.data[year]['WDSP'] for year in [1998, 1999, 2000]])
+    assert_allclose(station_data.percentile_extreme_condition(1998, 2000, percentile=99), np.percentile(wind, 99))
+    value, yearly = station_data.percentile_extreme_condition(1999, 2000, attr='TEMP', percentile=1, include_yearly=True)
+    T_1999 = station_data.data[1999]['TEMP']
+    T_1999 = T_1999[(station_data.data[1999]['DATE']//100) % 100 != 3]
+    assert_allclose(yearly[1999], np.percentile(T_1999, 1))
+    
+    # The parsed data is cached; the text is no longer needed
+    for year in [1998, 1999, 2000]:
+        assert tmpdir.join('gsod', str(year), '712650-99999.npy').check()
+        tmpdir.join('gsod', str(year), '712650-99999.op').remove()
+    cached = StationDataGSOD(station)
+    assert cached.month_average_temperature(1998, 2000) == Ts
+
+
+def test_StationDataGSOD_corrupt_year(tmpdir, monkeypatch):
+    import fluids.design_climate
+    monkeypatch.setattr(fluids.design_climate, 'data_dir', str(tmpdir))
+    for year, text in [(1998, make_gsod_year(1998)), (1999, 'garbage\n')]:
+        folder = tmpdir.join('gsod', str(year))
+        folder.ensure(dir=True)
+        folder.join('712650-99999.op').write(text)
+    station = IntegratedSurfaceDatabaseStation(712650.0, 99999.0, 'TEST', 'CA', None, None, 45.0, -75.0, 100.0, 19980101.0, 19991231.0)
+    station_data = StationDataGSOD(station)
+    assert sorted(station_data.data) == [1998]
+
+
+def gzip_bytes(text):
+    import gzip, io
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb') as f:
+        f.write(text.encode('utf-8'))
+    return buf.getvalue()
+
+
+def test_download_gsod_mirror(tmpdir, monkeypatch):
+    import fluids.design_climate
+    cache = tmpdir.join('cache')
+    mirror = tmpdir.join('mirror')
+    monkeypatch.setattr(fluids.design_climate, 'data_dir', str(cache))
+    texts = {}
+    for year in [1998, 1999]:
+        texts[year] = make_gsod_year(year, None)
+        mirror.join(str(year)).ensure(dir=True)
+        mirror.join(str(year), '712650-99999-%d.op.gz' %year).write_binary(gzip_bytes(texts[year]))
+    # A legacy error marker is not taken as data
+    cache.join('gsod', '1998').ensure(dir=True)
+    cache.join('gsod', '1998', '712650-99999.op').write('Exception')
+
+    keys = [(712650, 99999, 1998), (712650, 99999, 1999), (712650, 99999, 2000)]
+    status = download_gsod(keys, source=str(mirror), threads=3)
+    assert status == {keys[0]: 'downloaded', keys[1]: 'downloaded', keys[2]: 'missing'}
+    assert cache.join('gsod', '1999', '712650-99999.op').read() == texts[1999]
+    assert cache.join('gsod', '2000', '712650-99999.missing').check()
+    assert not cache.join('gsod', '2000', '712650-99999.op').check()
+    
+    # Resuming does nothing more, even from a source which always fails
+    def broken(station, year):
+        raise IOError('Unreachable')
+    status = download_gsod(keys, source=broken, backoff=0)
+    assert status == {keys[0]: 'cached', keys[1]: 'cached', keys[2]: 'missing'}
+    assert get_station_year_text(712650, 99999, 1998, source=broken) == texts[1998]
+    with pytest.raises(Exception):
+        get_station_year_text(712650, 99999, 2000, source=broken)
+        
+    # Data published later is found when asked to look again
+    mirror.join('2000').ensure(dir=True)
+    mirror.join('2000', '712650-99999-2000.op.gz').write_binary(gzip_bytes(make_gsod_year(2000, None)))
+    status = download_gsod(keys[2:], source=str(mirror), retry_missing=True)
+    assert status == {keys[2]: 'downloaded'}
+    assert not cache.join('gsod', '2000', '712650-99999.missing').check()
+    
+    station = IntegratedSurfaceDatabaseStation(712650.0, 99999.0, 'TEST', 'CA', None, None, 45.0, -75.0, 100.0, 19980101.0, 20001231.0)
+    station_data = StationDataGSOD(station, source=broken)
+    assert sorted(station_data.data) == [1998, 1999, 2000]
+
+
+def test_download_gsod_retries(tmpdir, monkeypatch):
+    import fluids.design_climate
+    monkeypatch.setattr(fluids.design_climate, 'data_dir', str(tmpdir))
+    compressed = gzip_bytes(make_gsod_year(1998, None))
+    calls = []
+    def flaky(station, year):
+        calls.append(year)
+        if year == 1999 or calls.count(year) < 3:
+            raise IOError('Timed out')
+        return compressed
+        
+    keys = [(712650, 99999, 1998), (712650, 99999, 1999)]
+    status = download_gsod(keys, source=flaky, retries=2, backoff=0)
+    assert status == {keys[0]: 'downloaded', keys[1]: 'failed'}
+    assert calls.count(1998) == 3 and calls.count(1999) == 3
+    # Failures are not cached
+    assert tmpdir.join('gsod', '1998', '712650-99999.op').check()
+    assert not tmpdir.join('gsod', '1999', '712650-99999.op').check()
+    assert not tmpdir.join('gsod', '1999', '712650-99999.missing').check()
+    with pytest.raises(Exception):
+        get_station_year_text(712650, 99999, 1999, source=flaky)
+        
+
+def test_download_gsod_http(tmpdir, monkeypatch):
+    import fluids.design_climate
+    import threading
+    try:
+        from http.server import HTTPServer, SimpleHTTPRequestHandler
+    except ImportError:
+        from BaseHTTPServer import HTTPServer
+        from SimpleHTTPServer import SimpleHTTPRequestHandler
+    monkeypatch.setattr(fluids.design_climate, 'data_dir', str(tmpdir.join('cache')))
+    text = make_gsod_year(1998, 5)
+    served = {'/gsod/1998/712650-99999-1998.op.gz': gzip_bytes(text)}
+    
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in served:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(served[self.path])
+        def log_message(self, *args):
+            pass
+    
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        source = 'http://127.0.0.1:%d/gsod/' %server.server_address[1]
+        keys = [(712650, 99999, 1998), (712650, 99999, 1999)]
+        status = download_gsod(keys, source=source, backoff=0)
+        assert status == {keys[0]: 'downloaded', keys[1]: 'missing'}
+        data = get_station_year_data(712650, 99999, 1998)
+        assert_allclose(data['TEMP'], gsod_year_parser(text)['TEMP'])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
 @pytest.mark.slow
 @pytest.mark.online
 def test_get_station_year_text():
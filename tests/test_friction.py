@@ -331,4 +331,49 @@ def test_friction_Kumar():
         
     assert_allclose(all_ans, all_ans_expect)
 
-    
\ No newline at end of file
+    
+
+def test_Colebrook_high_Re_eD():
+    # Previously overflowed in the lambertw argument
+    assert_allclose(Colebrook(1E7, 0.05), 0.07155298184086675, rtol=1E-13)
+    assert_allclose(Colebrook(1E9, 0.2), 0.1556930024707868, rtol=1E-13)
+    # Matches Clamond's solution of the same equation to machine precision
+    for Re in [4E3, 1E5, 1E7, 1E9]:
+        for eD in [0, 1E-6, 1E-4, 1E-2, 0.2]:
+            assert_allclose(Colebrook(Re, eD), Clamond(Re, eD), rtol=5E-15)
+
+
+def test_FrictionFactorTable(tmpdir):
+    table = FrictionFactorTable(rtol=1E-7, cache_dir=str(tmpdir))
+    Res = np.exp(np.random.uniform(np.log(2040), np.log(1E9), 2000))
+    eDs = np.concatenate([np.zeros(500), 10**np.random.uniform(-9, -1, 1500)])
+    
+    calc = table.array(Res, eDs)
+    expect = np.array([Colebrook(Re, eD) for Re, eD in zip(Res, eDs)])
+    assert np.abs(calc/expect - 1).max() < 1E-7
+    assert table.max_error < 0.5E-7
+    
+    for Re, eD in zip(Res[::20], eDs[::20]):
+        assert_allclose(table(Re, eD), Colebrook(Re, eD), rtol=1E-7)
+    
+    # Outside the table is calculated exactly
+    assert_allclose(table(1E10, 1E-4), Colebrook(1E10, 1E-4), rtol=1E-15)
+    assert_allclose(table.array([1E5, 1E5], [1E-4, 0.5]), 
+                    [table(1E5, 1E-4), Colebrook(1E5, 0.5)], rtol=1E-13)
+    
+    # Loaded from disk with the same values
+    cached = FrictionFactorTable(rtol=1E-7, cache_dir=str(tmpdir))
+    assert_allclose(cached(1E5, 1E-4), table(1E5, 1E-4), rtol=0)
+    assert cached.N == table.N
+    
+    # Nearby parameters are cached separately
+    nearby = FrictionFactorTable(rtol=1E-7, Re_max=1.0000001E9, cache_dir=str(tmpdir))
+    nearby.build()
+    assert len(tmpdir.listdir()) == 2
+    
+    with pytest.raises(ValueError):
+        FrictionFactorTable(Re_min=100)
+    
+    assert_allclose(friction_factor(1E5, 1E-4, Method='table'), 
+                    friction_factor(1E5, 1E-4, Method='Colebrook'), rtol=1E-9)
+    assert_allclose(friction_factor(1E3, 1E-4, Method='table'), 0.064)
@@ -99,6 +99,18 @@ def test_geometry():
     V_head2 = V_horiz_torispherical(108., 156., 1., 0.06, 36, headonly=True)/231.
     assert_allclose([V_head1, V_head2], [111.71919144384525]*2)
 
+    # Heads only, against high-precision integration; including just either 
+    # side of the knuckle/dish junctions at h1 and h2
+    heads = [(1., 0.06, [0.05, 0.09574468075531915, 0.09574468094680852, 1.1, 1.5, 2.2, 2.9042553190531915, 2.904255319244681, 2.99, 3.0],
+              [0.0019545121463170607, 0.006871081572968194, 0.006871081599198076, 0.6541845925698317, 1.0934865579305468, 1.8176772822267093, 2.1801020342618957, 2.1801020342881254, 2.1868921765718343, 2.1869731158610937]),
+             (0.8, 0.1, [0.05, 0.12857142844285716, 0.12857142870000002, 1.1, 1.5, 2.2, 2.8714285713, 2.871428571557143, 2.99, 3.0],
+              [0.0025608443060933456, 0.016161066811866368, 0.016161066873965374, 0.8910842705167513, 1.4834335707277058, 2.4615628110284873, 2.950706074581446, 2.950706074643545, 2.966762355078318, 2.9668671414554115]),
+             (2., 0.3, [0.05, 0.7941176462647057, 0.794117647852941, 1.1, 1.5, 2.2, 2.205882352147059, 2.2058823537352943, 2.99, 3.0],
+              [0.004499410799728876, 0.8997660404959816, 0.8997660436002178, 1.5477195381023914, 2.4834053210022238, 4.055525010760372, 4.067044598404229, 4.067044601508465, 4.966628638886909, 4.9668106420044476])]
+    for f, k, hs, Vs in heads:
+        V_calc = [V_horiz_torispherical(D=3., L=0., f=f, k=k, h=h, headonly=True) for h in hs]
+        assert_allclose(V_calc, Vs, rtol=0, atol=1E-12*Vs[-1])
+
     # Two examples from [1]_, and at empty and h=D.
     Vs_calc = [V_vertical_conical(132., 33., i)/231. for i in [24, 60, 0, 132]]
     Vs = [250.67461381371024, 2251.175535772343, 0.0, 6516.560761446257]
@@ -285,6 +297,69 @@ def test_geometry_tank_chebyshev():
     assert_allclose(T.V_from_h(T.h_max, 'chebyshev'), T.V_total)
 
 
+def test_geometry_tank_chebyshev_cache(tmpdir):
+    make = lambda : TANK(L=1.2, L_over_D=3.5, sideA='torispherical', sideB='torispherical', sideA_f=1., horizontal=True, sideA_k=0.06, sideB_f=1., sideB_k=0.06)
+    T = make()
+    T.set_chebyshev_approximators(cache_dir=str(tmpdir))
+    assert len(tmpdir.listdir()) == 1
+    for V in np.linspace(0, T.V_total, 7)[1:-1]:
+        assert_allclose(T.h_from_V(V, 'chebyshev'), T.h_from_V(V, 'brenth'), atol=1E-5)
+    
+    cached = make()
+    cached.cache_dir = str(tmpdir)
+    cached.set_chebyshev_approximators()
+    assert not cached.piecewise
+    assert_allclose(cached.c_forward, T.c_forward, rtol=0, atol=0)
+    assert_allclose(cached.c_backward, T.c_backward, rtol=0, atol=0)
+    assert_allclose(cached.h_from_V(0.05, 'chebyshev'), T.h_from_V(0.05, 'chebyshev'))
+    
+    # A different geometry or degree is a different entry
+    T = TANK(L=1.2, L_over_D=3.5, horizontal=True)
+    T.set_chebyshev_approximators(deg_backwards=100, cache_dir=str(tmpdir))
+    T.set_chebyshev_approximators(deg_backwards=120, cache_dir=str(tmpdir))
+    assert len(tmpdir.listdir()) == 3
+
+
+def test_geometry_tank_piecewise():
+    tanks = [TANK(D=1.2, L=4, horizontal=False),
+             TANK(D=10., L=25., horizontal=True, sideA='ellipsoidal', sideB='ellipsoidal', sideA_a=2, sideB_a=2),
+             TANK(D=10., L=25., horizontal=True, sideA='guppy', sideB='torispherical', sideA_a=2, sideB_f=1., sideB_k=0.06),
+             TANK(D=10., L=25., horizontal=True, sideA='spherical', sideB='conical', sideA_a=2, sideB_a=2),
+             TANK(D=8., L=10., horizontal=False, sideA='torispherical', sideB='torispherical', sideA_f=1., sideA_k=0.06, sideB_f=1., sideB_k=0.06),
+             TANK(D=8., L=10., horizontal=False, sideA='spherical', sideB='ellipsoidal', sideA_a=3., sideB_a=4.),
+             TANK(D=1.5, L=5., horizontal=False, sideA='conical', sideB='conical', sideA_a=2., sideB_a=1.)]
+    for T in tanks:
+        hs = np.linspace(0, T.h_max, 51)
+        Vs = T.V_from_h(hs, 'full')
+        assert_allclose(T.V_from_h(hs, 'piecewise'), Vs, rtol=1E-11, atol=1E-12*T.V_total)
+        assert_allclose(T.h_from_V(Vs, 'piecewise'), hs, rtol=1E-8, atol=1E-8*T.h_max)
+        
+    # Scalars in, scalars out
+    T = tanks[2]
+    V = T.V_from_h(4.2, 'piecewise')
+    assert type(V) is float
+    assert_allclose(V, T.V_from_h(4.2), rtol=1E-10)
+    h = T.h_from_V(V, 'piecewise')
+    assert type(h) is float
+    assert_allclose(h, 4.2, rtol=1E-12)
+    assert T.h_from_V(T.V_total, 'piecewise') == T.h_max
+    assert T.h_from_V(0.0, 'piecewise') == 0.0
+
+    # Array shape is kept, and the other methods take arrays too
+    hs = np.linspace(0.5, 9.5, 12).reshape(3, 4)
+    Vs = T.V_from_h(hs)
+    assert Vs.shape == (3, 4)
+    assert_allclose(T.V_from_h(hs, 'piecewise'), Vs, rtol=1E-10)
+    assert_allclose(T.h_from_V(Vs, 'piecewise'), hs, rtol=1E-10)
+    assert_allclose(T.h_from_V(Vs, 'brenth'), hs, rtol=1E-9)
+    assert_allclose(T.h_from_V(Vs, 'spline'), hs, rtol=1E-3)
+    
+    with pytest.raises(Exception):
+        T.V_from_h(np.array([1.0, T.h_max*1.001]), 'piecewise')
+    with pytest.raises(Exception):
+        T.h_from_V(np.array([-1.0, 1.0]), 'piecewise')
+
+
 @pytest.mark.slow
 def test_geometry_tank_fuzz_h_from_V():
     T = TANK(L=1.2, L_over_D=3.5, sideA='torispherical', sideB='torispherical', sideA_f=1., horizontal=True, sideA_k=0.06, sideB_f=1., sideB_k=0.06)
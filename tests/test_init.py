@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+'''Chemical Engineering Design Library (ChEDL). Utilities for process modeling.
+Copyright (C) 2018 Caleb Bell <Caleb.Andrew.Bell@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.'''
+
+from __future__ import division
+import sys
+import subprocess
+import importlib
+import pytest
+import fluids
+
+
+def test_submodule_all():
+    # The table of names used for lazy loading matches the submodules
+    from fluids._all import submodule_all
+    assert set(submodule_all) == set(fluids._submodules)
+    for name in fluids._submodules:
+        module = importlib.import_module('fluids.' + name)
+        assert submodule_all[name] == module.__all__
+        
+    expect = list(fluids._all_order)
+    for name in fluids._all_order:
+        expect.extend(importlib.import_module('fluids.' + name).__all__)
+    assert sorted(expect) == sorted(fluids.__all__)
+    assert set(fluids._submodules) == set(fluids._all_order)
+    for name in ['submodules', 'all_order', '_all']:
+        assert name not in fluids.__all__
+
+
+def test_lazy_import():
+    code = '''
+import sys
+import fluids
+assert 'fluids.particle_size_distribution' not in sys.modules
+assert 'scipy.stats' not in sys.modules
+fluids.Reynolds
+assert 'fluids.core' in sys.modules
+assert 'fluids.particle_size_distribution' not in sys.modules
+assert fluids.PSDLognormal is fluids.particle_size_distribution.PSDLognormal
+from fluids import *
+assert ATMOSPHERE_1976 is fluids.atmosphere.ATMOSPHERE_1976
+assert 'Reynolds' in dir(fluids) and 'geometry' in dir(fluids)
+assert '_all' not in dir(fluids) and 'submodules' not in dir(fluids)
+try:
+    fluids.not_a_function
+except AttributeError:
+    pass
+else:
+    raise AssertionError()
+'''
+    if sys.version_info < (3, 7):
+        pytest.skip('Lazy loading requires Python 3.7')
+    subprocess.check_call([sys.executable, '-c', code])
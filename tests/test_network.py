@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+'''Chemical Engineering Design Library (ChEDL). Utilities for process modeling.
+Copyright (C) 2018 Caleb Bell <Caleb.Andrew.Bell@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.'''
+
+from __future__ import division
+from fluids import *
+from fluids.network import Colebrook_Re_derivative
+import numpy as np
+from numpy.testing import assert_allclose
+from scipy.constants import g, pi
+import pytest
+
+
+def grid_network(n, seed=0):
+    rng = np.random.RandomState(seed)
+    idx = np.arange(n*n).reshape(n, n)
+    start = np.concatenate([idx[:, :-1].ravel(), idx[:-1, :].ravel()])
+    end = np.concatenate([idx[:, 1:].ravel(), idx[1:, :].ravel()])
+    N = len(start)
+    P = np.full(n*n, np.nan)
+    P[0], P[-1] = 5E5, 4E5
+    demand = rng.uniform(0, 2E-4, n*n)
+    demand[0] = demand[-1] = 0
+    return PipeNetwork(start, end, L=rng.uniform(50, 500, N), 
+                       D=rng.choice([0.1, 0.15, 0.2, 0.3], N), rho=1000., 
+                       mu=1E-3, z=rng.uniform(0, 20, n*n), demand=demand, P=P,
+                       roughness=4.5E-5, K=rng.uniform(0, 3, N))
+
+
+def test_Colebrook_Re_derivative():
+    for Re in [4E3, 1E5, 1E7]:
+        for eD in [0, 1E-4, 1E-2]:
+            fd = Colebrook(Re, eD)
+            h = 1E-5
+            numerical = (Colebrook(Re*(1+h), eD) - Colebrook(Re*(1-h), eD))/(2*h)
+            assert_allclose(Colebrook_Re_derivative(Re, eD, fd), numerical, rtol=1E-6)
+
+
+def test_PipeNetwork_single_pipe():
+    net = PipeNetwork(start=[0], end=[1], L=[100.], D=[0.05], rho=1000., 
+                      mu=1E-3, P=[2E5, 1E5], K=[entrance_sharp() + exit_normal()])
+    net.solve()
+    assert_allclose(net.Q, [0.00460350456981918], rtol=1E-9)
+    
+    # Check against the single-element functions
+    V = net.Q[0]/(0.25*pi*0.05**2)
+    fd = friction_factor(Reynolds(V=V, D=0.05, rho=1000., mu=1E-3), eD=0)
+    K = K_from_f(fd=fd, L=100., D=0.05) + entrance_sharp() + exit_normal()
+    assert_allclose(dP_from_K(K, rho=1000., V=V), 1E5)
+    
+    # Elevation; the outlet is 5 m higher
+    net = PipeNetwork(start=[0], end=[1], L=[100.], D=[0.05], rho=1000., 
+                      mu=1E-3, P=[2E5, 1E5], z=[0., 5.], Method='Colebrook')
+    net.solve()
+    V = net.V[0]
+    K = K_from_f(fd=Colebrook(net.Re[0], 0), L=100., D=0.05)
+    assert_allclose(dP_from_K(K, rho=1000., V=V), 1E5 - 1000.*g*5.)
+    
+    # Laminar flow is Hagen-Poiseuille
+    net = PipeNetwork(start=[0], end=[1], L=[10.], D=[0.01], rho=1000., 
+                      mu=1., P=[2E5, 1E5])
+    net.solve()
+    assert_allclose(net.Q, [1E5*pi*0.01**4/(128.*1.*10.)])
+    
+    # Reversed flow
+    net = PipeNetwork(start=[0], end=[1], L=[100.], D=[0.05], rho=1000., 
+                      mu=1E-3, P=[1E5, 2E5])
+    net.solve()
+    assert_allclose(net.Q, [-0.004718055533741729], rtol=1E-9)
+
+
+def test_PipeNetwork_parallel_series():
+    # Two parallel pipes from a reservoir to a demand node, then one pipe on
+    net = PipeNetwork(start=[0, 0, 1], end=[1, 1, 2], L=[50., 150., 80.], 
+                      D=[0.1, 0.08, 0.1], rho=998., mu=1E-3, 
+                      demand=[0, 0.002, 0.01], P=[3E5, np.nan, np.nan],
+                      roughness=1E-4)
+    net.solve()
+    assert_allclose(net.Q[0] + net.Q[1], 0.012)
+    assert_allclose(net.Q[2], 0.01)
+    assert_allclose(net.dP[0], net.dP[1])
+    assert_allclose(net.P[0] - net.P[2], net.dP[0] + net.dP[2])
+    assert_allclose(net.P[0], 3E5)
+
+
+def test_PipeNetwork_grid():
+    net = grid_network(20)
+    net.solve()
+    Q = net.Q
+    inflow = np.zeros(net.N_nodes)
+    np.add.at(inflow, net.end, Q)
+    np.add.at(inflow, net.start, -Q)
+    free = ~net.fixed
+    assert_allclose(inflow[free], net.demand[free], atol=1E-12)
+    
+    Pt = net.P + 1000.*g*net.z
+    assert_allclose(Pt[net.start] - Pt[net.end], net.dP, rtol=1E-9, atol=1E-6)
+    
+    # Warm start converges faster than a cold one after a small change
+    net.demand *= 1.02
+    iterations_cold = PipeNetwork(net.start, net.end, net.L, net.D, 1000., 1E-3,
+                                  z=net.z, demand=net.demand, P=net.P_specified,
+                                  roughness=net.roughness, K=net.K).solve().iterations
+    net.solve()
+    assert net.iterations < iterations_cold
+    
+    # Other friction methods use a numerical derivative
+    net.Method = 'Haaland'
+    net.solve()
+    Pt = net.P + 1000.*g*net.z
+    assert_allclose(Pt[net.start] - Pt[net.end], net.dP, rtol=1E-9, atol=1E-6)
+
+
+def test_PipeNetwork_transition_continuous():
+    net = PipeNetwork(start=[0], end=[1], L=[1.], D=[0.01], rho=1000., mu=1E-3,
+                      P=[2E5, 1E5], roughness=1E-5)
+    Res = np.linspace(LAMINAR_TRANSITION_PIPE, net.Re_turbulent, 50)
+    fd, dfd = net.friction_transition(Res, np.full(50, 1E-3))
+    assert_allclose(fd[0], 64/LAMINAR_TRANSITION_PIPE)
+    assert_allclose(fd[-1], Clamond(net.Re_turbulent, 1E-3))
+    assert_allclose(dfd[0], -64/LAMINAR_TRANSITION_PIPE)
+    
+    with pytest.raises(Exception):
+        PipeNetwork(start=[0], end=[1], L=[1.], D=[0.01], rho=1000., mu=1E-3,
+                    P=[np.nan, np.nan])
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+'''Chemical Engineering Design Library (ChEDL). Utilities for process modeling.
+Copyright (C) 2018 Caleb Bell <Caleb.Andrew.Bell@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.'''
+
+
+from __future__ import division
+from fluids.numerics import *
+from numpy.testing import assert_allclose
+import numpy as np
+import pytest
+
+
+def test_interp():
+    from scipy.interpolate import interp1d
+    from fluids.safety_valve import _Kw_x, _Kw_y
+    f_scipy = interp1d(_Kw_x, _Kw_y)
+    f = LinearInterpolator(_Kw_x, _Kw_y)
+    xs = np.linspace(15, 50, 1001)
+    assert_allclose([f(x) for x in xs.tolist()], f_scipy(xs), rtol=1E-14)
+    assert_allclose(f(xs), f_scipy(xs), rtol=1E-14)
+    assert f(15) == 1
+    assert f(50.) == _Kw_y[-1]
+    for x in [14.9, 50.1, np.array([20., 51.])]:
+        with pytest.raises(ValueError):
+            f(x)
+    assert horner([2., -3., 0., 1.], 2.) == 2.*8 - 3.*4 + 1
+
+
+def test_SplineInterpolator():
+    from scipy.interpolate import UnivariateSpline
+    from fluids.separator import v_factors_Watkins, Kv_Watkins
+    from fluids.filters import grills_rounded_alphas, grills_rounded_Ks
+    for x, y, s, k in [(v_factors_Watkins, Kv_Watkins, 1E-5, 3),
+                       (grills_rounded_alphas, grills_rounded_Ks, 0, 2)]:
+        f_scipy = UnivariateSpline(x, y, s=s, k=k)
+        f = SplineInterpolator(x, y, s=s, k=k)
+        assert f.tck is None
+        # Including extrapolation on both sides
+        xs = np.linspace(0.9*x[0], 1.1*x[-1], 1001)
+        assert_allclose([f(i) for i in xs.tolist()], f_scipy(xs), rtol=1E-12, atol=1E-15)
+        assert_allclose(f(xs), f_scipy(xs), rtol=1E-14)
+        assert_allclose([f(i) for i in x], f_scipy(x), rtol=1E-12)
+
+
+def test_BilinearInterpolator():
+    from scipy.interpolate import interp2d
+    from fluids.safety_valve import _KSH_tempKs, _KSH_Pa, _KSH_factors
+    from fluids.pump import VFD_efficiencies
+    VFD_loads = [0.016, 0.125, 0.25, 0.42, 0.5, 0.75, 1]
+    VFD_Ps = [3, 5, 10, 20, 30, 50, 60, 75, 100, 200, 400]
+    np.random.seed(0)
+    for x, y, z in [(_KSH_tempKs, _KSH_Pa, _KSH_factors), 
+                    (VFD_loads, VFD_Ps, VFD_efficiencies)]:
+        f_scipy = interp2d(x, y, z)
+        f = BilinearInterpolator(x, y, z)
+        # Grid points, and random points including outside the table
+        xs = x + (x[0] + (x[-1] - x[0])*(1.2*np.random.rand(200) - 0.1)).tolist()
+        ys = y + (y[0] + (y[-1] - y[0])*(1.2*np.random.rand(200) - 0.1)).tolist()
+        expect = np.array([[float(f_scipy(i, j)) for i in xs] for j in ys])
+        calc = np.array([[f(i, j) for i in xs] for j in ys])
+        assert_allclose(calc, expect, rtol=1E-13)
+        assert_allclose(f(np.array(xs), np.array(ys)[:, None]), expect, rtol=1E-13)
+
+
+def test_bracketed_roots():
+    from scipy.optimize import brentq
+    np.random.seed(0)
+    c = np.random.uniform(0.1, 10., 1000)
+    # A root near one end of the bracket, where regula falsi alone stalls
+    f = lambda x, i: np.exp(c[i]*x) - 1.5
+    a, b = np.zeros(1000), np.full(1000, 10.)
+    roots = bracketed_roots(f, a, b)
+    expect = [brentq(lambda x: np.exp(ci*x) - 1.5, 0., 10., xtol=1E-15) for ci in c]
+    assert_allclose(roots, expect, rtol=1E-12)
+    
+    # Bracket given either way round, and roots at the bracket's ends
+    roots = bracketed_roots(lambda x, i: x - c[i], c, np.full(1000, 20.))
+    assert_allclose(roots, c)
+    roots = bracketed_roots(lambda x, i: x*x - c[i], np.full(1000, 4.), np.zeros(1000))
+    assert_allclose(roots, c**0.5, rtol=1E-12)
+
+
+def test_linear_recurrence():
+    np.random.seed(0)
+    for n in [0, 1, 2, 7, 1000]:
+        a = np.random.uniform(0.5, 1.5, n)
+        b = np.random.uniform(-1., 1., n)
+        x = [2.]
+        for i in range(n):
+            x.append(a[i]*x[-1] + b[i])
+        assert_allclose(linear_recurrence(a, b, 2.), x, rtol=1E-12)
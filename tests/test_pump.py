@@ -47,6 +47,13 @@ def test_VFD_efficiency():
     # Lower bound, 3 hp; upper bound, 400 hp; 0.016 load bound
     etas = VFD_efficiency(1*hp), VFD_efficiency(500*hp), VFD_efficiency(8*hp, load=0.01)
     assert_allclose(etas, [0.94, 0.97, 0.386])
+    
+    # Arrays of operating points
+    Ps = np.array([1., 8., 10., 100., 500.])*hp
+    loads = np.array([[0.01], [0.3], [0.5], [1.]])
+    etas = VFD_efficiency(Ps, loads)
+    assert etas.shape == (4, 5)
+    assert_allclose(etas, [[VFD_efficiency(P, load) for P in Ps.tolist()] for load in loads[:, 0].tolist()], rtol=0)
 
     hp_sum = sum(nema_sizes_hp)
     assert_allclose(hp_sum, 3356.333333333333)
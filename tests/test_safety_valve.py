@@ -22,6 +22,7 @@ SOFTWARE.'''
 
 from __future__ import division
 from fluids import *
+import numpy as np
 from numpy.testing import assert_allclose
 import pytest
 
@@ -57,6 +58,17 @@ def test_safety_valve():
     from fluids.safety_valve import _KSH_Pa, _KSH_tempKs
     KSH_tot =  sum([API520_SH(T, P) for P in _KSH_Pa[:-1] for T in _KSH_tempKs])
     assert_allclose(229.93, KSH_tot)
+    
+    # Arrays of operating points, including the under 15 psig case
+    Ts = np.array([320, 450., 593+273.15, 900.])
+    Ps = np.array([[5E4], [1066.325E3], [5E6]])
+    KSH = API520_SH(Ts, Ps)
+    assert KSH.shape == (3, 4)
+    assert_allclose(KSH, [[API520_SH(T, P) for T in Ts.tolist()] for P in Ps[:, 0].tolist()], rtol=1E-15)
+    with pytest.raises(Exception):
+        API520_SH(Ts, 21E6)
+    with pytest.raises(Exception):
+        API520_SH(np.array([1000.]), 1066E3)
 
     KW = [API520_W(1E6, 3E5), API520_W(1E6, 1E5)]
     assert_allclose(KW, [0.9511471848008564, 1])
@@ -45,6 +45,42 @@ def test_convert_input():
         convert_input(5, 'm', u, True)
 
 
+def test_convert_input_cached():
+    from fluids.units import convert_input, convert_input_cached, conversion_factors
+    for val, unit in [(5*u.inch, 'm'), (25*u.degC, 'K'), (77*u.degF, 'K'), 
+                      (3*u.bar, 'Pa'), (2.5*u.m, 'm'), (4*u.lb/u.hour, 'kg/s'),
+                      (np.array([1.0, 2.0])*u.ft, 'm'), (None, 'm'),
+                      (0.5*u.dimensionless, 'dimensionless'), ('Schedule', 'dimensionless')]:
+        if val is None or type(val) == str:
+            assert convert_input_cached(val, unit, u) == convert_input(val, unit, u)
+        else:
+            assert_allclose(convert_input_cached(val, unit, u), convert_input(val, unit, u), rtol=1E-14)
+    assert conversion_factors((1*u.degC).units._units, 'K', u) == (1.0, 273.15)
+    
+    # The same errors as convert_input
+    with pytest.raises(TypeError):
+        convert_input_cached(5, 'm', u)
+    assert convert_input_cached(5, 'm', u, False) == 5
+    with pytest.raises(Exception):
+        convert_input_cached(5*u.s, 'm', u)
+
+
+def test_wrapped_arrays():
+    V = np.array([1.0, 2.0, 3.5])*u.m/u.s
+    Re = Reynolds(V=V, D=2*u.m, rho=997.1*u.kg/u.m**3, mu=1E-3*u.Pa*u.s)
+    assert_pint_allclose(Re, [1994200.0, 3988400.0, 6979700.0], {})
+    Re = Reynolds(V=V, D=78.74015748031496*u.inch, rho=997.1*u.kg/u.m**3, mu=1*u.cP)
+    assert_pint_allclose(Re, [1994200.0, 3988400.0, 6979700.0], {})
+    
+    # A function with a hand-written array kernel, and one with none
+    Re = [1E4, 1E5]*u.dimensionless
+    fd = friction_factor(Re=Re, eD=1E-4*u.dimensionless, Method='Colebrook')
+    fds = [friction_factor(Re=i, eD=1E-4*u.dimensionless, Method='Colebrook') for i in Re]
+    assert_pint_allclose(fd, [i.magnitude for i in fds], {})
+    K = entrance_rounded(Di=np.array([0.1, 0.2])*u.m, rc=1*u.cm)
+    assert_pint_allclose(K, [0.20291036655281347, 0.29683978436405434], {})
+
+
 def test_sample_cases():
     Re = Reynolds(V=3.5*u.m/u.s, D=2*u.m, rho=997.1*u.kg/u.m**3, mu=1E-3*u.Pa*u.s)
     assert_allclose(Re.to_base_units().magnitude, 6979700.0)
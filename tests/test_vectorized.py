@@ -45,3 +45,168 @@ def test_Morsi_Alexander():
     assert_allclose(Cds, Cds_vect)
 
     
+# Sample inputs for the natively vectorized functions, by argument name.
+sample_inputs = {'Re': [5E3, 1E5, 1E6, 1E7], 'eD': [1E-5, 1E-4, 1E-3, 1E-2],
+                 'x': [0.1, 0.4, 0.7, 0.9], 'voidage': [0.3, 0.38, 0.45, 0.6],
+                 'P1': [1E6, 2E6, 3E6, 4E6], 'P2': [9E5, 1.5E6, 2.5E6, 3.9E6],
+                 'T': [250., 300., 400., 500.], 'T1': [250., 300., 400., 500.],
+                 'k': [1.3, 1.4, 1.2, 1.1], 'fd': [0.01, 0.015, 0.02, 0.03],
+                 'rhol': [1000., 800., 600., 900.], 'rhog': [1.2, 5., 20., 60.],
+                 'mul': [1E-3, 2E-4, 5E-4, 1E-4], 'mug': [1.8E-5, 1.2E-5, 1E-5, 2E-5],
+                 'angle': [10., 30., 45., 80.], 'latitude': [0., 30., 55., 90.],
+                 'sphericity': [0.6, 0.8, 0.9, 1.]}
+
+# Functions whose inputs are all optional, one set of which is required
+optional_inputs = {'Reynolds': ['nu'], 'Grashof': ['nu'], 'Schmidt': ['nu'],
+                   'Prandtl': ['nu', 'alpha'], 'Lewis': ['D', 'alpha'],
+                   'Peclet_heat': ['alpha'], 'Fourier_heat': ['alpha'],
+                   'Graetz_heat': ['alpha'], 'contraction_beveled': ['l', 'angle']}
+
+
+# Functions which raise on any out-of-range element; tested on their own below
+tested_separately = set(['drag_sphere', 'v_terminal', 'isothermal_gas_batch',
+                         'gas_pipeline_batch', 'gas_pipeline_profile',
+                         'size_control_valve_l_batch', 'size_control_valve_g_batch'])
+
+
+def test_native_functions_match_scalar():
+    import inspect
+    default = [0.5, 1., 2., 3.]
+    for name in sorted(fluids.vectorized.native_functions - tested_separately):
+        scalar = getattr(fluids, name)
+        params = [p for p, v in inspect.signature(scalar).parameters.items()
+                  if v.default is inspect.Parameter.empty]
+        params += optional_inputs.get(name, [])
+        kwargs = {p: sample_inputs.get(p, default) for p in params}
+        expect = []
+        for i in range(4):
+            try:
+                expect.append(scalar(**{p: v[i] for p, v in kwargs.items()}))
+            except (ValueError, ZeroDivisionError, OverflowError):
+                expect.append(np.nan)
+        with np.errstate(all='ignore'):
+            calc = getattr(fluids.vectorized, name)(**kwargs)
+        calc = np.broadcast_to(calc, (4,))
+        ok = np.isfinite(np.array(expect, dtype=float))
+        assert_allclose(calc[ok], np.array(expect)[ok], rtol=1E-12, err_msg=name)
+
+
+def test_native_piecewise_functions():
+    Res = [0.005, 0.05, 0.5, 5., 50., 500., 2000., 7000., 2E4, 1E5, 3.5E5, 5E5]
+    for name in ['Morsi_Alexander', 'Clift']:
+        expect = [getattr(fluids, name)(Re) for Re in Res]
+        calc = getattr(fluids.vectorized, name)(Res)
+        assert_allclose(calc, expect, rtol=1E-13)
+    
+    expect = [Tsal_1989(Re, 1E-5) for Re in [1E4, 1E7]]
+    assert_allclose(fluids.vectorized.Tsal_1989([1E4, 1E7], 1E-5), expect)
+    
+    Ls = [1000., 1E4, 1E5]
+    expect = [P_isothermal_critical_flow(P=1E6, fd=0.00185, L=L, D=0.5) for L in Ls]
+    calc = fluids.vectorized.P_isothermal_critical_flow(P=1E6, fd=0.00185, L=Ls, D=0.5)
+    assert_allclose(calc, expect, rtol=1E-13)
+
+
+def test_native_functions_not_vectorize():
+    assert not isinstance(fluids.vectorized.Clamond, np.vectorize)
+    assert isinstance(fluids.vectorized.Stichlmair_wet, np.vectorize)
+    # Scalar library untouched
+    assert fluids.Clamond is fluids.friction.Clamond
+
+
+def test_friction_factor_mixed_regimes():
+    from fluids.friction import fmethods
+    Res = np.array([100., 1500., 2500., 1E4, 1E5, 1E6, 1E7])
+    eDs = np.array([1E-5, 1E-4, 1E-3, 1E-5, 1E-4, 1E-3, 1E-2])
+    for Method in fmethods:
+        expect = [friction_factor(Re=Re, eD=eD, Method=Method) for Re, eD in zip(Res, eDs)]
+        calc = fluids.vectorized.friction_factor(Re=Res, eD=eDs, Method=Method)
+        assert_allclose(calc, expect, rtol=1E-13, err_msg=Method)
+    
+    # Broadcasting and 2D inputs
+    calc = fluids.vectorized.friction_factor(Re=Res.reshape(7, 1), eD=[0, 1E-4])
+    assert calc.shape == (7, 2)
+    assert_allclose(calc[3, 1], friction_factor(1E4, 1E-4))
+    
+    assert_allclose(fluids.vectorized.friction_factor(1E5, 1E-4), friction_factor(1E5, 1E-4))
+    assert_allclose(fluids.vectorized.friction_factor([1E5], 1E-4, Darcy=False),
+                    [friction_factor(1E5, 1E-4, Darcy=False)])
+    
+    methods = fluids.vectorized.friction_factor([1E5, 1E6], 1E-4, AvailableMethods=True)
+    assert 'Papaevangelo_2010' in methods
+    methods = fluids.vectorized.friction_factor([1E5, 1E8], 1E-4, AvailableMethods=True)
+    assert 'Papaevangelo_2010' not in methods
+
+
+def test_Colebrook_high_Re_eD():
+    Res = np.logspace(3.5, 9, 30)
+    for eD in [0., 1E-6, 1E-3, 5E-2, 0.2]:
+        expect = [Colebrook(Re, eD) for Re in Res]
+        calc = fluids.vectorized.Colebrook(Res, eD)
+        assert np.all(np.isfinite(calc))
+        assert_allclose(calc, expect, rtol=1E-14)
+
+
+def test_friction_factor_table():
+    Res = np.array([100., 1E4, 1E6, 1E8])
+    calc = fluids.vectorized.friction_factor(Res, 1E-4, Method='table')
+    expect = [friction_factor(Re, 1E-4, Method='table') for Re in Res]
+    assert_allclose(calc, expect, rtol=1E-14)
+
+
+def test_drag_sphere_v_terminal():
+    from fluids.drag import drag_sphere, v_terminal
+    Res = np.logspace(-3, 5.99, 50)
+    expect = [drag_sphere(Re) for Re in Res]
+    assert_allclose(fluids.vectorized.drag_sphere(Res), expect, rtol=1E-13)
+    expect = [drag_sphere(Re, Method='Clift') for Re in Res]
+    assert_allclose(fluids.vectorized.drag_sphere(Res, Method='Clift'), expect, rtol=1E-13)
+    with pytest.raises(ValueError):
+        fluids.vectorized.drag_sphere([1E3, 1E7])
+
+    # From Stokes flow through to Re ~ 1E5, in water and in air
+    Ds = np.logspace(-7, -1.5, 100)
+    for rho, mu in [(1000., 1E-3), (1.2, 1.8E-5)]:
+        expect = [v_terminal(D, 2600., rho, mu) for D in Ds]
+        calc = fluids.vectorized.v_terminal(Ds, 2600., rho, mu)
+        assert_allclose(calc, expect, rtol=1E-12)
+    
+    expect = [v_terminal(D, 2600., 1000., 1E-3, Method='Clift') for D in Ds]
+    calc = fluids.vectorized.v_terminal(Ds, 2600., 1000., 1E-3, Method='Clift')
+    assert_allclose(calc, expect, rtol=1E-12)
+
+    calc = fluids.vectorized.v_terminal(Ds.reshape(10, 10), [[2600.], [8000.]]*5, 1000., 1E-3)
+    assert calc.shape == (10, 10)
+    assert_allclose(calc[1, 3], v_terminal(Ds[13], 8000., 1000., 1E-3))
+    assert_allclose(fluids.vectorized.v_terminal(70E-6, 2600., 1000., 1E-3), 
+                    v_terminal(70E-6, 2600., 1000., 1E-3))
+
+
+def test_integrate_drag_sphere():
+    from fluids.drag import integrate_drag_sphere
+    # Stokes regime particles, and particles needing integration
+    Ds = np.logspace(-7, -2, 12)
+    for V in [0., 30.]:
+        expect = np.array([integrate_drag_sphere(D, 2200., 1.2, 1.78E-5, t=0.5, V=V, distance=True) 
+                           for D in Ds]).T
+        Vs, xs = fluids.vectorized.integrate_drag_sphere(Ds, 2200., 1.2, 1.78E-5, t=0.5, V=V, distance=True)
+        assert_allclose(Vs, expect[0], rtol=1E-6)
+        # The scalar function's trapezoidal distance is wrong for small 
+        # particles which slow down within its first interval
+        assert_allclose(xs[6:], expect[1][6:], rtol=1E-3)
+    
+    ans = fluids.vectorized.integrate_drag_sphere(0.001, 2200., 1.2, 1.78E-5, t=0.5, V=30, distance=True)
+    assert_allclose(ans, (9.686465044053476, 7.8294546436299175), rtol=1E-6)
+    
+    # Different end times, named method
+    ts = [0.1, 0.2]
+    expect = [integrate_drag_sphere(0.001, 2200., 1.2, 1.78E-5, t=t, Method='Clift') for t in ts]
+    calc = fluids.vectorized.integrate_drag_sphere(0.001, 2200., 1.2, 1.78E-5, t=ts, Method='Clift')
+    assert_allclose(calc, expect, rtol=1E-7)
+
+    # Dense output matches integrating to each time
+    trajectory = fluids.vectorized.integrate_drag_sphere(Ds, 2200., 1.2, 1.78E-5, t=0.5, V=-5, 
+                                                         distance=True, dense_output=True)
+    for t in [0.013, 0.25, 0.5]:
+        expect = fluids.vectorized.integrate_drag_sphere(Ds, 2200., 1.2, 1.78E-5, t=t, V=-5, distance=True)
+        assert_allclose(trajectory(t), expect, rtol=1E-7, atol=1E-12)